@@ -0,0 +1,43 @@
+"""Add the task priority and resource capacity columns used by leveling
+
+Revision ID: 0000
+Revises: 
+Create Date: 2026-10-17 08:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0000'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Columns added to the models after databases were already created with create_all
+COLUMNS = [
+    ('tasks', sa.Column(
+        'priority',
+        sa.Enum('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='taskpriority'),
+        nullable=True
+    )),
+    ('resources', sa.Column('capacity_hours_per_day', sa.Float(), nullable=True)),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table_name, column in COLUMNS:
+        existing = {c['name'] for c in inspector.get_columns(table_name)}
+        if column.name not in existing:
+            with op.batch_alter_table(table_name) as batch_op:
+                batch_op.add_column(column)
+    op.execute("UPDATE tasks SET priority = 'MEDIUM' WHERE priority IS NULL")
+    op.execute("UPDATE resources SET capacity_hours_per_day = 8 WHERE capacity_hours_per_day IS NULL")
+
+
+def downgrade() -> None:
+    for table_name, column in reversed(COLUMNS):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column(column.name)
@@ -0,0 +1,36 @@
+"""Add indexes on foreign-key columns
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = '0000'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_tasks_project_id', 'tasks', ['project_id']),
+    ('ix_tasks_parent_id', 'tasks', ['parent_id']),
+    ('ix_task_dependencies_successor_id', 'task_dependencies', ['successor_id']),
+    ('ix_task_dependencies_predecessor_id', 'task_dependencies', ['predecessor_id']),
+    ('ix_task_resource_assignments_task_id', 'task_resource_assignments', ['task_id']),
+    ('ix_task_resource_assignments_resource_id', 'task_resource_assignments', ['resource_id']),
+]
+
+
+def upgrade() -> None:
+    for index_name, table_name, columns in INDEXES:
+        op.create_index(index_name, table_name, columns, if_not_exists=True)
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    for index_name, table_name, _ in reversed(INDEXES):
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
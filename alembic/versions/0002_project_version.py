@@ -0,0 +1,30 @@
+"""Add a version counter to projects
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('projects')}
+    if 'version' not in existing:
+        with op.batch_alter_table('projects') as batch_op:
+            batch_op.add_column(
+                sa.Column('version', sa.Integer(), nullable=False, server_default='0')
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,45 @@
+"""Add working calendars: project working weekdays and calendar exceptions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {c['name'] for c in inspector.get_columns('projects')}
+    if 'working_weekdays' not in existing:
+        with op.batch_alter_table('projects') as batch_op:
+            batch_op.add_column(
+                sa.Column('working_weekdays', sa.Integer(), nullable=False, server_default='31')
+            )
+    if not inspector.has_table('calendar_exceptions'):
+        op.create_table(
+            'calendar_exceptions',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), nullable=True),
+            sa.Column('resource_id', sa.Integer(), sa.ForeignKey('resources.id'), nullable=True),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('is_working', sa.Boolean(), nullable=False),
+            sa.Column('description', sa.String(), nullable=True),
+        )
+    op.create_index('ix_calendar_exceptions_id', 'calendar_exceptions', ['id'], if_not_exists=True)
+    op.create_index('ix_calendar_exceptions_project_id', 'calendar_exceptions', ['project_id'], if_not_exists=True)
+    op.create_index('ix_calendar_exceptions_resource_id', 'calendar_exceptions', ['resource_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table('calendar_exceptions')
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('working_weekdays')
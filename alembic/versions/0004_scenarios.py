@@ -0,0 +1,34 @@
+"""Add saved what-if scenarios
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table('scenarios'):
+        op.create_table(
+            'scenarios',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('changes', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+    op.create_index('ix_scenarios_id', 'scenarios', ['id'], if_not_exists=True)
+    op.create_index('ix_scenarios_project_id', 'scenarios', ['project_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table('scenarios')
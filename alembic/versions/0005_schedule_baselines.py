@@ -0,0 +1,38 @@
+"""Add schedule baselines
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table('schedule_baselines'):
+        op.create_table(
+            'schedule_baselines',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id'), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('task_count', sa.Integer(), nullable=False),
+            sa.Column('project_duration', sa.Float(), nullable=False),
+            sa.Column('data', sa.LargeBinary(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+    op.create_index('ix_schedule_baselines_id', 'schedule_baselines', ['id'], if_not_exists=True)
+    op.create_index(
+        'ix_schedule_baselines_project_id', 'schedule_baselines', ['project_id'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('schedule_baselines')
@@ -0,0 +1,28 @@
+"""Store each task's earliest finish date
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('tasks')}
+    if 'earliest_finish_date' not in existing:
+        with op.batch_alter_table('tasks') as batch_op:
+            batch_op.add_column(sa.Column('earliest_finish_date', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('earliest_finish_date')
@@ -0,0 +1,46 @@
+from pathlib import Path
+import typer
+
+from .database import SessionLocal, engine
+
+cli = typer.Typer(help="Project Management command line tools")
+
+@cli.callback()
+def main():
+    """Project Management command line tools"""
+
+@cli.command("import")
+def import_file(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV or XLSX task sheet"),
+    project_id: int = typer.Option(..., "--project-id", help="Project to import into"),
+    chunk_size: int = typer.Option(1000, "--chunk-size", help="Rows inserted per batch")
+):
+    """Bulk-imports tasks, dependencies and resource assignments"""
+    from .models.task import Project
+    from .schema import ensure_schema
+    from .services.importer import import_tasks
+
+    ensure_schema(engine)
+    file_format = path.suffix.lower().lstrip(".")
+    db = SessionLocal()
+    try:
+        if not db.query(Project.id).filter(Project.id == project_id).first():
+            typer.echo(f"Project {project_id} not found", err=True)
+            raise typer.Exit(code=1)
+        with path.open("rb") as stream:
+            report = import_tasks(db, project_id, stream, file_format, chunk_size)
+    finally:
+        db.close()
+
+    typer.echo(
+        f"Imported {report['imported_tasks']} tasks, "
+        f"{report['imported_dependencies']} dependencies and "
+        f"{report['imported_assignments']} assignments"
+    )
+    for error in report["errors"]:
+        typer.echo(f"Row {error['row']}: {error['message']}", err=True)
+    if report["error_count"] > len(report["errors"]):
+        typer.echo(f"... {report['error_count'] - len(report['errors'])} more errors", err=True)
+
+if __name__ == "__main__":
+    cli()
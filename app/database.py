@@ -1,21 +1,79 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 from pathlib import Path
 
-# Create data directory in user's home folder
-data_dir = Path.home() / '.project_manager'
-data_dir.mkdir(exist_ok=True)
+# Create data directory in user's home folder; PROJECT_MANAGER_DATA_DIR
+# points the app at another one, e.g. a scratch database for benchmarks
+data_dir = Path(os.getenv("PROJECT_MANAGER_DATA_DIR") or Path.home() / '.project_manager')
+data_dir.mkdir(parents=True, exist_ok=True)
 
 # SQLite database file
 database_path = data_dir / 'project_manager.db'
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{database_path}"
 
+# Read connections open the file read-only through a URI filename
+READ_ONLY_DATABASE_URL = f"sqlite:///file:{database_path}?mode=ro&uri=true"
+ASYNC_READ_ONLY_DATABASE_URL = f"sqlite+aiosqlite:///file:{database_path}?mode=ro&uri=true"
+
+# Applied to every new connection. WAL lets readers keep going while a
+# write transaction commits; synchronous=NORMAL is durable across crashes
+# in WAL mode and only fsyncs at checkpoints.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # ms to wait for a lock before failing
+    "cache_size": -64000,  # negative values are KiB, so 64MB of page cache
+    "mmap_size": 268435456,  # map up to 256MB of the file
+    "temp_store": "MEMORY"
+}
+
+# Size of the read-only pool; GET endpoints draw from it
+READ_POOL_SIZE = int(os.getenv("PROJECT_MANAGER_READ_POOL_SIZE", "8"))
+
+def _apply_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False}  # Needed for SQLite
 )
+event.listen(engine, "connect", _apply_pragmas(SQLITE_PRAGMAS))
+
+# journal_mode is a property of the file and can't be changed read-only
+read_engine = create_engine(
+    READ_ONLY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=READ_POOL_SIZE,
+    max_overflow=READ_POOL_SIZE
+)
+READ_PRAGMAS = {
+    **{name: value for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"},
+    "query_only": "ON"
+}
+event.listen(read_engine, "connect", _apply_pragmas(READ_PRAGMAS))
+
+# The same read-only profile for async endpoints, over aiosqlite
+async_read_engine = create_async_engine(
+    ASYNC_READ_ONLY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,  # aiosqlite defaults to opening a connection per checkout
+    pool_size=READ_POOL_SIZE,
+    max_overflow=READ_POOL_SIZE
+)
+event.listen(async_read_engine.sync_engine, "connect", _apply_pragmas(READ_PRAGMAS))
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
@@ -1,19 +1,128 @@
-import uvicorn
-from fastapi import FastAPI, HTTPException, Depends, status
+from .startup import startup_timer
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import case, delete, func, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, selectinload
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
+startup_timer.mark("framework_imports")
 
-from .models.task import Task, TaskDependency, Project, User, Resource, TaskResourceAssignment
-from .services.scheduler import ProjectScheduler
-from .database import SessionLocal, engine, Base
-from . import schemas
+from .models.task import (
+    Task, TaskDependency, Project, User, Resource, TaskResourceAssignment, CalendarException,
+    SavedScenario, ScheduleBaseline
+)
+from .services.dependency_index import DependencyIndexRegistry
+from .services.cpm_types import SchedulingError
+from .services.schedule_cache import ScheduleCache, ScheduleChanges, ScheduleState
+from .services.recalc_queue import RecalculationQueue, DEFAULT_DEBOUNCE, DEFAULT_MAX_DELAY
+from .services.allocation import AllocationIndex
+from .services.calendar import (
+    CalendarRegistry, load_calendars, mask_weekdays, resource_tasks, schedule_dates,
+    weekday_mask, write_schedule_dates
+)
+from .services.wbs import WbsRegistry
+from .services.scenarios import Scenario, ScenarioStore, evaluate_scenarios
+from .services.baselines import LiveColumns
+from .services.change_feed import ChangeFeed, format_event
+from .services.versions import ResponseCache, bump_project_versions, etag_matches, make_etag
+from .services import columnar
+from .services.jobs import Job, JobManager
+from .services.importer import TaskImportError, import_tasks
+from .services.exporter import EXPORT_FORMATS, export_rows
+from .database import (
+    SessionLocal, ReadSessionLocal, AsyncReadSessionLocal, engine, read_engine, async_read_engine
+)
+from . import metrics, schemas
+from .schema import ensure_schema
+startup_timer.mark("app_imports")
+
+# Creates or migrates the database only when its schema version is behind
+ensure_schema(engine)
+startup_timer.mark("schema_check")
+
+# Per-project dependency indexes used for incremental cycle checks
+dependency_indexes = DependencyIndexRegistry()
+
+# Per-project CPM results, updated incrementally on writes. Every full
+# computation writes its dates to the tasks (store_schedule_dates, below).
+schedule_cache = ScheduleCache(on_store=lambda project_id: store_schedule_dates(project_id))
+
+# Committed changes per project, pushed to clients of /projects/{id}/changes
+change_feed = ChangeFeed()
+
+# Seconds between keep-alive comments on an idle change feed
+FEED_KEEPALIVE = 15
+
+def publish_schedule_delta(project_id: int, delta):
+    state = schedule_cache.peek(project_id)
+    change_feed.publish(project_id, "schedule", {
+        "project_duration": state.project_end if state is not None else None,
+        "tasks": delta
+    })
+    store_schedule_dates(project_id, delta)
+
+# Writes queue their schedule changes here; bursts are merged per project
+recalc_queue = RecalculationQueue(
+    schedule_cache,
+    debounce=float(os.getenv("PROJECT_MANAGER_RECALC_DEBOUNCE_MS", DEFAULT_DEBOUNCE * 1000)) / 1000,
+    max_delay=float(os.getenv("PROJECT_MANAGER_RECALC_MAX_DELAY_MS", DEFAULT_MAX_DELAY * 1000)) / 1000,
+    on_apply=publish_schedule_delta
+)
+
+# Per-resource booking timelines for over-allocation queries, booked on working days
+allocation_index = AllocationIndex(
+    calendar=lambda project_id, resource_id: booking_calendar(project_id, resource_id)
+)
+
+# Per-project summary task rollups over the parent/child hierarchy
+wbs_rollups = WbsRegistry()
+
+# Per-project working calendars that turn schedule offsets into task dates
+calendars = CalendarRegistry()
+
+# Serializes writes of computed dates, so a full and an incremental
+# recompute of a project can't interleave their updates
+dates_lock = threading.Lock()
+
+# Above this many moved tasks, caches reload and feed clients get a reset
+# instead of being patched task by task
+DATES_REFRESH_LIMIT = 200
+
+# What-if scenarios per project, with the compiled graphs they apply to
+scenario_store = ScenarioStore()
+
+# Current schedule arrays per project, which baseline variances compare against
+live_columns = LiveColumns()
+
+# Serialized bodies of project reads, keyed by the project version they were built from
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("PROJECT_MANAGER_RESPONSE_CACHE_ENTRIES", "256")),
+    max_bytes=int(os.getenv("PROJECT_MANAGER_RESPONSE_CACHE_MB", "64")) * 1024 * 1024
+)
+
+# Process pool for scheduling, leveling and simulation
+jobs = JobManager()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_timer.mark("server_start")
+    logging.getLogger(__name__).info(startup_timer.summary())
+    yield
+    jobs.shutdown()
 
-app = FastAPI(title="Project Management API")
+app = FastAPI(title="Project Management API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -24,6 +133,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request, SQL and scheduler instrumentation, served on /metrics
+if metrics.ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(engine, "write")
+    metrics.instrument_engine(read_engine, "read")
+    metrics.instrument_engine(async_read_engine.sync_engine, "async_read")
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -32,6 +148,540 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Session on the read-only pool, used by GET endpoints"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    """Async session on the read-only pool, used by async endpoints"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+def load_dependency_index(db: Session, project_id: int):
+    """Returns the project's dependency index, loading it from the database on first use"""
+    def loader():
+        project_tasks = select(Task.id).where(Task.project_id == project_id)
+        nodes = db.execute(project_tasks).scalars().all()
+        edges = db.execute(
+            select(TaskDependency.predecessor_id, TaskDependency.successor_id)
+            .where(
+                TaskDependency.successor_id.in_(project_tasks)
+                | TaskDependency.predecessor_id.in_(project_tasks)
+            )
+        ).all()
+        return nodes, edges
+
+    return dependency_indexes.get(project_id, loader)
+
+def dependency_path_exists(db: Session, start: int, target: int) -> bool:
+    """True if a chain of dependencies in any project leads from start to target"""
+    # UNION rather than UNION ALL, so every task is visited once even through cycles
+    reached = select(literal(start).label("task_id")).cte("reached", recursive=True)
+    reached = reached.union(
+        select(TaskDependency.successor_id)
+        .join(reached, TaskDependency.predecessor_id == reached.c.task_id)
+    )
+    return db.execute(
+        select(reached.c.task_id).where(reached.c.task_id == target).limit(1)
+    ).first() is not None
+
+def project_graph_queries(project_id: int):
+    """Selects the scheduling columns of a project's tasks and their incoming dependencies"""
+    tasks = (
+        select(Task.id, Task.duration, Task.is_milestone, Task.is_locked, Task.priority)
+        .where(Task.project_id == project_id)
+    )
+    dependencies = (
+        select(
+            TaskDependency.predecessor_id,
+            TaskDependency.successor_id,
+            TaskDependency.dependency_type,
+            TaskDependency.lag_time
+        )
+        .where(TaskDependency.successor_id.in_(
+            select(Task.id).where(Task.project_id == project_id)
+        ))
+    )
+    return tasks, dependencies
+
+def outside_predecessors(tasks, dependencies) -> Set[int]:
+    """Predecessors of a project's dependencies that belong to other projects"""
+    task_ids = {task.id for task in tasks}
+    return {dep.predecessor_id for dep in dependencies if dep.predecessor_id not in task_ids}
+
+# Project id -> the other projects whose tasks its schedule waits for
+schedule_upstreams: Dict[int, Set[int]] = {}
+
+def flush_schedule_changes(project_id: int, seen: Optional[Set[int]] = None):
+    """Applies the queued changes of a project and of the projects its schedule waits for"""
+    seen = set() if seen is None else seen
+    seen.add(project_id)
+    for upstream in schedule_upstreams.get(project_id, ()):
+        if upstream not in seen:
+            flush_schedule_changes(upstream, seen)
+    recalc_queue.flush(project_id)
+
+# Projects whose boundaries are being loaded on this thread, so projects
+# that depend on each other fall back instead of recursing forever
+boundary_loading = threading.local()
+
+def project_boundaries(db: Session, project_id: int, outside: Set[int]) -> Dict[int, Tuple[float, float]]:
+    """Fixed (earliest start, earliest finish) of the outside predecessors of a project.
+
+    Each is pinned where its own project's cached schedule puts it, so a
+    project schedules on its own with the same day offsets as
+    /portfolio/schedule. Where that schedule can't be had, because the
+    projects depend on each other or it fails, the task counts as
+    starting at day 0.
+    """
+    if not outside:
+        schedule_upstreams.pop(project_id, None)
+        return {}
+    rows = db.execute(
+        select(Task.id, Task.project_id, Task.duration).where(Task.id.in_(outside))
+    ).all()
+    schedule_upstreams[project_id] = {row.project_id for row in rows}
+    loading = boundary_loading.__dict__.setdefault("projects", set())
+    loading.add(project_id)
+    states = {}
+    try:
+        for upstream in {row.project_id for row in rows} - loading:
+            try:
+                states[upstream] = load_schedule_state(db, upstream)
+            except HTTPException:
+                pass
+    finally:
+        loading.discard(project_id)
+    boundaries = {}
+    with schedule_cache.lock:
+        for task_id, upstream, duration in rows:
+            state = states.get(upstream)
+            if state is not None and task_id in state.durations:
+                start = state.earliest_start[task_id]
+                boundaries[task_id] = (start, start + state.durations[task_id])
+            else:
+                boundaries[task_id] = (0.0, duration or 0)
+    return boundaries
+
+def read_project_boundaries(project_id: int, outside: Set[int]) -> Dict[int, Tuple[float, float]]:
+    db = ReadSessionLocal()
+    try:
+        return project_boundaries(db, project_id, outside)
+    finally:
+        db.close()
+
+def load_project_graph(db: Session, project_id: int):
+    """A project's tasks, their incoming dependencies and the boundaries of outside predecessors"""
+    tasks_query, dependencies_query = project_graph_queries(project_id)
+    tasks = db.execute(tasks_query).all()
+    if not tasks:
+        raise HTTPException(status_code=404, detail="Project not found or has no tasks")
+    dependencies = db.execute(dependencies_query).all()
+    return tasks, dependencies, project_boundaries(
+        db, project_id, outside_predecessors(tasks, dependencies)
+    )
+
+async def load_project_graph_async(db: AsyncSession, project_id: int):
+    tasks_query, dependencies_query = project_graph_queries(project_id)
+    tasks = (await db.execute(tasks_query)).all()
+    if not tasks:
+        raise HTTPException(status_code=404, detail="Project not found or has no tasks")
+    dependencies = (await db.execute(dependencies_query)).all()
+    outside = outside_predecessors(tasks, dependencies)
+    # Outside schedules come from the cache or a synchronous computation
+    boundaries = await run_in_threadpool(read_project_boundaries, project_id, outside) if outside else {}
+    return tasks, dependencies, boundaries
+
+def load_schedule_state(db: Session, project_id: int):
+    """Returns the project's cached schedule, computing it in full on first use.
+
+    Raises a 404 for a project without tasks and a 400 when its
+    dependencies can't be scheduled, e.g. because they form a cycle.
+    """
+    flush_schedule_changes(project_id)
+    state = schedule_cache.peek(project_id)
+    if state is not None:
+        return state
+    # Outside the cache lock, as loading boundaries flushes and computes other projects
+    generation = schedule_cache.generation(project_id)
+    try:
+        state = ScheduleState.from_records(*load_project_graph(db, project_id))
+    except SchedulingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schedule_cache.store(project_id, state, generation)
+
+def task_finish():
+    """A task's finish: its actual end, else its scheduled earliest finish.
+
+    NULL for a task started on its own dates that has no actual end yet,
+    or that was never scheduled; such a task finishes its duration in
+    days after its start.
+    """
+    return func.coalesce(
+        Task.actual_end_date,
+        case((Task.actual_start_date.is_(None), Task.earliest_finish_date))
+    )
+
+def task_finish_day():
+    """task_finish as a julianday; without one a task finishes its duration after it starts"""
+    return func.coalesce(
+        func.julianday(task_finish()),
+        func.julianday(func.coalesce(Task.actual_start_date, Task.earliest_start_date))
+        + func.coalesce(Task.duration, 0)
+    )
+
+def allocation_rows():
+    """Assignment rows joined with their task's scheduled span"""
+    return (
+        select(
+            TaskResourceAssignment.task_id,
+            Task.project_id,
+            TaskResourceAssignment.resource_id,
+            TaskResourceAssignment.assigned_hours,
+            func.coalesce(Task.actual_start_date, Task.earliest_start_date).label("start"),
+            task_finish().label("end"),
+            Task.duration
+        )
+        .join(Task, Task.id == TaskResourceAssignment.task_id)
+    )
+
+def booking_calendar(project_id: int, resource_id: int):
+    """The calendar a resource works a project's tasks in, None for a missing project"""
+    loaded = read_calendars(project_id)
+    if loaded is None:
+        return None
+    calendar, resource_calendars = loaded
+    return resource_calendars.get(resource_id, calendar)
+
+def load_allocation_index(db: Session) -> AllocationIndex:
+    """Returns the allocation index, loading every booking on first use"""
+    with allocation_index.lock:
+        if not allocation_index.loaded:
+            allocation_index.load(
+                db.query(Resource.id, Resource.capacity_hours_per_day).all(),
+                db.execute(allocation_rows()).all()
+            )
+    return allocation_index
+
+async def job_response(job: Job, wait: bool):
+    """Awaits a job and returns its result, or returns 202 with the job for polling"""
+    if not wait:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(job.as_dict()),
+            headers={"Location": f"/jobs/{job.id}"}
+        )
+    await jobs.wait(job)
+    if job.status != "completed":
+        raise HTTPException(status_code=400, detail=job.error or f"Job {job.status}")
+    return job.future.result()
+
+# Serializers for cached bodies; the JSON matches what the response_model would produce
+project_json = TypeAdapter(schemas.Project)
+task_list_json = TypeAdapter(List[schemas.Task])
+any_json = TypeAdapter(Any)
+
+# Sent with responses whose format is negotiated from the Accept header
+VARY_ACCEPT = {"Vary": "Accept"}
+
+async def project_version(db: AsyncSession, project_id: int) -> Optional[int]:
+    return (await db.execute(select(Project.version).where(Project.id == project_id))).scalar()
+
+async def projects_version(db: AsyncSession) -> str:
+    """Changes whenever a project is added or any project's version is bumped"""
+    count, last_id, versions = (await db.execute(
+        select(func.count(Project.id), func.max(Project.id), func.coalesce(func.sum(Project.version), 0))
+    )).one()
+    return f"{count}.{last_id or 0}.{versions}"
+
+# Project listing pages
+PROJECT_PAGE_SIZE = 100
+MAX_PROJECT_PAGE_SIZE = 1000
+PROJECT_SUMMARY_FIELDS = (
+    "name", "description", "start_date", "end_date", "created_at", "updated_at", "created_by",
+    "task_count", "percent_complete", "computed_finish"
+)
+PROJECT_COLUMNS = (
+    "name", "description", "start_date", "end_date", "created_at", "updated_at", "created_by"
+)
+
+# SQLite's julianday() of 1970-01-01, for turning aggregated finishes back into datetimes
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def julian_to_datetime(julian_day: Optional[float]) -> Optional[datetime]:
+    if julian_day is None:
+        return None
+    return datetime(1970, 1, 1) + timedelta(days=julian_day - UNIX_EPOCH_JULIAN_DAY)
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """A datetime from a query as the naive UTC the database stores; aware ones are converted"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def project_summary_aggregates():
+    """Task count, work-weighted progress and latest finish per project, grouped in SQL"""
+    progress = func.coalesce(Task.progress, 0)
+    total_work = func.sum(Task.work_hours)
+    return select(
+        Task.project_id,
+        func.count(Task.id).label("task_count"),
+        case(
+            (total_work > 0, func.sum(progress * Task.work_hours) / total_work),
+            else_=func.avg(progress)
+        ).label("percent_complete"),
+        func.max(task_finish_day()).label("computed_finish")
+    ).group_by(Task.project_id)
+
+async def project_summaries(
+    db: AsyncSession,
+    cursor: Optional[int],
+    limit: int,
+    fields: Tuple[str, ...],
+    include_tasks: bool
+) -> Tuple[bytes, Dict[str, str]]:
+    """One page of the project listing and its X-Next-Cursor header"""
+    columns = [getattr(Project, name) for name in PROJECT_COLUMNS if name in fields]
+    page_query = select(Project.id, *columns).order_by(Project.id).limit(limit + 1)
+    if cursor is not None:
+        page_query = page_query.where(Project.id > cursor)
+    page = (await db.execute(page_query)).all()
+    headers = {}
+    if len(page) > limit:
+        page = page[:limit]
+        headers["X-Next-Cursor"] = str(page[-1].id)
+    
+    project_ids = [row.id for row in page]
+    aggregates = {}
+    if project_ids and {"task_count", "percent_complete", "computed_finish"} & set(fields):
+        aggregates = {
+            row.project_id: row
+            for row in (await db.execute(
+                project_summary_aggregates().where(Task.project_id.in_(project_ids))
+            )).all()
+        }
+    tasks: Dict[int, List[Task]] = {}
+    if project_ids and include_tasks:
+        for task in (await db.execute(
+            select(Task).where(Task.project_id.in_(project_ids)).order_by(Task.id)
+        )).scalars():
+            tasks.setdefault(task.project_id, []).append(task)
+    
+    summaries = []
+    for row in page:
+        summary = {"id": row.id}
+        for name in PROJECT_COLUMNS:
+            if name in fields:
+                summary[name] = getattr(row, name)
+        totals = aggregates.get(row.id)
+        if "task_count" in fields:
+            summary["task_count"] = totals.task_count if totals else 0
+        if "percent_complete" in fields:
+            summary["percent_complete"] = float(totals.percent_complete or 0) if totals else 0.0
+        if "computed_finish" in fields:
+            summary["computed_finish"] = julian_to_datetime(totals.computed_finish if totals else None)
+        if include_tasks:
+            summary["tasks"] = task_list_json.validate_python(
+                tasks.get(row.id, []), from_attributes=True
+            )
+        summaries.append(summary)
+    return any_json.dump_json(summaries), headers
+
+async def versioned_response(
+    request: Request,
+    key: Tuple,
+    read_version: Callable[[], Awaitable[Any]],
+    build: Callable[[], Awaitable[Any]],
+    not_found: str = "Project not found",
+    media_type: str = "application/json"
+) -> Response:
+    """Serves a read from its version: 304 when the client's ETag is current,
+    the cached body when one exists, and otherwise a freshly built body.
+
+    ``build`` returns the body, or the body and headers to cache with it.
+    Reads are not one snapshot, so a body is only cached (and tagged) if
+    the version did not move while it was built. Responses whose format
+    is negotiated pass their ``media_type``, which also goes in the key
+    and the ETag.
+    """
+    version = await read_version()
+    if version is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    # The endpoint and project id; query variants share a URL's tag namespace anyway
+    tag = [part for part in key[:2] if part is not None]
+    if media_type != "application/json":
+        tag.append(media_type.rsplit(".", 1)[-1])
+        key = key + (media_type,)
+    etag = make_etag(*tag, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    cached = response_cache.get(key + (version,))
+    if cached is None:
+        body = await build()
+        body, body_headers = body if isinstance(body, tuple) else (body, {})
+        if await read_version() == version:
+            response_cache.put(key + (version,), body, body_headers)
+        else:
+            headers = {"Cache-Control": "no-cache"}
+    else:
+        body, body_headers = cached
+    return Response(content=body, media_type=media_type, headers={**headers, **body_headers})
+
+def task_cost():
+    """A task's cost from the assigned resources' rates, as a column of a Task query"""
+    # Correlated, so reading one task only reads that task's assignments
+    return (
+        select(func.sum(
+            TaskResourceAssignment.assigned_hours * func.coalesce(Resource.cost_per_hour, 0)
+        ))
+        .join(Resource, Resource.id == TaskResourceAssignment.resource_id)
+        .where(TaskResourceAssignment.task_id == Task.id)
+        .correlate(Task)
+        .scalar_subquery()
+    )
+
+def wbs_rows():
+    """A task's own rollup inputs, with its cost"""
+    cost = task_cost()
+    return select(
+        Task.id,
+        Task.parent_id,
+        Task.title,
+        func.coalesce(Task.actual_start_date, Task.earliest_start_date).label("start"),
+        task_finish().label("end"),
+        Task.duration,
+        Task.work_hours,
+        Task.progress,
+        cost.label("cost")
+    )
+
+def refresh_task_wbs(db: Session, task: Task):
+    """Updates the cached rollup of the task's project along the task's ancestor chain"""
+    row = db.execute(wbs_rows().where(Task.id == task.id)).first()
+    if row is not None:
+        wbs_rollups.update_task(task.project_id, row)
+
+# Task columns published on the change feed
+FEED_TASK_FIELDS = (
+    "title", "description", "priority", "status", "duration", "work_hours", "progress",
+    "earliest_start_date", "latest_start_date", "earliest_finish_date",
+    "actual_start_date", "actual_end_date",
+    "is_milestone", "is_locked", "parent_id", "project_id"
+)
+
+def task_fields(task: Task):
+    return jsonable_encoder({field: getattr(task, field) for field in FEED_TASK_FIELDS})
+
+def publish_reset(project_id: int, reason: str):
+    """Tells feed clients to reload the project instead of applying deltas"""
+    change_feed.publish(project_id, "reset", {"reason": reason})
+
+def refresh_task_allocations(db: Session, task_id: int):
+    """Re-books one task in the allocation index after it or its assignments changed"""
+    if allocation_index.loaded:
+        allocation_index.update_task(
+            task_id,
+            db.execute(allocation_rows().where(TaskResourceAssignment.task_id == task_id)).all()
+        )
+
+def store_schedule_dates(project_id: int, entries: Optional[Dict[int, Dict]] = None):
+    """Writes schedule entries to the tasks as earliest/latest start and earliest finish dates.
+
+    ``entries`` are the CPM entries that changed, or None for the whole
+    cached schedule. Offsets become dates in the project's working
+    calendar, and only tasks whose dates moved are written, with one bulk
+    UPDATE that also bumps the project version.
+    """
+    with dates_lock:
+        if entries is None:
+            state = schedule_cache.peek(project_id)
+            if state is None:
+                return
+            with schedule_cache.lock:
+                entries = {task_id: state.entry(task_id) for task_id in state.durations}
+        if not entries:
+            return
+        db = SessionLocal()
+        try:
+            loaded = calendars.get(project_id, lambda: load_calendars(db, project_id))
+            if loaded is None:
+                return
+            calendar, resource_calendars = loaded
+            dates = schedule_dates(
+                calendar,
+                entries,
+                resource_calendars,
+                resource_tasks(db, project_id, resource_calendars) if resource_calendars else None
+            )
+            changed = write_schedule_dates(db, dates)
+            if not changed:
+                return
+            bump_project_versions(db, [project_id])
+            db.commit()
+        except SQLAlchemyError:
+            # The schedule itself is cached and served either way; the dates
+            # are written again by the project's next recompute
+            db.rollback()
+            return
+        finally:
+            db.close()
+
+    if len(changed) > DATES_REFRESH_LIMIT:
+        wbs_rollups.invalidate(project_id)
+        allocation_index.invalidate()
+        publish_reset(project_id, "dates")
+        return
+    read_db = ReadSessionLocal()
+    try:
+        for row in read_db.execute(wbs_rows().where(Task.id.in_(list(changed)))):
+            wbs_rollups.update_task(project_id, row)
+        if allocation_index.loaded:
+            bookings = {task_id: [] for task_id in changed}
+            for row in read_db.execute(
+                allocation_rows().where(TaskResourceAssignment.task_id.in_(list(changed)))
+            ):
+                bookings[row.task_id].append(row)
+            for task_id, rows in bookings.items():
+                allocation_index.update_task(task_id, rows)
+    finally:
+        read_db.close()
+    change_feed.publish(project_id, "dates", {
+        "tasks": jsonable_encoder({
+            task_id: {
+                "earliest_start_date": earliest,
+                "latest_start_date": latest,
+                "earliest_finish_date": finish
+            }
+            for task_id, (earliest, latest, finish) in changed.items()
+        })
+    })
+
+def refresh_project_dates(db: Session, project_id: int):
+    """Rewrites a project's task dates after its calendar changed.
+
+    The calendar is already committed, so a project that can't be
+    scheduled keeps its dates until its next successful recompute
+    instead of failing the request.
+    """
+    calendars.invalidate(project_id)
+    # Bookings cover working days only, so they move even where dates don't
+    allocation_index.invalidate()
+    flush_schedule_changes(project_id)
+    if schedule_cache.peek(project_id) is not None:
+        store_schedule_dates(project_id)
+        return
+    try:
+        # Computing the schedule stores its dates
+        load_schedule_state(db, project_id)
+    except (HTTPException, SchedulingError):
+        pass  # No tasks or no schedule, so no dates to move
+
 # Resource endpoints
 @app.post("/resources/", response_model=schemas.Resource)
 def create_resource(resource: schemas.ResourceCreate, db: Session = Depends(get_db)):
@@ -39,15 +689,38 @@ def create_resource(resource: schemas.ResourceCreate, db: Session = Depends(get_
     db.add(db_resource)
     db.commit()
     db.refresh(db_resource)
+    allocation_index.set_capacity(db_resource.id, db_resource.capacity_hours_per_day)
     return db_resource
 
 @app.get("/resources/", response_model=List[schemas.Resource])
-def list_resources(db: Session = Depends(get_db)):
-    return db.query(Resource).all()
+async def list_resources(db: AsyncSession = Depends(get_async_read_db)):
+    return (await db.execute(select(Resource))).scalars().all()
+
+@app.get("/resources/overallocations")
+def list_overallocations(
+    window_start: Optional[datetime] = Query(None, alias="from"),
+    window_end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db)
+):
+    """Returns every resource whose booked hours per day exceed its capacity"""
+    return load_allocation_index(db).overallocations(window_start, window_end)
+
+@app.get("/resources/{resource_id}/allocation")
+def get_resource_allocation(
+    resource_id: int,
+    window_start: Optional[datetime] = Query(None, alias="from"),
+    window_end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db)
+):
+    """Returns the resource's load profile in hours per day"""
+    allocation = load_allocation_index(db).allocation(resource_id, window_start, window_end)
+    if allocation is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return allocation
 
 @app.get("/resources/{resource_id}", response_model=schemas.Resource)
-def get_resource(resource_id: int, db: Session = Depends(get_db)):
-    resource = db.query(Resource).filter(Resource.id == resource_id).first()
+async def get_resource(resource_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    resource = await db.get(Resource, resource_id)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     return resource
@@ -61,16 +734,128 @@ def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)
     db.refresh(db_project)
     return db_project
 
-@app.get("/projects/", response_model=List[schemas.Project])
-def list_projects(db: Session = Depends(get_db)):
-    return db.query(Project).all()
+@app.get("/projects/", response_model=List[schemas.ProjectSummary])
+async def list_projects(
+    request: Request,
+    cursor: Optional[int] = None,
+    limit: int = Query(PROJECT_PAGE_SIZE, ge=1, le=MAX_PROJECT_PAGE_SIZE),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Lists project summaries ordered by id, a page at a time.
+
+    Pass the X-Next-Cursor header of a page as ``cursor`` to get the next
+    one; the last page has no such header. ``fields`` is a comma-separated
+    subset of the summary fields (the id is always included), and
+    ``include=tasks`` adds each project's tasks.
+    """
+    selected = PROJECT_SUMMARY_FIELDS
+    if fields:
+        selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+        unknown = sorted(set(selected) - set(PROJECT_SUMMARY_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    includes = {name.strip() for name in include.split(",")} if include else set()
+    if includes - {"tasks"}:
+        raise HTTPException(status_code=400, detail="include only supports tasks")
+    
+    async def build():
+        return await project_summaries(db, cursor, limit, selected, "tasks" in includes)
+    
+    variant = (cursor, limit, selected, "tasks" in includes)
+    return await versioned_response(
+        request, ("projects", None, variant), lambda: projects_version(db), build
+    )
 
 @app.get("/projects/{project_id}", response_model=schemas.Project)
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(Project).filter(Project.id == project_id).first()
+async def get_project(project_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    async def build():
+        project = await db.get(Project, project_id, options=[selectinload(Project.tasks)])
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return project_json.dump_json(project_json.validate_python(project, from_attributes=True))
+    
+    return await versioned_response(
+        request, ("project", project_id), lambda: project_version(db, project_id), build
+    )
+
+# Calendar endpoints
+@app.get("/projects/{project_id}/calendar", response_model=schemas.ProjectCalendar)
+def get_project_calendar(project_id: int, db: Session = Depends(get_read_db)):
+    project = db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    exceptions = db.execute(
+        select(CalendarException.date, CalendarException.is_working)
+        .where(CalendarException.project_id == project_id)
+        .order_by(CalendarException.date)
+    ).all()
+    return schemas.ProjectCalendar(
+        working_weekdays=mask_weekdays(project.working_weekdays),
+        holidays=[day for day, is_working in exceptions if not is_working],
+        working_dates=[day for day, is_working in exceptions if is_working]
+    )
+
+@app.put("/projects/{project_id}/calendar", response_model=schemas.ProjectCalendar)
+def update_project_calendar(
+    project_id: int,
+    calendar: schemas.ProjectCalendar,
+    db: Session = Depends(get_db)
+):
+    """Replaces the project's working weekdays and exceptions and moves its task dates to match"""
+    project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    if any(weekday not in range(7) for weekday in calendar.working_weekdays):
+        raise HTTPException(status_code=400, detail="Weekdays are numbered 0 (Monday) to 6 (Sunday)")
+    if set(calendar.holidays) & set(calendar.working_dates):
+        raise HTTPException(status_code=400, detail="A date can't be both a holiday and a working date")
+    
+    project.working_weekdays = weekday_mask(calendar.working_weekdays)
+    db.execute(delete(CalendarException).where(CalendarException.project_id == project_id))
+    db.add_all(
+        [CalendarException(project_id=project_id, date=day, is_working=False) for day in calendar.holidays]
+        + [CalendarException(project_id=project_id, date=day, is_working=True) for day in calendar.working_dates]
+    )
+    db.commit()
+    refresh_project_dates(db, project_id)
+    return calendar
+
+@app.get("/resources/{resource_id}/calendar", response_model=schemas.ResourceCalendar)
+def get_resource_calendar(resource_id: int, db: Session = Depends(get_read_db)):
+    if not db.get(Resource, resource_id):
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return schemas.ResourceCalendar(days_off=db.execute(
+        select(CalendarException.date)
+        .where(CalendarException.resource_id == resource_id)
+        .order_by(CalendarException.date)
+    ).scalars().all())
+
+@app.put("/resources/{resource_id}/calendar", response_model=schemas.ResourceCalendar)
+def update_resource_calendar(
+    resource_id: int,
+    calendar: schemas.ResourceCalendar,
+    db: Session = Depends(get_db)
+):
+    """Replaces the resource's days off and moves the dates of the tasks assigned to it"""
+    if not db.get(Resource, resource_id):
+        raise HTTPException(status_code=404, detail="Resource not found")
+    db.execute(delete(CalendarException).where(CalendarException.resource_id == resource_id))
+    db.add_all([
+        CalendarException(resource_id=resource_id, date=day, is_working=False)
+        for day in set(calendar.days_off)
+    ])
+    db.commit()
+    calendars.invalidate()
+    project_ids = db.execute(
+        select(Task.project_id).distinct()
+        .join(TaskResourceAssignment, TaskResourceAssignment.task_id == Task.id)
+        .where(TaskResourceAssignment.resource_id == resource_id)
+    ).scalars().all()
+    for project_id in project_ids:
+        refresh_project_dates(db, project_id)
+    return calendar
 
 # Task endpoints
 @app.post("/tasks/", response_model=schemas.Task)
@@ -93,8 +878,18 @@ def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
             )
             db.add(db_assignment)
     
+    bump_project_versions(db, [db_task.project_id])
     db.commit()
     db.refresh(db_task)
+    dependency_indexes.add_task(db_task.project_id, db_task.id)
+    changes = ScheduleChanges()
+    changes.set_duration(db_task.id, db_task.duration)
+    recalc_queue.submit(db_task.project_id, changes)
+    refresh_task_allocations(db, db_task.id)
+    refresh_task_wbs(db, db_task)
+    change_feed.publish(db_task.project_id, "task", {
+        "task_id": db_task.id, "created": True, "fields": task_fields(db_task)
+    })
     return db_task
 
 @app.put("/tasks/{task_id}", response_model=schemas.Task)
@@ -106,6 +901,9 @@ def update_task(
     db_task = db.query(Task).filter(Task.id == task_id).first()
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
+    previous_project_id = db_task.project_id
+    previous_duration = db_task.duration
+    previous_fields = task_fields(db_task)
     
     # Update task fields
     for key, value in task_update.dict(exclude={'resource_assignments'}).items():
@@ -126,8 +924,31 @@ def update_task(
             )
             db.add(db_assignment)
     
+    bump_project_versions(db, [previous_project_id, db_task.project_id])
     db.commit()
     db.refresh(db_task)
+    if db_task.project_id != previous_project_id:
+        dependency_indexes.invalidate(previous_project_id)
+        dependency_indexes.invalidate(db_task.project_id)
+        recalc_queue.invalidate(previous_project_id)
+        recalc_queue.invalidate(db_task.project_id)
+        wbs_rollups.invalidate(previous_project_id)
+        wbs_rollups.invalidate(db_task.project_id)
+        publish_reset(previous_project_id, f"task {task_id} moved to another project")
+        publish_reset(db_task.project_id, f"task {task_id} moved from another project")
+    else:
+        if db_task.duration != previous_duration:
+            changes = ScheduleChanges()
+            changes.set_duration(task_id, db_task.duration)
+            recalc_queue.submit(db_task.project_id, changes)
+        refresh_task_wbs(db, db_task)
+        fields = task_fields(db_task)
+        changed = {
+            field: value for field, value in fields.items() if previous_fields[field] != value
+        }
+        if changed:
+            change_feed.publish(db_task.project_id, "task", {"task_id": task_id, "fields": changed})
+    refresh_task_allocations(db, task_id)
     return db_task
 
 @app.post("/tasks/{task_id}/dependencies/")
@@ -137,87 +958,1044 @@ def create_dependency(
     db: Session = Depends(get_db)
 ):
     # Verify tasks exist
-    if not db.query(Task).filter(Task.id == task_id).first():
+    task_projects = dict(
+        db.query(Task.id, Task.project_id)
+        .filter(Task.id.in_([task_id, dependency.predecessor_id]))
+        .all()
+    )
+    if task_id not in task_projects:
         raise HTTPException(status_code=404, detail="Task not found")
-    if not db.query(Task).filter(Task.id == dependency.predecessor_id).first():
+    if dependency.predecessor_id not in task_projects:
         raise HTTPException(status_code=404, detail="Predecessor task not found")
     
-    db_dependency = TaskDependency(
-        successor_id=task_id,
-        **dependency.dict()
-    )
-    db.add(db_dependency)
+    project_id = task_projects[task_id]
+    predecessor_project_id = task_projects[dependency.predecessor_id]
+    cross_project = predecessor_project_id != project_id
     
-    # Check for circular dependencies
-    scheduler = ProjectScheduler()
-    tasks = db.query(Task).all()
-    dependencies = db.query(TaskDependency).all()
-    scheduler.build_dependency_graph(tasks, dependencies)
+    # Check for circular dependencies against the project's dependency index,
+    # or against every project when a cycle could run through another one
+    with dependency_indexes.lock:
+        index = load_dependency_index(db, project_id)
+        if cross_project or index.external:
+            circular = dependency.predecessor_id == task_id or dependency_path_exists(
+                db, task_id, dependency.predecessor_id
+            )
+        else:
+            circular = index.would_create_cycle(dependency.predecessor_id, task_id)
+        if circular:
+            raise HTTPException(
+                status_code=400,
+                detail="This dependency would create a circular reference"
+            )
+        
+        db_dependency = TaskDependency(
+            successor_id=task_id,
+            **dependency.dict()
+        )
+        db.add(db_dependency)
+        bump_project_versions(db, task_projects.values())
+        db.commit()
+        index.add_edge(
+            dependency.predecessor_id, task_id,
+            external=[dependency.predecessor_id] if cross_project else ()
+        )
+        if cross_project:
+            dependency_indexes.add_edge(
+                predecessor_project_id, dependency.predecessor_id, task_id, external=[task_id]
+            )
     
-    if scheduler.detect_cycles():
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="This dependency would create a circular reference"
+    if not cross_project:
+        changes = ScheduleChanges()
+        changes.add_edge(
+            dependency.predecessor_id,
+            task_id,
+            dependency.dependency_type,
+            dependency.lag_time
+        )
+        recalc_queue.submit(task_projects[task_id], changes)
+    else:
+        recalc_queue.invalidate(task_projects[task_id])
+    for feed_project_id in set(task_projects.values()):
+        change_feed.publish(feed_project_id, "dependency", {
+            "action": "added",
+            "predecessor_id": dependency.predecessor_id,
+            "successor_id": task_id,
+            "dependency_type": dependency.dependency_type.value,
+            "lag_time": dependency.lag_time
+        })
+    if cross_project:
+        # The successor's schedule was dropped rather than patched
+        publish_reset(task_projects[task_id], "cross-project dependency added")
+    return {"status": "success"}
+
+@app.delete("/tasks/{task_id}/dependencies/{predecessor_id}")
+def delete_dependency(
+    task_id: int,
+    predecessor_id: int,
+    db: Session = Depends(get_db)
+):
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    with dependency_indexes.lock:
+        deleted = (
+            db.query(TaskDependency)
+            .filter(
+                TaskDependency.successor_id == task_id,
+                TaskDependency.predecessor_id == predecessor_id
+            )
+            .delete()
         )
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Dependency not found")
+        predecessor_project_id = db.execute(
+            select(Task.project_id).where(Task.id == predecessor_id)
+        ).scalar()
+        bump_project_versions(db, [task.project_id, predecessor_project_id])
+        db.commit()
+        dependency_indexes.remove_edge(task.project_id, predecessor_id, task_id)
+        if predecessor_project_id not in (None, task.project_id):
+            dependency_indexes.remove_edge(predecessor_project_id, predecessor_id, task_id)
     
-    db.commit()
+    if predecessor_project_id == task.project_id:
+        changes = ScheduleChanges()
+        changes.remove_edge(predecessor_id, task_id)
+        recalc_queue.submit(task.project_id, changes)
+    else:
+        # The predecessor was a boundary of the cached schedule, not an edge
+        recalc_queue.invalidate(task.project_id)
+    for feed_project_id in {task.project_id, predecessor_project_id} - {None}:
+        change_feed.publish(feed_project_id, "dependency", {
+            "action": "removed", "predecessor_id": predecessor_id, "successor_id": task_id
+        })
+    if predecessor_project_id != task.project_id:
+        publish_reset(task.project_id, "cross-project dependency removed")
     return {"status": "success"}
 
-@app.post("/projects/{project_id}/schedule")
-def calculate_project_schedule(project_id: int, db: Session = Depends(get_db)):
-    # Get project tasks and dependencies
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
-    if not tasks:
-        raise HTTPException(status_code=404, detail="Project not found or has no tasks")
+@app.get("/tasks/{task_id}/impact")
+def get_task_impact(
+    task_id: int,
+    direction: str = Query("down", pattern="^(up|down)$"),
+    depth: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_read_db)
+):
+    """Tasks this task holds up (down) or that hold it up (up), nearest first.
+
+    Each comes with its hops from the task and, along the driving path,
+    the accumulated lag and the days the upstream task of the pair can
+    slip before the downstream one moves (see impact.task_impact). Only
+    tasks of the task's own project are listed. The rows are JSON-ready,
+    so they skip jsonable_encoder.
+    """
+    from .services.impact import task_impact
+    task = db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    state = load_schedule_state(db, task.project_id)
+    with schedule_cache.lock:
+        if task_id not in state.durations:
+            raise HTTPException(status_code=404, detail="Task not found")
+        impacted = task_impact(state, task_id, direction, depth)
+    return JSONResponse(content={
+        "task_id": task_id,
+        "project_id": task.project_id,
+        "direction": direction,
+        "depth": depth,
+        "count": len(impacted),
+        "tasks": impacted
+    })
+
+@app.post("/projects/{project_id}/import")
+def import_project_tasks(
+    project_id: int,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Bulk-imports a CSV/XLSX task sheet; bad rows are reported, not fatal"""
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    file_format = (format or (file.filename or "").rsplit(".", 1)[-1]).lower()
+    try:
+        report = import_tasks(db, project_id, file.file, file_format)
+    except TaskImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    dependencies = (
-        db.query(TaskDependency)
-        .filter(TaskDependency.successor_id.in_([t.id for t in tasks]))
-        .all()
-    )
+    # Imported edges also reach the indexes of the projects they come from;
+    # those projects' schedules don't change, as new tasks are only successors
+    for linked_project_id in [project_id, *report["linked_projects"]]:
+        dependency_indexes.invalidate(linked_project_id)
+    recalc_queue.invalidate(project_id)
+    allocation_index.invalidate()
+    wbs_rollups.invalidate(project_id)
+    publish_reset(project_id, "tasks imported")
+    return report
+
+@app.post("/projects/{project_id}/schedule")
+async def calculate_project_schedule(
+    project_id: int,
+    request: Request,
+    changes_only: bool = False,
+    wait: bool = True,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Returns the project's CPM schedule plus the tasks whose values moved
+    since the previous call; changes_only=true omits the full task list.
+
+    A cached schedule is answered directly. Otherwise CPM runs in the job
+    pool; wait=false returns 202 and the job to poll at /jobs/{job_id}.
+    Clients that accept columnar.MEDIA_TYPE get the schedule as typed
+    columns (see columnar.encode_schedule) instead of JSON."""
+    compact = columnar.accepts_columnar(request.headers.get("accept"))
     
-    # Calculate schedule
-    scheduler = ProjectScheduler()
-    scheduler.build_dependency_graph(tasks, dependencies)
+    def encoded(response):
+        if compact and isinstance(response, dict):
+            return Response(
+                content=columnar.encode_schedule(response),
+                media_type=columnar.MEDIA_TYPE,
+                headers=VARY_ACCEPT
+            )
+        return response
     
-    try:
-        schedule = scheduler.calculate_critical_path()
-        return {
+    def respond(state: ScheduleState):
+        with schedule_cache.lock:
+            changed_tasks = schedule_cache.pop_changes(project_id)
+            schedule = state.result()
+        response = {
             "project_id": project_id,
             "critical_path": schedule["critical_path"],
             "project_duration": schedule["project_duration"],
-            "task_schedules": schedule["schedule"]
+            "changed_tasks": changed_tasks
         }
+        if not changes_only:
+            response["task_schedules"] = schedule["schedule"]
+        return response
+    
+    await run_in_threadpool(flush_schedule_changes, project_id)
+    state = schedule_cache.peek(project_id)
+    if state is not None:
+        return encoded(await run_in_threadpool(respond, state))
+    
+    from .services.cpm_engine import CompiledGraph, timed_critical_path
+    generation = schedule_cache.generation(project_id)
+    tasks, dependencies, boundaries = await load_project_graph_async(db, project_id)
+    started = time.perf_counter()
+    compiled = await run_in_threadpool(CompiledGraph.from_records, tasks, dependencies, boundaries)
+    build_seconds = time.perf_counter() - started
+    
+    def finalize(output):
+        result, timings = output
+        metrics.record_phases(dict(timings, graph_build=build_seconds))
+        state = ScheduleState(compiled, result, boundaries)
+        return respond(schedule_cache.store(project_id, state, generation))
+    
+    job = jobs.submit(
+        "schedule", timed_critical_path, compiled, project_id=project_id, finalize=finalize
+    )
+    return encoded(await job_response(job, wait))
+
+@app.post("/projects/{project_id}/level")
+async def level_project_resources(
+    project_id: int,
+    request: Optional[schemas.LevelingRequest] = None,
+    wait: bool = True,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Levels the project's resources without changing stored tasks"""
+    from .services.leveling import level_schedule
+    from .services.scheduler import ProjectScheduler
+    request = request or schemas.LevelingRequest()
+    tasks, dependencies, boundaries = await load_project_graph_async(db, project_id)
+    assignments = (await db.execute(
+        select(
+            TaskResourceAssignment.task_id,
+            TaskResourceAssignment.resource_id,
+            TaskResourceAssignment.assigned_hours
+        )
+        .join(Task, Task.id == TaskResourceAssignment.task_id)
+        .where(Task.project_id == project_id)
+    )).all()
+    resource_capacity = {
+        resource_id: capacity
+        for resource_id, capacity in await db.execute(
+            select(Resource.id, Resource.capacity_hours_per_day)
+            .where(Resource.id.in_({a.resource_id for a in assignments}))
+        )
+        if capacity
+    }
+    resource_capacity.update(request.resource_capacity)
+    
+    def prepare():
+        scheduler = ProjectScheduler()
+        scheduler.build_dependency_graph(tasks, dependencies, boundaries)
+        return scheduler.leveling_inputs(tasks, assignments)
+    
+    try:
+        compiled, demands, priorities = await run_in_threadpool(prepare)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    def finalize(leveled):
+        return {
+            "project_id": project_id,
+            "project_duration": leveled["project_duration"],
+            "unleveled_duration": leveled["unleveled_duration"],
+            "overallocated_tasks": leveled["overallocated"],
+            "task_schedules": leveled["schedule"]
+        }
+    
+    job = jobs.submit(
+        "level",
+        level_schedule,
+        compiled,
+        demands,
+        resource_capacity,
+        priorities=priorities,
+        default_capacity=request.default_capacity,
+        project_id=project_id,
+        finalize=finalize
+    )
+    return await job_response(job, wait)
+
+@app.post("/projects/{project_id}/simulate")
+async def simulate_project_schedule(
+    project_id: int,
+    request: Optional[schemas.SimulationRequest] = None,
+    wait: bool = True,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Monte Carlo finish-date percentiles and per-task criticality indices"""
+    from .services.cpm_engine import CompiledGraph
+    from .services.simulation import simulate_project
+    request = request or schemas.SimulationRequest()
+    if request.optimistic_factor > 1:
+        raise HTTPException(status_code=400, detail="optimistic_factor must not exceed 1")
+    if any(not 0 <= p <= 100 for p in request.percentiles):
+        raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+    tasks, dependencies, boundaries = await load_project_graph_async(db, project_id)
+    start_date = (await db.execute(
+        select(Project.start_date).where(Project.id == project_id)
+    )).scalar()
+    compiled = await run_in_threadpool(CompiledGraph.from_records, tasks, dependencies, boundaries)
+    
+    def finalize(result):
+        return {
+            "project_id": project_id,
+            "deterministic_duration": result["deterministic_duration"],
+            "samples": result["samples"],
+            "mean_duration": result["mean_duration"],
+            "std_duration": result["std_duration"],
+            "min_duration": result["min_duration"],
+            "max_duration": result["max_duration"],
+            "percentiles": [
+                {
+                    "percentile": p,
+                    "duration": duration,
+                    "finish_date": start_date + timedelta(days=duration) if start_date else None
+                }
+                for p, duration in result["percentiles"].items()
+            ],
+            "criticality": result["criticality"]
+        }
+    
+    job = jobs.submit(
+        "simulate",
+        simulate_project,
+        compiled,
+        request.samples,
+        distribution=request.distribution,
+        optimistic_factor=request.optimistic_factor,
+        pessimistic_factor=request.pessimistic_factor,
+        percentiles=request.percentiles,
+        seed=request.seed,
+        project_id=project_id,
+        finalize=finalize
+    )
+    return await job_response(job, wait)
+
+# Scenario endpoints
+def load_scenario_store(db: Session) -> ScenarioStore:
+    """Returns the scenario store, loading the persisted scenarios on first use"""
+    with scenario_store.lock:
+        if not scenario_store.loaded:
+            scenario_store.load(
+                Scenario.from_changes(
+                    row.id, row.project_id, row.name, row.changes,
+                    persisted=True, created_at=row.created_at
+                )
+                for row in db.query(SavedScenario)
+            )
+    return scenario_store
+
+def read_scenario_store() -> ScenarioStore:
+    read_db = ReadSessionLocal()
+    try:
+        return load_scenario_store(read_db)
+    finally:
+        read_db.close()
+
+def read_calendars(project_id: int):
+    """The project's calendars from the registry, loaded with a session of their own"""
+    def load():
+        read_db = ReadSessionLocal()
+        try:
+            return load_calendars(read_db, project_id)
+        finally:
+            read_db.close()
+    return calendars.get(project_id, load)
+
+def project_calendar(project_id: int):
+    loaded = read_calendars(project_id)
+    return loaded[0] if loaded is not None else None
+
+@app.post("/projects/{project_id}/scenarios", response_model=schemas.Scenario)
+def create_scenario(project_id: int, scenario: schemas.ScenarioCreate, db: Session = Depends(get_db)):
+    """Adds a what-if scenario: overrides of the project's durations, lags and dependencies"""
+    if not db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    if any(duration < 0 for duration in scenario.durations.values()):
+        raise HTTPException(status_code=400, detail="Durations must be non-negative")
+    store = load_scenario_store(db)
+    what_if = Scenario(
+        store.next_id(),
+        project_id,
+        scenario.name,
+        durations=scenario.durations,
+        lags={(lag.predecessor_id, lag.successor_id): lag.lag_time for lag in scenario.lags},
+        removed_dependencies=[
+            (dep.predecessor_id, dep.successor_id) for dep in scenario.removed_dependencies
+        ],
+        added_dependencies=[
+            (dep.predecessor_id, dep.successor_id, dep.dependency_type, dep.lag_time)
+            for dep in scenario.added_dependencies
+        ],
+        persisted=scenario.persist
+    )
+    task_ids = what_if.task_ids()
+    unknown = task_ids - set(db.execute(
+        select(Task.id).where(Task.project_id == project_id, Task.id.in_(task_ids))
+    ).scalars())
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tasks not in project {project_id}: {', '.join(map(str, sorted(unknown)))}"
+        )
+    if scenario.persist:
+        db.add(SavedScenario(
+            id=what_if.id,
+            project_id=project_id,
+            name=what_if.name,
+            changes=what_if.changes(),
+            created_at=what_if.created_at
+        ))
+        db.commit()
+    store.add(what_if)
+    return what_if.as_dict()
+
+@app.get("/projects/{project_id}/scenarios", response_model=List[schemas.Scenario])
+def list_scenarios(project_id: int, db: Session = Depends(get_read_db)):
+    return [scenario.as_dict() for scenario in load_scenario_store(db).list(project_id)]
+
+@app.get("/projects/{project_id}/scenarios/{scenario_id}", response_model=schemas.Scenario)
+def get_scenario(project_id: int, scenario_id: int, db: Session = Depends(get_read_db)):
+    scenario = load_scenario_store(db).get(project_id, scenario_id)
+    if scenario is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return scenario.as_dict()
+
+@app.delete("/projects/{project_id}/scenarios/{scenario_id}")
+def delete_scenario(project_id: int, scenario_id: int, db: Session = Depends(get_db)):
+    store = load_scenario_store(db)
+    scenario = store.get(project_id, scenario_id)
+    if scenario is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    if scenario.persisted:
+        db.execute(delete(SavedScenario).where(SavedScenario.id == scenario_id))
+        db.commit()
+    store.remove(scenario_id)
+    return {"status": "success"}
+
+@app.post("/projects/{project_id}/scenarios/compare")
+async def compare_scenarios(
+    project_id: int,
+    request: Optional[schemas.ScenarioCompareRequest] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Finish date and critical path of many scenarios next to the project as it is.
+
+    Every scenario is its overrides applied to the project's compiled
+    graph, which is cached per project version, and the scenarios are
+    split over the worker processes. A scenario that can't be scheduled,
+    e.g. because it creates a cycle, reports an error instead.
+    """
+    from .services.cpm_engine import CompiledGraph
+    request = request or schemas.ScenarioCompareRequest()
+    store = await run_in_threadpool(read_scenario_store)
+    if request.scenario_ids is None:
+        selected = store.list(project_id)
+    else:
+        selected = [store.get(project_id, scenario_id) for scenario_id in request.scenario_ids]
+        unknown = [
+            scenario_id for scenario_id, scenario in zip(request.scenario_ids, selected)
+            if scenario is None
+        ]
+        if unknown:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Scenarios not found: {', '.join(map(str, unknown))}"
+            )
+    version = await project_version(db, project_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    graph = store.base(project_id, version)
+    if graph is None:
+        tasks, dependencies, boundaries = await load_project_graph_async(db, project_id)
+        graph = await run_in_threadpool(CompiledGraph.from_records, tasks, dependencies, boundaries)
+        # Boundaries move with other projects' versions, so only self-contained graphs are kept
+        if not boundaries:
+            store.set_base(project_id, version, graph)
+    
+    parts = max(1, min(jobs.max_workers, len(selected)))
+    submitted = [
+        jobs.submit(
+            "scenarios", evaluate_scenarios, graph, selected[part::parts],
+            base=part == 0, project_id=project_id
+        )
+        for part in range(parts)
+    ]
+    await asyncio.gather(*(jobs.wait(job) for job in submitted))
+    results = {}
+    for job in submitted:
+        if job.status != "completed":
+            raise HTTPException(status_code=400, detail=job.error or f"Job {job.status}")
+        results.update(job.future.result())
+    base = results.pop("base")
+    if "error" in base:
+        raise HTTPException(status_code=400, detail=base["error"])
+    
+    calendar = await run_in_threadpool(project_calendar, project_id)
+    durations = [base["project_duration"]] + [
+        result["project_duration"] for result in results.values() if "error" not in result
+    ]
+    finish_dates = dict(zip(durations, calendar.to_datetimes(durations))) if calendar else {}
+    base_critical = set(base["critical_path"])
+    compared = []
+    for scenario in selected:
+        result = results[scenario.id]
+        entry = {"id": scenario.id, "name": scenario.name}
+        if "error" in result:
+            entry["error"] = result["error"]
+        else:
+            critical = set(result["critical_path"])
+            entry.update(
+                project_duration=result["project_duration"],
+                finish_date=finish_dates.get(result["project_duration"]),
+                duration_change=result["project_duration"] - base["project_duration"],
+                critical_path=result["critical_path"],
+                critical_path_added=[task_id for task_id in result["critical_path"] if task_id not in base_critical],
+                critical_path_removed=[task_id for task_id in base["critical_path"] if task_id not in critical]
+            )
+        compared.append(entry)
+    return {
+        "project_id": project_id,
+        "base": {
+            "project_duration": base["project_duration"],
+            "finish_date": finish_dates.get(base["project_duration"]),
+            "critical_path": base["critical_path"]
+        },
+        "scenarios": compared
+    }
+
+# Baseline endpoints
+def live_schedule_columns(db: Session, project_id: int):
+    """The project's current schedule as the arrays of baselines.schedule_columns.
+
+    Raises a 400 when the project can't be scheduled (see load_schedule_state).
+    """
+    from .services.baselines import schedule_columns
+    
+    def load():
+        state = load_schedule_state(db, project_id)
+        with schedule_cache.lock:
+            earliest_start = dict(state.earliest_start)
+            durations = dict(state.durations)
+        rows = db.execute(
+            select(Task.id, Task.work_hours, task_cost()).where(Task.project_id == project_id)
+        ).all()
+        return schedule_columns(earliest_start, durations, rows)
+    
+    flush_schedule_changes(project_id)
+    version = db.execute(select(Project.version).where(Project.id == project_id)).scalar()
+    # The schedule generation also moves when another project's tasks it waits for move
+    key = None if version is None else (version, schedule_cache.generation(project_id))
+    return live_columns.get(project_id, key, load)
+
+def baseline_summaries():
+    """Baseline rows without their data"""
+    return select(
+        ScheduleBaseline.id,
+        ScheduleBaseline.project_id,
+        ScheduleBaseline.name,
+        ScheduleBaseline.task_count,
+        ScheduleBaseline.project_duration,
+        func.length(ScheduleBaseline.data).label("size_bytes"),
+        ScheduleBaseline.created_at
+    )
+
+@app.post("/projects/{project_id}/baselines", response_model=schemas.Baseline)
+def create_baseline(project_id: int, baseline: schemas.BaselineCreate, db: Session = Depends(get_db)):
+    """Snapshots the project's computed schedule: per-task start, finish, duration, work and cost"""
+    from .services.baselines import encode_baseline
+    if not db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    columns = live_schedule_columns(db, project_id)
+    db_baseline = ScheduleBaseline(
+        project_id=project_id,
+        name=baseline.name,
+        task_count=len(columns["task_id"]),
+        project_duration=float(columns["earliest_finish"].max(initial=0)),
+        data=encode_baseline(columns)
+    )
+    db.add(db_baseline)
+    db.commit()
+    return db.execute(baseline_summaries().where(ScheduleBaseline.id == db_baseline.id)).one()
+
+@app.get("/projects/{project_id}/baselines", response_model=List[schemas.Baseline])
+def list_baselines(project_id: int, db: Session = Depends(get_read_db)):
+    return db.execute(
+        baseline_summaries()
+        .where(ScheduleBaseline.project_id == project_id)
+        .order_by(ScheduleBaseline.id)
+    ).all()
+
+@app.delete("/projects/{project_id}/baselines/{baseline_id}")
+def delete_baseline(project_id: int, baseline_id: int, db: Session = Depends(get_db)):
+    deleted = db.execute(
+        delete(ScheduleBaseline)
+        .where(ScheduleBaseline.id == baseline_id, ScheduleBaseline.project_id == project_id)
+    ).rowcount
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Baseline not found")
+    db.commit()
+    return {"status": "success"}
+
+@app.get("/projects/{project_id}/baselines/{baseline_id}/variance")
+def get_baseline_variance(
+    project_id: int,
+    baseline_id: int,
+    changed_only: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """The live schedule against a baseline; variances are current minus baseline.
+
+    Returns the project duration and total work and cost of both, the
+    tasks added and removed since, and the per-task start, finish,
+    duration, work and cost variances; changed_only=false also lists the
+    tasks that didn't move.
+    """
+    from .services.baselines import decode_baseline, schedule_variance
+    data = db.execute(
+        select(ScheduleBaseline.data)
+        .where(ScheduleBaseline.id == baseline_id, ScheduleBaseline.project_id == project_id)
+    ).scalar()
+    if data is None:
+        raise HTTPException(status_code=404, detail="Baseline not found")
+    variance = schedule_variance(decode_baseline(data), live_schedule_columns(db, project_id), changed_only)
+    return {"project_id": project_id, "baseline_id": baseline_id, **variance}
+
+# Portfolio endpoints
+def cross_project_links():
+    """Selects the distinct (predecessor project, successor project) pairs of cross-project dependencies"""
+    pred_task, succ_task = aliased(Task), aliased(Task)
+    return (
+        select(pred_task.project_id, succ_task.project_id)
+        .distinct()
+        .select_from(TaskDependency)
+        .join(pred_task, pred_task.id == TaskDependency.predecessor_id)
+        .join(succ_task, succ_task.id == TaskDependency.successor_id)
+        .where(pred_task.project_id != succ_task.project_id)
+    )
+
+async def load_portfolio_graph(db: AsyncSession, project_ids: List[int]):
+    """The scheduling columns of several projects' tasks, with their project, and their incoming dependencies"""
+    project_tasks = select(Task.id).where(Task.project_id.in_(project_ids))
+    tasks = (await db.execute(
+        select(Task.id, Task.duration, Task.is_milestone, Task.is_locked, Task.project_id)
+        .where(Task.project_id.in_(project_ids))
+    )).all()
+    dependencies = (await db.execute(
+        select(
+            TaskDependency.predecessor_id,
+            TaskDependency.successor_id,
+            TaskDependency.dependency_type,
+            TaskDependency.lag_time
+        )
+        .where(TaskDependency.successor_id.in_(project_tasks))
+    )).all()
+    return tasks, dependencies
+
+@app.post("/portfolio/schedule")
+async def schedule_portfolio(
+    request: Optional[schemas.PortfolioScheduleRequest] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """CPM schedule of many projects at once, resolving dependencies between them.
+
+    Projects linked by cross-project dependencies form components, and
+    any project linked to a requested one is scheduled with it. The
+    components are packed into one job per worker process and computed
+    concurrently. Each task's float is relative to its own project's
+    finish, so an unlinked project gets the same result as
+    /projects/{id}/schedule.
+    """
+    from .services.cpm_engine import CompiledGraph
+    from .services.portfolio import pack_components, project_components, schedule_projects
+    request = request or schemas.PortfolioScheduleRequest()
+    task_counts = dict((await db.execute(
+        select(Task.project_id, func.count()).group_by(Task.project_id)
+    )).all())
+    requested = set(task_counts) if request.project_ids is None else set(request.project_ids)
+    unknown = sorted(requested - set(task_counts))
+    if unknown:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Projects not found or without tasks: {', '.join(map(str, unknown))}"
+        )
+    links = (await db.execute(cross_project_links())).all()
+    components = [
+        component for component in project_components(task_counts, links)
+        if requested.intersection(component)
+    ]
+    
+    submitted = []
+    for part in pack_components(components, task_counts, jobs.max_workers):
+        # Loading the next part overlaps with the workers computing the previous ones
+        tasks, dependencies = await load_portfolio_graph(db, part)
+        compiled = await run_in_threadpool(CompiledGraph.from_records, tasks, dependencies)
+        submitted.append(jobs.submit(
+            "portfolio", schedule_projects, compiled, [task.project_id for task in tasks]
+        ))
+    await asyncio.gather(*(jobs.wait(job) for job in submitted))
+    
+    projects = {}
+    for job in submitted:
+        if job.status != "completed":
+            raise HTTPException(status_code=400, detail=job.error or f"Job {job.status}")
+        for project_id, result in job.future.result().items():
+            projects[project_id] = {
+                "critical_path": result["critical_path"],
+                "project_duration": result["project_duration"],
+                "task_schedules": result["schedule"]
+            }
+    return {
+        "components": components,
+        "projects": projects
+    }
+
+@app.get("/recalculation/stats")
+def get_recalculation_stats():
+    """Queue depth and coalescing of the schedule recalculation queue"""
+    return recalc_queue.stats()
+
+# Metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(request: Request):
+    """Request, SQL and scheduler metrics in the Prometheus text format, for local scrapers"""
+    if not metrics.ENABLED:
+        raise HTTPException(
+            status_code=404,
+            detail="Metrics are disabled; set PROJECT_MANAGER_METRICS=1 to enable them"
+        )
+    if request.client is None or request.client.host not in ("127.0.0.1", "::1", "localhost", "testclient"):
+        raise HTTPException(status_code=403, detail="Metrics are only served to local clients")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+# Startup endpoint
+@app.get("/startup")
+def get_startup_timings():
+    """How long each phase of backend startup took, in ms"""
+    return startup_timer.as_dict()
+
+# Job endpoints
+@app.get("/jobs/")
+def list_jobs(project_id: Optional[int] = None):
+    """Lists recent jobs without their results"""
+    return [job.as_dict(include_result=False) for job in jobs.list(project_id)]
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: int, wait: float = Query(0, ge=0, le=60)):
+    """Returns a job's status and, once completed, its result; wait long-polls for up to that many seconds"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait:
+        await jobs.wait(job, wait)
+    return job.as_dict()
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: int):
+    """Cancels a job that is still queued"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not jobs.cancel(job):
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+    return job.as_dict(include_result=False)
 
 @app.get("/projects/{project_id}/gantt")
-def get_gantt_data(project_id: int, db: Session = Depends(get_db)):
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
+async def get_gantt_data(
+    project_id: int,
+    request: Request,
+    window_start: Optional[datetime] = Query(None, alias="from"),
+    window_end: Optional[datetime] = Query(None, alias="to"),
+    parent_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Gantt rows, answered from the project version when unchanged (see gantt_rows).
+
+    Clients that accept columnar.MEDIA_TYPE get the rows as typed columns
+    (see columnar.encode_gantt) instead of JSON.
+    """
+    compact = columnar.accepts_columnar(request.headers.get("accept"))
+    window_start, window_end = naive_utc(window_start), naive_utc(window_end)
+    
+    async def build():
+        rows = await gantt_rows(db, project_id, window_start, window_end, parent_id)
+        if compact:
+            return await run_in_threadpool(columnar.encode_gantt, project_id, rows), VARY_ACCEPT
+        return any_json.dump_json(rows), VARY_ACCEPT
+    
+    return await versioned_response(
+        request,
+        ("gantt", project_id, window_start, window_end, parent_id),
+        lambda: project_version(db, project_id),
+        build,
+        not_found="Project not found or has no tasks",
+        media_type=columnar.MEDIA_TYPE if compact else "application/json"
+    )
+
+async def gantt_rows(
+    db: AsyncSession,
+    project_id: int,
+    window_start: Optional[datetime],
+    window_end: Optional[datetime],
+    parent_id: Optional[int]
+) -> List[Dict]:
+    """Returns Gantt rows using three set-based queries.
+
+    ``from``/``to`` restrict the rows to tasks whose span, from their
+    start to their finish (see task_finish_day), overlaps the window;
+    undated tasks are left out. ``parent_id`` restricts them to the
+    descendants of that task. Both filters run in SQL.
+    """
+    start_date = func.coalesce(Task.actual_start_date, Task.earliest_start_date)
+    row_filter = [Task.project_id == project_id]
+    if parent_id is not None:
+        subtree = (
+            select(Task.id)
+            .where(Task.parent_id == parent_id)
+            .cte("subtree", recursive=True)
+        )
+        subtree = subtree.union_all(
+            select(Task.id).where(Task.parent_id == subtree.c.id)
+        )
+        row_filter.append(Task.id.in_(select(subtree.c.id)))
+    if window_start is not None or window_end is not None:
+        row_filter.append(start_date.isnot(None))
+    if window_start is not None:
+        row_filter.append(task_finish_day() >= func.julianday(window_start))
+    if window_end is not None:
+        row_filter.append(start_date <= window_end)
+    
+    tasks = (await db.execute(
+        select(
+            Task.id,
+            Task.title,
+            start_date.label("start_date"),
+            Task.actual_end_date,
+            Task.duration,
+            Task.progress,
+            Task.parent_id,
+            Task.work_hours
+        )
+        .where(*row_filter)
+        .order_by(Task.id)
+    )).all()
     if not tasks:
-        raise HTTPException(status_code=404, detail="Project not found or has no tasks")
+        filtered = parent_id is not None or window_start is not None or window_end is not None
+        if not filtered or await db.get(Project, project_id) is None:
+            raise HTTPException(status_code=404, detail="Project not found or has no tasks")
+        return []
+    
+    row_ids = select(Task.id).where(*row_filter)
+    dependencies = {task.id: [] for task in tasks}
+    for successor_id, predecessor_id in await db.execute(
+        select(TaskDependency.successor_id, TaskDependency.predecessor_id)
+        .where(TaskDependency.successor_id.in_(row_ids))
+        .order_by(TaskDependency.id)
+    ):
+        if successor_id in dependencies:
+            dependencies[successor_id].append(predecessor_id)
+    
+    assigned_resources = {task.id: [] for task in tasks}
+    for task_id, resource_name in await db.execute(
+        select(TaskResourceAssignment.task_id, Resource.name)
+        .join(Resource, Resource.id == TaskResourceAssignment.resource_id)
+        .where(TaskResourceAssignment.task_id.in_(row_ids))
+        .order_by(TaskResourceAssignment.id)
+    ):
+        if task_id in assigned_resources:
+            assigned_resources[task_id].append(resource_name)
     
     return [{
         "id": task.id,
         "title": task.title,
-        "start_date": task.actual_start_date or task.earliest_start_date,
+        "start_date": task.start_date,
         "end_date": task.actual_end_date,
         "duration": task.duration,
         "progress": task.progress,
         "parent": task.parent_id,
         "work_hours": task.work_hours,
-        "assigned_resources": [
-            assignment.resource.name
-            for assignment in task.resource_assignments
-        ],
-        "dependencies": [
-            dep.predecessor_id
-            for dep in db.query(TaskDependency)
-            .filter(TaskDependency.successor_id == task.id)
-            .all()
-        ]
+        "assigned_resources": assigned_resources[task.id],
+        "dependencies": dependencies[task.id]
     } for task in tasks]
 
+@app.get("/projects/{project_id}/changes")
+async def stream_project_changes(
+    project_id: int,
+    request: Request,
+    last_event_id: Optional[str] = None
+):
+    """Server-Sent Events feed of the project's committed changes.
+
+    Events are ``task`` (changed fields), ``dependency`` (added/removed),
+    ``schedule`` (recomputed ES/LS/float of the tasks that moved),
+    ``dates`` (their new start and finish dates) and ``reset``, after
+    which the client should reload the project. Event ids are sequence
+    numbers; a client reconnecting with Last-Event-ID (or
+    ?last_event_id=) is sent the events it missed, or a reset if they
+    are no longer available.
+    """
+    # A session of its own, released before the stream starts rather than held for its lifetime
+    async with AsyncReadSessionLocal() as db:
+        if not await db.get(Project, project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+    
+    def ensure_schedule():
+        # Schedule deltas are only produced for projects whose schedule is cached
+        read_db = ReadSessionLocal()
+        try:
+            load_schedule_state(read_db, project_id)
+        except (HTTPException, SchedulingError):
+            pass  # No tasks yet, or nothing to schedule until the project is fixed
+        finally:
+            read_db.close()
+    
+    # Subscribe before reading the position, so nothing falls in between
+    subscription = change_feed.subscribe(project_id)
+    resumed, sequence = change_feed.parse_event_id(
+        request.headers.get("last-event-id") or last_event_id
+    )
+    try:
+        await run_in_threadpool(ensure_schedule)
+    except BaseException:
+        change_feed.unsubscribe(subscription)
+        raise
+    
+    async def events():
+        position = sequence
+        try:
+            if resumed and position is None:
+                position = change_feed.last_sequence(project_id)
+                yield format_event(
+                    change_feed.event_id(position), "reset", '{"reason":"unknown event id"}'
+                )
+            elif position is None:
+                position = change_feed.last_sequence(project_id)
+            while True:
+                backlog = change_feed.since(project_id, position)
+                if backlog is None:
+                    position = change_feed.last_sequence(project_id)
+                    yield format_event(
+                        change_feed.event_id(position), "reset", '{"reason":"events missed"}'
+                    )
+                    await run_in_threadpool(ensure_schedule)
+                    continue
+                for event in backlog:
+                    position = event.sequence
+                    yield format_event(change_feed.event_id(event.sequence), event.type, event.data)
+                    if event.type == "reset":
+                        await run_in_threadpool(ensure_schedule)
+                if not await subscription.wait(FEED_KEEPALIVE):
+                    yield ": keep-alive\n\n"
+        finally:
+            change_feed.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/projects/{project_id}/wbs")
+def get_wbs(project_id: int, db: Session = Depends(get_read_db)):
+    """Returns every task in WBS order with summary tasks rolled up from their children,
+    plus the project totals. The rollup is cached and updated on task writes, and
+    its rows are JSON-ready, so they skip jsonable_encoder."""
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    rollup = wbs_rollups.get(
+        project_id,
+        lambda: db.execute(wbs_rows().where(Task.project_id == project_id)).all()
+    )
+    with wbs_rollups.lock:
+        content = dict(rollup.summary(), project_id=project_id, tasks=rollup.rows())
+    return JSONResponse(content=content)
+
+@app.get("/projects/{project_id}/export")
+def export_project(
+    project_id: int,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    db: Session = Depends(get_read_db)
+):
+    """Streams the project's tasks with their CPM values as CSV or XLSX"""
+    try:
+        state = load_schedule_state(db, project_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def schedule(task_id: int):
+        with schedule_cache.lock:
+            return state.entry(task_id) if task_id in state.durations else None
+    
+    def body():
+        # The request's session is closed once the handler returns, so the
+        # cursors behind the stream get a session of their own
+        export_db = ReadSessionLocal()
+        try:
+            yield from encode(export_rows(export_db, project_id, schedule))
+        finally:
+            export_db.close()
+    
+    encode, media_type = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="project-{project_id}.{format}"'
+        }
+    )
+
+startup_timer.mark("routes")
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import argparse
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Project Management API server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,343 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter as StackCounts
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+
+# Instrumentation is opt-in: PROJECT_MANAGER_METRICS=1 turns on the
+# request middleware, the SQL event listeners and /metrics
+ENABLED = os.getenv("PROJECT_MANAGER_METRICS", "").lower() in ("1", "true", "yes", "on")
+
+# Requests slower than this many ms are written to the slow-request log;
+# unset or 0 disables the log
+SLOW_REQUEST_MS = float(os.getenv("PROJECT_MANAGER_SLOW_REQUEST_MS") or 0)
+
+# Share of requests profiled while the slow-request log is on. Only a
+# request that was sampled from its start has a profile in the log.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROJECT_MANAGER_PROFILE_SAMPLE_RATE", "0.1"))
+
+# Seconds between stack samples of a profiled request
+PROFILE_INTERVAL = 0.005
+
+# Stacks kept per slow-request log entry, most frequent first
+PROFILE_TOP_STACKS = 20
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500, 1000)
+
+APP_DIR = str(Path(__file__).resolve().parent)
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        with self.lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, self.labelnames, key, value
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts, sum]
+        self._values: Dict[Tuple, List] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        with self.lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        bucket_labels = self.labelnames + ("le",)
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", bucket_labels, key + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", self.labelnames, key, total
+            yield f"{self.name}_count", self.labelnames, key, cumulative
+
+class Registry:
+    def __init__(self):
+        self.metrics: List = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labelnames, labelvalues, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route",
+    ("method", "route", "status")
+)
+REQUEST_SQL_QUERIES = registry.histogram(
+    "http_request_sql_queries", "SQL statements executed per request",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_SQL_SECONDS = registry.histogram(
+    "http_request_sql_seconds", "Time spent in SQL statements per request",
+    ("method", "route")
+)
+SQL_QUERIES = registry.counter(
+    "sql_queries_total", "SQL statements executed", ("engine",)
+)
+SQL_SECONDS = registry.counter(
+    "sql_query_seconds_total", "Time spent in SQL statements", ("engine",)
+)
+SCHEDULER_PHASE = registry.histogram(
+    "scheduler_phase_seconds", "Time spent in each phase of a CPM calculation",
+    ("phase",)
+)
+SLOW_REQUESTS = registry.counter(
+    "http_slow_requests_total", "Requests over the slow-request threshold",
+    ("method", "route")
+)
+
+class RequestStats:
+    """SQL work attributed to the request being served"""
+
+    __slots__ = ("queries", "sql_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+# Set by the middleware for the duration of a request. Sync endpoints run
+# in a copied context, so they see and update the same RequestStats.
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def instrument_engine(engine, name: str):
+    """Counts and times every statement executed through ``engine``"""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        SQL_QUERIES.inc(engine=name)
+        SQL_SECONDS.inc(elapsed, engine=name)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += elapsed
+
+    def handle_error(exception_context):
+        # Keep the start-time stack balanced when a statement fails
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+def record_phases(timings: Dict[str, float]):
+    """Records scheduler phase timings, in seconds, when instrumentation is on"""
+    if ENABLED:
+        for phase, seconds in timings.items():
+            SCHEDULER_PHASE.observe(seconds, phase=phase)
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of all threads that are running app code.
+
+    Sync endpoints run on worker threads, so a profiler attached to one
+    thread would miss them. Stacks are collapsed into "a;b;c" strings,
+    the format flame graph tools read. Requests served at the same time
+    show up in each other's samples.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self.stacks: StackCounts = StackCounts()
+        self._done = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(APP_DIR) and not code.co_filename.endswith("metrics.py"):
+                        in_app = True
+                    stack.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                    frame = frame.f_back
+                if in_app:
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Dict:
+        self._done.set()
+        self.join()
+        return {
+            'interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'stacks': [
+                {'stack': stack, 'count': count}
+                for stack, count in self.stacks.most_common(PROFILE_TOP_STACKS)
+            ]
+        }
+
+def slow_request_log_path() -> Path:
+    from .database import data_dir
+    return Path(os.getenv("PROJECT_MANAGER_SLOW_REQUEST_LOG") or data_dir / "slow_requests.log")
+
+_log_lock = threading.Lock()
+
+def log_slow_request(entry: Dict):
+    line = json.dumps(entry, default=str)
+    with _log_lock:
+        with slow_request_log_path().open("a", encoding="utf-8") as log:
+            log.write(line + "\n")
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request until its last body chunk is sent.
+
+    Streaming responses are timed to the end of the stream, so SQL run
+    by their generators is attributed to the request too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict] = None
+
+    def route(self, scope) -> str:
+        if self._route_paths is None:
+            self._route_paths = {
+                getattr(route, "endpoint", None): route.path
+                for route in getattr(scope.get("app"), "routes", [])
+            }
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        sampler = None
+        if SLOW_REQUEST_MS and random.random() < PROFILE_SAMPLE_RATE:
+            sampler = StackSampler()
+            sampler.start()
+        started = time.perf_counter()
+        response_status = [500]
+        finished = [False]
+
+        def finish():
+            if finished[0]:
+                return
+            finished[0] = True
+            elapsed = time.perf_counter() - started
+            profile = sampler.stop() if sampler is not None else None
+            method, route = scope["method"], self.route(scope)
+            REQUEST_LATENCY.observe(elapsed, method=method, route=route, status=str(response_status[0]))
+            REQUEST_SQL_QUERIES.observe(stats.queries, method=method, route=route)
+            REQUEST_SQL_SECONDS.observe(stats.sql_seconds, method=method, route=route)
+            if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+                SLOW_REQUESTS.inc(method=method, route=route)
+                log_slow_request({
+                    'time': datetime.utcnow().isoformat(),
+                    'method': method,
+                    'path': scope["path"],
+                    'query': scope.get("query_string", b"").decode("latin-1"),
+                    'route': route,
+                    'status': response_status[0],
+                    'duration_ms': round(elapsed * 1000, 3),
+                    'sql_queries': stats.queries,
+                    'sql_ms': round(stats.sql_seconds * 1000, 3),
+                    'profile': profile
+                })
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response_status[0] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            finish()
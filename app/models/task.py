@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Boolean, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, Boolean, Enum, JSON, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 import enum
@@ -13,6 +13,12 @@ class DependencyType(enum.Enum):
     FINISH_TO_FINISH = "FF"
     START_TO_FINISH = "SF"
 
+class TaskPriority(enum.Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    CRITICAL = "critical"
+
 class TaskStatus(enum.Enum):
     NOT_STARTED = "not_started"
     IN_PROGRESS = "in_progress"
@@ -27,6 +33,7 @@ class Resource(Base):
     email = Column(String, unique=True, index=True)
     role = Column(String)
     cost_per_hour = Column(Float, default=0)
+    capacity_hours_per_day = Column(Float, default=8)  # Used by resource leveling
     
     # Assignments
     task_assignments = relationship("TaskResourceAssignment", back_populates="resource")
@@ -35,8 +42,8 @@ class TaskResourceAssignment(Base):
     __tablename__ = "task_resource_assignments"
     
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
-    resource_id = Column(Integer, ForeignKey('resources.id'), nullable=False)
+    task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False, index=True)
+    resource_id = Column(Integer, ForeignKey('resources.id'), nullable=False, index=True)
     assigned_hours = Column(Float, nullable=False)  # Hours assigned to this resource
     
     task = relationship("Task", back_populates="resource_assignments")
@@ -53,22 +60,25 @@ class Task(Base):
     # Scheduling fields
     earliest_start_date = Column(DateTime)
     latest_start_date = Column(DateTime)
+    # The earliest finish in the project's working calendar, written with the start dates
+    earliest_finish_date = Column(DateTime)
     actual_start_date = Column(DateTime)
     actual_end_date = Column(DateTime)
     duration = Column(Float)  # in days
     work_hours = Column(Float, nullable=False, default=0)  # Total work hours required
     progress = Column(Float, default=0)  # Percentage complete (0-100)
     status = Column(Enum(TaskStatus), default=TaskStatus.NOT_STARTED)
+    priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM)
     
     is_milestone = Column(Boolean, default=False)
     is_locked = Column(Boolean, default=False)
     
     # Hierarchy
-    parent_id = Column(Integer, ForeignKey('tasks.id'), nullable=True)
+    parent_id = Column(Integer, ForeignKey('tasks.id'), nullable=True, index=True)
     children = relationship("Task", backref="parent", remote_side=[id])
     
     # Project association
-    project_id = Column(Integer, ForeignKey('projects.id'), nullable=False)
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=False, index=True)
     project = relationship("Project", back_populates="tasks")
     
     # Resource assignments
@@ -86,8 +96,8 @@ class TaskDependency(Base):
     __tablename__ = "task_dependencies"
     
     id = Column(Integer, primary_key=True, index=True)
-    predecessor_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
-    successor_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
+    predecessor_id = Column(Integer, ForeignKey('tasks.id'), nullable=False, index=True)
+    successor_id = Column(Integer, ForeignKey('tasks.id'), nullable=False, index=True)
     dependency_type = Column(Enum(DependencyType), default=DependencyType.FINISH_TO_START)
     lag_time = Column(Float, default=0)  # in days (can be negative for lead time)
     
@@ -104,10 +114,48 @@ class Project(Base):
     end_date = Column(DateTime)
     
     tasks = relationship("Task", back_populates="project")
+    # Bumped by every write to the project's tasks, dependencies or assignments
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bit n set when date.weekday() n is a working day; 31 is Monday to Friday
+    working_weekdays = Column(Integer, nullable=False, default=31, server_default="31")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(Integer, ForeignKey('users.id'))
 
+class CalendarException(Base):
+    """A holiday or extra working day of a project, or a day off of a resource"""
+    __tablename__ = "calendar_exceptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=True, index=True)
+    resource_id = Column(Integer, ForeignKey('resources.id'), nullable=True, index=True)
+    date = Column(Date, nullable=False)
+    is_working = Column(Boolean, nullable=False, default=False)
+    description = Column(String)
+
+class SavedScenario(Base):
+    """A saved what-if scenario: its overrides of the project graph, as JSON"""
+    __tablename__ = "scenarios"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    changes = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ScheduleBaseline(Base):
+    """A snapshot of a project's computed schedule, one compressed columnar blob per baseline"""
+    __tablename__ = "schedule_baselines"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    task_count = Column(Integer, nullable=False)
+    project_duration = Column(Float, nullable=False)
+    # See baselines.encode_baseline
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class User(Base):
     __tablename__ = "users"
     
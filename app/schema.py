@@ -0,0 +1,51 @@
+from pathlib import Path
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from .models.task import Base
+
+# Bump together with every new alembic revision. The number is kept in
+# SQLite's PRAGMA user_version, so a database that is already current is
+# recognised with a single read instead of create_all reflecting every table.
+SCHEMA_VERSION = 6
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+class SchemaError(Exception):
+    pass
+
+def stored_version(engine: Engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(text("PRAGMA user_version")).scalar() or 0
+
+def _alembic(command_name: str):
+    """Runs an alembic command against the application database"""
+    # Only needed when the schema changes, so alembic is not imported at startup
+    from alembic import command
+    from alembic.config import Config
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    getattr(command, command_name)(config, "head")
+
+def ensure_schema(engine: Engine) -> str:
+    """Brings the database up to SCHEMA_VERSION; returns what was done.
+
+    "current": nothing to do. "created": a new database got every table
+    and was stamped with the alembic head. "migrated": an older database
+    got any new tables and was upgraded through the alembic migrations,
+    which only add what is missing.
+    """
+    version = stored_version(engine)
+    if version == SCHEMA_VERSION:
+        return "current"
+    if version > SCHEMA_VERSION:
+        raise SchemaError(
+            f"The database has schema version {version}; this version of the app "
+            f"supports up to {SCHEMA_VERSION}"
+        )
+
+    created = not inspect(engine).has_table("projects")
+    Base.metadata.create_all(bind=engine)
+    _alembic("stamp" if created else "upgrade")
+    with engine.begin() as connection:
+        connection.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    return "created" if created else "migrated"
@@ -1,8 +1,22 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Dict, Literal, Optional, List
 from .models.task import TaskPriority, DependencyType, TaskStatus
 
+class TaskResourceAssignmentBase(BaseModel):
+    resource_id: int
+    assigned_hours: float
+
+class TaskResourceAssignmentCreate(TaskResourceAssignmentBase):
+    pass
+
+class TaskResourceAssignment(TaskResourceAssignmentBase):
+    id: int
+    task_id: int
+
+    class Config:
+        orm_mode = True
+
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -19,11 +33,12 @@ class TaskBase(BaseModel):
     progress: float = Field(default=0, ge=0, le=100)  # Between 0 and 100
 
 class TaskCreate(TaskBase):
-    pass
+    resource_assignments: Optional[List[TaskResourceAssignmentCreate]] = None
 
 class Task(TaskBase):
     id: int
-    unique_id: str
+    unique_id: Optional[str] = None
+    earliest_finish_date: Optional[datetime] = None
     actual_start_date: Optional[datetime]
     actual_end_date: Optional[datetime]
     created_at: datetime
@@ -52,6 +67,17 @@ class Project(ProjectBase):
     class Config:
         orm_mode = True
 
+class ProjectSummary(ProjectBase):
+    """A project in the listing; ``fields=`` may leave out anything but the id"""
+    id: int
+    created_at: datetime
+    updated_at: datetime
+    created_by: Optional[int]
+    task_count: int
+    percent_complete: float  # Progress weighted by work hours
+    computed_finish: Optional[datetime]  # Latest task finish
+    tasks: Optional[List[Task]] = None  # Only with include=tasks
+
 class DependencyBase(BaseModel):
     predecessor_id: int
     dependency_type: DependencyType = DependencyType.FINISH_TO_START
@@ -87,6 +113,7 @@ class ResourceBase(BaseModel):
     email: str
     role: Optional[str] = None
     cost_per_hour: float = 0
+    capacity_hours_per_day: float = Field(default=8, gt=0)
 
 class ResourceCreate(ResourceBase):
     pass
@@ -97,26 +124,90 @@ class Resource(ResourceBase):
     class Config:
         orm_mode = True
 
-class TaskResourceAssignmentBase(BaseModel):
-    resource_id: int
-    assigned_hours: float
+# Response schemas for specific operations
+class ScheduleResponse(BaseModel):
+    project_id: int
+    critical_path: List[int]
+    project_duration: float
+    task_schedules: dict
 
-class TaskResourceAssignmentCreate(TaskResourceAssignmentBase):
-    pass
+class LevelingRequest(BaseModel):
+    # Overrides Resource.capacity_hours_per_day, keyed by resource id
+    resource_capacity: Dict[int, float] = {}
+    default_capacity: float = Field(default=8, gt=0)
+
+class SimulationRequest(BaseModel):
+    samples: int = Field(default=1000, ge=1, le=1_000_000)
+    distribution: Literal["pert", "triangular"] = "pert"
+    # Optimistic/pessimistic durations as multiples of Task.duration
+    optimistic_factor: float = Field(default=0.8, ge=0)
+    pessimistic_factor: float = Field(default=1.5, ge=1)
+    percentiles: List[float] = [50, 80, 95]
+    seed: Optional[int] = None
+
+class ProjectCalendar(BaseModel):
+    # date.weekday() numbers, 0 is Monday
+    working_weekdays: List[int] = Field(default=[0, 1, 2, 3, 4], min_length=1)
+    holidays: List[date] = []
+    # Days worked although their weekday is not
+    working_dates: List[date] = []
+
+class ResourceCalendar(BaseModel):
+    # Days the resource is off although the project works
+    days_off: List[date] = []
+
+class PortfolioScheduleRequest(BaseModel):
+    # None schedules every project; projects linked to these are always added
+    project_ids: Optional[List[int]] = None
+
+class ScenarioDependency(BaseModel):
+    predecessor_id: int
+    successor_id: int
 
-class TaskResourceAssignment(TaskResourceAssignmentBase):
+class ScenarioLag(ScenarioDependency):
+    lag_time: float
+
+class ScenarioAddedDependency(ScenarioDependency):
+    dependency_type: DependencyType = DependencyType.FINISH_TO_START
+    lag_time: float = 0
+
+class ScenarioBase(BaseModel):
+    name: str
+    # Task id -> duration in days
+    durations: Dict[int, float] = {}
+    lags: List[ScenarioLag] = []
+    removed_dependencies: List[ScenarioDependency] = []
+    # Replace the existing dependency between the same tasks, if any
+    added_dependencies: List[ScenarioAddedDependency] = []
+
+class ScenarioCreate(ScenarioBase):
+    # Scenarios only live in memory unless persisted
+    persist: bool = False
+
+class Scenario(ScenarioBase):
     id: int
-    task_id: int
+    project_id: int
+    persisted: bool
+    created_at: datetime
 
-    class Config:
-        orm_mode = True
+class ScenarioCompareRequest(BaseModel):
+    # None compares every scenario of the project
+    scenario_ids: Optional[List[int]] = None
 
-# Response schemas for specific operations
-class ScheduleResponse(BaseModel):
+class BaselineCreate(BaseModel):
+    name: str
+
+class Baseline(BaselineCreate):
+    id: int
     project_id: int
-    critical_path: List[int]
+    task_count: int
     project_duration: float
-    task_schedules: dict
+    # Stored size of the snapshot
+    size_bytes: int
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
 
 class GanttTaskResponse(BaseModel):
     id: int
@@ -0,0 +1,276 @@
+import bisect
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .calendar import WorkingCalendar
+
+EPOCH = datetime(1970, 1, 1)
+
+# Loads are rounded so that +rate/-rate sweeps do not leave float residue
+_LOAD_DIGITS = 9
+
+def to_seconds(value: datetime) -> int:
+    if value.tzinfo is not None:
+        # Stored dates are naive UTC
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((value - EPOCH).total_seconds())
+
+def from_seconds(value: int) -> datetime:
+    return EPOCH + timedelta(seconds=value)
+
+def task_spans(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    duration: Optional[float],
+    calendar: Optional["WorkingCalendar"] = None
+) -> List[Tuple[int, int]]:
+    """Returns a task's booked spans in epoch seconds, none if it is not scheduled.
+
+    With a calendar these are the runs of working days between start and
+    end, so the task's hours are spread over the days it is worked; a
+    task worked entirely on days off keeps its whole span.
+    """
+    if start is None:
+        return []
+    if end is None:
+        end = start + timedelta(days=duration or 0)
+    spans = calendar.working_spans(start, end) if calendar is not None else []
+    if not spans:
+        spans = [(start, end)]
+    return [
+        (to_seconds(span_start), to_seconds(span_end))
+        for span_start, span_end in spans if span_end > span_start
+    ]
+
+class ResourceTimeline:
+    """Sweep-line over the spans booked on one resource.
+
+    Span boundaries are kept in a sorted event list, so replacing a task's
+    booking is a pair of bisect operations per span. The
+    piecewise-constant load profile is rebuilt lazily, only after the
+    bookings changed.
+    """
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        # Task id -> its (start, end, hours_per_day) spans
+        self.bookings: Dict[int, List[Tuple[int, int, float]]] = {}
+        self._events: List[Tuple[int, float, int]] = []
+        self._profile: Optional[List[Tuple[int, int, float]]] = None
+
+    def book(self, task_id: int, spans: List[Tuple[int, int]], hours_per_day: float):
+        self.release(task_id)
+        self.bookings[task_id] = [(start, end, hours_per_day) for start, end in spans]
+        for start, end in spans:
+            bisect.insort(self._events, (start, hours_per_day, task_id))
+            bisect.insort(self._events, (end, -hours_per_day, task_id))
+        self._profile = None
+
+    def release(self, task_id: int):
+        booking = self.bookings.pop(task_id, None)
+        if booking is None:
+            return
+        for start, end, hours_per_day in booking:
+            for event in ((start, hours_per_day, task_id), (end, -hours_per_day, task_id)):
+                del self._events[bisect.bisect_left(self._events, event)]
+        self._profile = None
+
+    def profile(self) -> List[Tuple[int, int, float]]:
+        """Returns (start, end, hours_per_day) segments with a non-zero load"""
+        if self._profile is None:
+            segments = []
+            load = 0.0
+            previous = None
+            for time, delta, _ in self._events:
+                if previous is not None and time > previous and round(load, _LOAD_DIGITS) > 0:
+                    if segments and segments[-1][1] == previous and segments[-1][2] == round(load, _LOAD_DIGITS):
+                        segments[-1] = (segments[-1][0], time, segments[-1][2])
+                    else:
+                        segments.append((previous, time, round(load, _LOAD_DIGITS)))
+                load += delta
+                previous = time
+            self._profile = segments
+        return self._profile
+
+    def segments(self, start: Optional[int] = None, end: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        """Returns the load profile clipped to [start, end)"""
+        profile = self.profile()
+        first = 0
+        if start is not None:
+            first = bisect.bisect_right(profile, (start, float('inf'), float('inf')))
+            first = max(first - 1, 0)
+        clipped = []
+        for segment_start, segment_end, load in profile[first:]:
+            if end is not None and segment_start >= end:
+                break
+            if start is not None and segment_end <= start:
+                continue
+            clipped.append((
+                max(segment_start, start) if start is not None else segment_start,
+                min(segment_end, end) if end is not None else segment_end,
+                load
+            ))
+        return clipped
+
+    def overallocations(self, start: Optional[int] = None, end: Optional[int] = None) -> List[Dict]:
+        periods = []
+        for segment_start, segment_end, load in self.segments(start, end):
+            if load <= self.capacity:
+                continue
+            periods.append({
+                'start': from_seconds(segment_start),
+                'end': from_seconds(segment_end),
+                'hours_per_day': load,
+                'capacity_hours_per_day': self.capacity,
+                'task_ids': sorted(
+                    task_id for task_id, spans in self.bookings.items()
+                    if any(s < segment_end and e > segment_start for s, e, _ in spans)
+                )
+            })
+        return periods
+
+class AllocationIndex:
+    """Per-resource timelines of task bookings weighted by assigned_hours
+
+    ``calendar(project_id, resource_id)`` gives the working calendar a
+    resource works a project's tasks in, or None to book whole spans.
+    """
+
+    def __init__(self, calendar: Optional[Callable[[int, int], Optional["WorkingCalendar"]]] = None):
+        self.calendar = calendar
+        self.timelines: Dict[int, ResourceTimeline] = {}
+        self._task_resources: Dict[int, List[int]] = {}
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def load(self, capacities: Iterable[Tuple[int, Optional[float]]], rows: Iterable):
+        """Builds the index from (resource_id, capacity) pairs and assignment rows
+
+        Each row carries task_id, project_id, resource_id, assigned_hours,
+        start, end and duration, where start/end are the task's scheduled
+        dates.
+        """
+        with self.lock:
+            self.timelines = {
+                resource_id: ResourceTimeline(capacity or 0)
+                for resource_id, capacity in capacities
+            }
+            self._task_resources = {}
+            grouped: Dict[int, List] = {}
+            for row in rows:
+                grouped.setdefault(row.task_id, []).append(row)
+            # Every row of a project and resource books in the same calendar
+            calendars: Dict[Tuple[int, int], Optional["WorkingCalendar"]] = {}
+            for task_id, task_rows in grouped.items():
+                self._book(task_id, task_rows, calendars)
+            self.loaded = True
+
+    def invalidate(self):
+        """Drops every timeline; the next query reloads them"""
+        with self.lock:
+            self.timelines = {}
+            self._task_resources = {}
+            self.loaded = False
+
+    def set_capacity(self, resource_id: int, capacity: Optional[float]):
+        with self.lock:
+            if resource_id in self.timelines:
+                self.timelines[resource_id].capacity = capacity or 0
+            elif self.loaded:
+                self.timelines[resource_id] = ResourceTimeline(capacity or 0)
+
+    def update_task(self, task_id: int, rows: Iterable):
+        """Replaces the bookings of one task with the given assignment rows"""
+        with self.lock:
+            if not self.loaded:
+                return
+            self.remove_task(task_id)
+            self._book(task_id, list(rows))
+
+    def remove_task(self, task_id: int):
+        with self.lock:
+            for resource_id in self._task_resources.pop(task_id, ()):
+                timeline = self.timelines.get(resource_id)
+                if timeline is not None:
+                    timeline.release(task_id)
+
+    def _book(
+        self,
+        task_id: int,
+        rows: List,
+        calendars: Optional[Dict[Tuple[int, int], Optional["WorkingCalendar"]]] = None
+    ):
+        resources = []
+        for row in rows:
+            if row.start is None or not row.assigned_hours:
+                continue
+            calendar = None
+            if self.calendar is not None:
+                key = (row.project_id, row.resource_id)
+                if calendars is None or key not in calendars:
+                    calendar = self.calendar(*key)
+                    if calendars is not None:
+                        calendars[key] = calendar
+                else:
+                    calendar = calendars[key]
+            spans = task_spans(row.start, row.end, row.duration, calendar)
+            if not spans:
+                continue
+            timeline = self.timelines.get(row.resource_id)
+            if timeline is None:
+                timeline = self.timelines[row.resource_id] = ResourceTimeline(0)
+            days = sum(end - start for start, end in spans) / 86400
+            previous = timeline.bookings.get(task_id)
+            # Several assignments of one task to the same resource add up
+            hours_per_day = row.assigned_hours / days + (previous[0][2] if previous else 0)
+            timeline.book(task_id, spans, hours_per_day)
+            resources.append(row.resource_id)
+        if resources:
+            self._task_resources[task_id] = resources
+
+    def allocation(
+        self,
+        resource_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Optional[Dict]:
+        with self.lock:
+            timeline = self.timelines.get(resource_id)
+            if timeline is None:
+                return None
+            bounds = (
+                to_seconds(start) if start is not None else None,
+                to_seconds(end) if end is not None else None
+            )
+            return {
+                'resource_id': resource_id,
+                'capacity_hours_per_day': timeline.capacity,
+                'segments': [
+                    {
+                        'start': from_seconds(segment_start),
+                        'end': from_seconds(segment_end),
+                        'hours_per_day': load
+                    }
+                    for segment_start, segment_end, load in timeline.segments(*bounds)
+                ],
+                'overallocations': timeline.overallocations(*bounds)
+            }
+
+    def overallocations(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict]:
+        with self.lock:
+            bounds = (
+                to_seconds(start) if start is not None else None,
+                to_seconds(end) if end is not None else None
+            )
+            report = []
+            for resource_id, timeline in sorted(self.timelines.items()):
+                periods = timeline.overallocations(*bounds)
+                if periods:
+                    report.append({'resource_id': resource_id, 'periods': periods})
+            return report
@@ -0,0 +1,171 @@
+import threading
+import zlib
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, Optional, Tuple
+from . import columnar
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Per-task values a baseline keeps, besides the task id, in days, hours and currency
+COLUMNS = ("earliest_start", "earliest_finish", "duration", "work_hours", "cost")
+
+# zlib level of stored baselines; higher levels cost several times the time for ~15% less space
+COMPRESSION_LEVEL = 1
+
+# Tasks whose values moved by less than this are reported as unchanged
+TOLERANCE = 1e-9
+
+def schedule_columns(
+    earliest_start: Dict[int, float],
+    durations: Dict[int, float],
+    rows: Iterable[Tuple[int, float, float]]
+) -> Dict[str, "np.ndarray"]:
+    """A project's live schedule as arrays ordered by task id.
+
+    ``earliest_start`` and ``durations`` come from the project's
+    ScheduleState; ``rows`` are (task id, work hours, cost) of its tasks.
+    A task missing from ``rows`` has no work or cost.
+    """
+    import numpy as np
+    task_ids = np.fromiter(earliest_start, dtype=np.int64, count=len(earliest_start))
+    task_ids.sort()
+    ids = task_ids.tolist()
+    starts = np.fromiter((earliest_start[task_id] for task_id in ids), dtype=np.float64, count=len(ids))
+    lengths = np.fromiter((durations[task_id] for task_id in ids), dtype=np.float64, count=len(ids))
+    work_hours = np.zeros(len(ids), dtype=np.float64)
+    cost = np.zeros(len(ids), dtype=np.float64)
+    rows = list(rows)
+    if rows:
+        row_ids, row_work, row_cost = (np.asarray(column, dtype=np.float64) for column in zip(*rows))
+        positions = np.searchsorted(task_ids, row_ids.astype(np.int64))
+        positions = np.minimum(positions, max(len(ids) - 1, 0))
+        known = (task_ids[positions] == row_ids) if len(ids) else np.zeros(len(rows), dtype=bool)
+        work_hours[positions[known]] = np.nan_to_num(row_work[known])
+        cost[positions[known]] = np.nan_to_num(row_cost[known])
+    return {
+        "task_id": task_ids,
+        "earliest_start": starts,
+        "earliest_finish": starts + lengths,
+        "duration": lengths,
+        "work_hours": work_hours,
+        "cost": cost
+    }
+
+class LiveColumns:
+    """The live schedule_columns of each project, for the project version they were read at.
+
+    The version is any hashable key that moves whenever the columns could.
+
+    Reading work hours and cost means reading every task row, so the
+    arrays are kept until the project's version moves on and comparing
+    against many baselines reads the project once.
+    """
+
+    def __init__(self):
+        self._columns: Dict[int, Tuple[Hashable, Dict[str, "np.ndarray"]]] = {}
+        self.lock = threading.Lock()
+
+    def get(
+        self,
+        project_id: int,
+        version: Optional[Hashable],
+        loader: Callable[[], Dict[str, "np.ndarray"]]
+    ) -> Dict[str, "np.ndarray"]:
+        """Cached columns if read at ``version``, else ``loader()``; read the version first"""
+        with self.lock:
+            cached = self._columns.get(project_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        columns = loader()
+        if version is not None:
+            with self.lock:
+                self._columns[project_id] = (version, columns)
+        return columns
+
+    def invalidate(self, project_id: Optional[int] = None):
+        with self.lock:
+            if project_id is None:
+                self._columns.clear()
+            else:
+                self._columns.pop(project_id, None)
+
+def encode_baseline(columns: Dict[str, "np.ndarray"]) -> bytes:
+    """Packs the arrays of schedule_columns into one compressed blob.
+
+    The blob is a columnar payload (see columnar.encode) deflated with
+    zlib, so a baseline of a 10k-task project is a single row of a few
+    hundred kilobytes at most rather than 10k rows.
+    """
+    payload = columnar.encode({"columns": list(COLUMNS)}, {
+        "task_id": ("int32", columns["task_id"]),
+        **{name: ("float64", columns[name]) for name in COLUMNS}
+    })
+    return zlib.compress(payload, COMPRESSION_LEVEL)
+
+def decode_baseline(data: bytes) -> Dict[str, "np.ndarray"]:
+    import numpy as np
+    _, columns = columnar.decode(zlib.decompress(data))
+    return dict(columns, task_id=columns["task_id"].astype(np.int64))
+
+def _compare(baseline: float, current: float) -> Dict[str, float]:
+    return {
+        "baseline": float(baseline),
+        "current": float(current),
+        "variance": float(current) - float(baseline)
+    }
+
+def schedule_variance(
+    baseline: Dict[str, "np.ndarray"],
+    current: Dict[str, "np.ndarray"],
+    changed_only: bool = True
+) -> Dict:
+    """Compares a live schedule with a baseline, both as returned by schedule_columns.
+
+    Variances are current minus baseline, so a positive start or finish
+    variance is a slip. Tasks are matched by id; tasks added since the
+    baseline and tasks removed since are listed by id. With
+    ``changed_only`` the per-task list holds only tasks where some value
+    moved.
+    """
+    import numpy as np
+    _, in_current, in_baseline = np.intersect1d(
+        current["task_id"], baseline["task_id"], assume_unique=True, return_indices=True
+    )
+    added = np.setdiff1d(current["task_id"], baseline["task_id"], assume_unique=True)
+    removed = np.setdiff1d(baseline["task_id"], current["task_id"], assume_unique=True)
+    variances = {
+        name: current[name][in_current] - baseline[name][in_baseline] for name in COLUMNS
+    }
+    moved = np.zeros(len(in_current), dtype=bool)
+    for values in variances.values():
+        moved |= np.abs(values) > TOLERANCE
+    rows = np.flatnonzero(moved) if changed_only else np.arange(len(in_current))
+    finish = variances["earliest_finish"]
+    return {
+        "project_duration": _compare(
+            baseline["earliest_finish"].max(initial=0), current["earliest_finish"].max(initial=0)
+        ),
+        "totals": {
+            name: _compare(baseline[name].sum(), current[name].sum())
+            for name in ("work_hours", "cost")
+        },
+        "changed_tasks": int(moved.sum()),
+        "slipped_tasks": int((finish > TOLERANCE).sum()),
+        "max_finish_slip": float(finish.max(initial=0)),
+        "added_tasks": added.tolist(),
+        "removed_tasks": removed.tolist(),
+        "tasks": [
+            {
+                "task_id": task_id,
+                "start_variance": start,
+                "finish_variance": finish_variance,
+                "duration_variance": duration,
+                "work_variance": work,
+                "cost_variance": cost
+            }
+            for task_id, start, finish_variance, duration, work, cost in zip(
+                current["task_id"][in_current][rows].tolist(),
+                *(variances[name][rows].tolist() for name in COLUMNS)
+            )
+        ]
+    }
@@ -0,0 +1,379 @@
+import threading
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from ..models.task import CalendarException, Project, Task, TaskResourceAssignment
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Weekday bits as in date.weekday(): bit 0 is Monday, so Monday to Friday is 0b0011111
+DEFAULT_WORKING_WEEKDAYS = 0b0011111
+ALL_WEEKDAYS = 0b1111111
+
+# date.toordinal() of 1970-01-01, the datetime64 epoch
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def weekday_mask(weekdays: Iterable[int]) -> int:
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+def mask_weekdays(mask: int) -> List[int]:
+    return [weekday for weekday in range(7) if mask & (1 << weekday)]
+
+class WorkingCalendar:
+    """Turns CPM day offsets into dates that only count working days.
+
+    Offset 0 is the first working day on or after ``start``, offset n the
+    n-th working day after that, and fractions are that share of a day
+    from the start's time of day. The ordinals of the working days around
+    the start are precomputed into one sorted array, so a batch of
+    offsets converts with a single array lookup and dates convert back
+    with a binary search. The array is grown when an offset falls outside
+    it, never stepped through day by day.
+
+    The array, the origin within it and the ordinals it covers are
+    published together as one tuple, and each lookup reads that tuple
+    once, so a calendar shared between threads never pairs an array with
+    another build's origin.
+    """
+
+    def __init__(
+        self,
+        start: datetime,
+        working_weekdays: int = DEFAULT_WORKING_WEEKDAYS,
+        holidays: Iterable[date] = (),
+        working_dates: Iterable[date] = ()
+    ):
+        self.start = start
+        self.working_weekdays = working_weekdays & ALL_WEEKDAYS
+        self.holidays: Set[int] = {day.toordinal() for day in holidays}
+        self.working_dates: Set[int] = {day.toordinal() for day in working_dates}
+        if not self.working_weekdays and not self.working_dates:
+            raise ValueError("A calendar needs at least one working day")
+        self.time_of_day = start - datetime.combine(start.date(), datetime.min.time())
+        self._start_ordinal = start.date().toordinal()
+        # (work_days, origin, first, last); origin is the position of offset 0
+        self._days = self._build(self._start_ordinal - 366, self._start_ordinal + 3 * 366)
+
+    @property
+    def work_days(self) -> "np.ndarray":
+        return self._days[0]
+
+    @property
+    def origin(self) -> int:
+        return self._days[1]
+
+    def _build(self, first: int, last: int) -> tuple:
+        """Precomputes the working days among the ordinals first..last"""
+        import numpy as np
+        days = np.arange(first, last + 1, dtype=np.int64)
+        # Ordinal 1, 0001-01-01, was a Monday
+        working = ((self.working_weekdays >> ((days - 1) % 7)) & 1).astype(bool)
+        if self.holidays:
+            working[np.isin(days, np.fromiter(self.holidays, dtype=np.int64))] = False
+        if self.working_dates:
+            working[np.isin(days, np.fromiter(self.working_dates, dtype=np.int64))] = True
+        work_days = days[working]
+        return work_days, int(np.searchsorted(work_days, self._start_ordinal)), first, last
+
+    def _span(self, working_days: int) -> int:
+        """Calendar days that surely hold ``working_days`` working days"""
+        per_week = bin(self.working_weekdays).count("1")
+        if not per_week:
+            # Only explicit working dates: the span must reach all of them
+            return max(abs(day - self._start_ordinal) for day in self.working_dates) + 1
+        return working_days * 7 // per_week + len(self.holidays) + 14
+
+    def _grow(self, days: tuple, first: int, last: int) -> tuple:
+        """Rebuilds over a wider range, at least doubling it so growth stays amortised"""
+        _, _, old_first, old_last = days
+        width = old_last - old_first
+        if first < old_first:
+            first = max(1, min(first, old_first - width))
+        if last > old_last:
+            last = max(last, old_last + width)
+        if not self.working_weekdays and old_first <= min(self.working_dates) \
+                and max(self.working_dates) <= old_last:
+            raise ValueError("The calendar has too few working days for these offsets")
+        days = self._days = self._build(first, last)
+        return days
+
+    def _ensure(self, low: int, high: int) -> tuple:
+        """The days, grown until positions origin+low..origin+high exist"""
+        days = self._days
+        while days[1] + low < 0 or days[1] + high >= len(days[0]):
+            work_days, origin, first, last = days
+            if origin + low < 0:
+                first = self._start_ordinal - self._span(-low)
+            if origin + high >= len(work_days):
+                last = self._start_ordinal + self._span(high + 1)
+            days = self._grow(days, first, last)
+        return days
+
+    def _ensure_ordinals(self, low: int, high: int) -> tuple:
+        """The days, grown until they span ordinals low..high and a working day after high"""
+        import numpy as np
+        days = self._days
+        while low < days[2] or high > days[3] \
+                or np.searchsorted(days[0], high) >= len(days[0]):
+            days = self._grow(days, min(low, days[2]), max(high, days[3]) + self._span(1))
+        return days
+
+    def to_datetimes(self, offsets: Sequence[float]) -> List[datetime]:
+        """Dates of many day offsets at once"""
+        import numpy as np
+        offsets = np.asarray(offsets, dtype=np.float64)
+        if not len(offsets):
+            return []
+        whole = np.floor(offsets).astype(np.int64)
+        work_days, origin, _, _ = self._ensure(int(whole.min()), int(whole.max()))
+        days = (work_days[origin + whole] - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+        within_day = np.round(
+            ((offsets - whole) * 86400 + self.time_of_day.total_seconds()) * 1e6
+        ).astype("timedelta64[us]")
+        return (days.astype("datetime64[us]") + within_day).tolist()
+
+    def to_offsets(self, values: Sequence[datetime]) -> List[float]:
+        """Day offsets of dates, the inverse of to_datetimes; non-working days count as the next working day"""
+        import numpy as np
+        if not len(values):
+            return []
+        ordinals = np.array([value.toordinal() for value in values], dtype=np.int64)
+        work_days, origin, _, _ = self._ensure_ordinals(int(ordinals.min()), int(ordinals.max()))
+        positions = np.searchsorted(work_days, ordinals) - origin
+        fractions = [
+            ((value - datetime.combine(value.date(), datetime.min.time())) - self.time_of_day)
+            .total_seconds() / 86400
+            for value in values
+        ]
+        return (positions + np.where(work_days[positions + origin] == ordinals, fractions, 0)).tolist()
+
+    def working_spans(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """The runs of consecutive working days within [start, end), as (start, end) pairs"""
+        import numpy as np
+        if end <= start:
+            return []
+        first, last = start.toordinal(), end.toordinal()
+        days = self._days
+        while first < days[2] or last > days[3]:
+            days = self._grow(days, min(first, days[2]), max(last, days[3]))
+        work_days = days[0]
+        low, high = np.searchsorted(work_days, (first, last + 1)).tolist()
+        if high - low == last - first + 1:
+            # Every day in between is worked, the common case
+            return [(start, end)]
+        days = work_days[low:high].tolist()
+        spans = []
+        run_start = previous = None
+        for day in days + [None]:
+            if run_start is not None and day != previous + 1:
+                spans.append((
+                    max(start, datetime.fromordinal(run_start)),
+                    min(end, datetime.fromordinal(previous + 1))
+                ))
+                run_start = None
+            if run_start is None:
+                run_start = day
+            previous = day
+        return [(span_start, span_end) for span_start, span_end in spans if span_end > span_start]
+
+    def next_working(self, ordinals: "np.ndarray") -> "np.ndarray":
+        """The first working day on or after each ordinal"""
+        import numpy as np
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        work_days = self._ensure_ordinals(int(ordinals.min()), int(ordinals.max()))[0]
+        return work_days[np.searchsorted(work_days, ordinals)]
+
+    def without(self, days_off: Iterable[date]) -> "WorkingCalendar":
+        """This calendar with more days off, e.g. a resource's exceptions"""
+        days_off = {day.toordinal() for day in days_off}
+        return WorkingCalendar(
+            self.start,
+            self.working_weekdays,
+            [date.fromordinal(day) for day in self.holidays | days_off],
+            [date.fromordinal(day) for day in self.working_dates - days_off]
+        )
+
+def schedule_dates(
+    calendar: WorkingCalendar,
+    entries: Dict[int, Dict],
+    resource_calendars: Optional[Dict[int, WorkingCalendar]] = None,
+    task_resources: Optional[Dict[int, List[int]]] = None
+) -> Dict[int, Tuple[datetime, datetime, datetime]]:
+    """Earliest start, latest start and earliest finish dates of CPM entries, keyed by task id.
+
+    Offsets are converted in the project calendar, so a finish lands on a
+    working day like a start does. A task assigned to resources with days
+    off of their own then starts on the first day on or after that date
+    on which every one of them works, and finishes its duration in
+    working days of the project after that.
+    """
+    import numpy as np
+    task_ids = list(entries)
+    earliest = calendar.to_datetimes([entries[task_id]['earliest_start'] for task_id in task_ids])
+    latest = calendar.to_datetimes([entries[task_id]['latest_start'] for task_id in task_ids])
+    finish = calendar.to_datetimes([entries[task_id]['earliest_finish'] for task_id in task_ids])
+    dates = dict(zip(task_ids, zip(earliest, latest, finish)))
+    if not resource_calendars or not task_resources:
+        return dates
+
+    by_resource: Dict[int, List[int]] = {}
+    for task_id, resource_ids in task_resources.items():
+        if task_id in dates:
+            for resource_id in resource_ids:
+                if resource_id in resource_calendars:
+                    by_resource.setdefault(resource_id, []).append(task_id)
+    for _ in range(len(resource_calendars) + 1):
+        # Moving to one resource's next working day can land on another's day off
+        moved = False
+        for resource_id, resource_task_ids in by_resource.items():
+            resource_calendar = resource_calendars[resource_id]
+            for column in (0, 1):
+                values = [dates[task_id][column] for task_id in resource_task_ids]
+                ordinals = np.array([value.toordinal() for value in values], dtype=np.int64)
+                shifted = resource_calendar.next_working(ordinals)
+                for task_id, value, ordinal, working in zip(
+                    resource_task_ids, values, ordinals.tolist(), shifted.tolist()
+                ):
+                    if working != ordinal:
+                        moved = True
+                        pair = list(dates[task_id])
+                        pair[column] = value + timedelta(days=working - ordinal)
+                        dates[task_id] = tuple(pair)
+        if not moved:
+            break
+
+    # A start moved to a resource's working day keeps the task's length in working days
+    shifted = [task_id for task_id, start in zip(task_ids, earliest) if dates[task_id][0] != start]
+    if shifted:
+        offsets = calendar.to_offsets([dates[task_id][0] for task_id in shifted])
+        finishes = calendar.to_datetimes([
+            offset + entries[task_id]['earliest_finish'] - entries[task_id]['earliest_start']
+            for task_id, offset in zip(shifted, offsets)
+        ])
+        for task_id, value in zip(shifted, finishes):
+            dates[task_id] = dates[task_id][:2] + (value,)
+    return dates
+
+class CalendarRegistry:
+    """Holds each project's working calendar and its resources' calendars"""
+
+    def __init__(self):
+        self._projects: Dict[int, Tuple[WorkingCalendar, Dict[int, WorkingCalendar]]] = {}
+        self.lock = threading.Lock()
+
+    def get(
+        self,
+        project_id: int,
+        loader: Callable[[], Optional[Tuple[WorkingCalendar, Dict[int, WorkingCalendar]]]]
+    ) -> Optional[Tuple[WorkingCalendar, Dict[int, WorkingCalendar]]]:
+        with self.lock:
+            calendars = self._projects.get(project_id)
+        if calendars is None:
+            calendars = loader()
+            if calendars is not None:
+                with self.lock:
+                    self._projects[project_id] = calendars
+        return calendars
+
+    def invalidate(self, project_id: Optional[int] = None):
+        with self.lock:
+            if project_id is None:
+                self._projects.clear()
+            else:
+                self._projects.pop(project_id, None)
+
+def load_calendars(db: Session, project_id: int) -> Optional[Tuple[WorkingCalendar, Dict[int, WorkingCalendar]]]:
+    """Builds the project's calendar and, derived from it, one per resource with days off.
+
+    The calendar starts at the project's start date, or the day it was
+    created if it has none. Returns None for a missing project.
+    """
+    project = db.execute(
+        select(Project.start_date, Project.created_at, Project.working_weekdays)
+        .where(Project.id == project_id)
+    ).first()
+    if project is None:
+        return None
+    start = project.start_date or datetime.combine(
+        (project.created_at or datetime.utcnow()).date(), datetime.min.time()
+    )
+    holidays, working_dates = [], []
+    for day, is_working in db.execute(
+        select(CalendarException.date, CalendarException.is_working)
+        .where(CalendarException.project_id == project_id)
+    ):
+        (working_dates if is_working else holidays).append(day)
+    calendar = WorkingCalendar(
+        start,
+        DEFAULT_WORKING_WEEKDAYS if project.working_weekdays is None else project.working_weekdays,
+        holidays,
+        working_dates
+    )
+
+    # Every resource's days off, so later assignments find their calendar here too
+    days_off: Dict[int, List[date]] = {}
+    for resource_id, day in db.execute(
+        select(CalendarException.resource_id, CalendarException.date)
+        .where(CalendarException.resource_id.is_not(None))
+    ):
+        days_off.setdefault(resource_id, []).append(day)
+    return calendar, {
+        resource_id: calendar.without(days) for resource_id, days in days_off.items()
+    }
+
+def resource_tasks(db: Session, project_id: int, resource_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """The given resources' assignments among the project's tasks, as task id -> resource ids"""
+    assignments: Dict[int, List[int]] = {}
+    for task_id, resource_id in db.execute(
+        select(TaskResourceAssignment.task_id, TaskResourceAssignment.resource_id)
+        .join(Task, Task.id == TaskResourceAssignment.task_id)
+        .where(Task.project_id == project_id)
+        .where(TaskResourceAssignment.resource_id.in_(list(resource_ids)))
+    ):
+        assignments.setdefault(task_id, []).append(resource_id)
+    return assignments
+
+# Ids per IN list when reading the stored dates, under SQLite's bound-parameter limit
+READ_CHUNK = 900
+
+def write_schedule_dates(
+    db: Session,
+    dates: Dict[int, Tuple[datetime, datetime, datetime]]
+) -> Dict[int, Tuple[datetime, datetime, datetime]]:
+    """Stores the dates of schedule_dates that changed with one bulk UPDATE; returns those"""
+    task_ids = list(dates)
+    current = {}
+    for position in range(0, len(task_ids), READ_CHUNK):
+        current.update(
+            (row.id, (row.earliest_start_date, row.latest_start_date, row.earliest_finish_date))
+            for row in db.execute(
+                select(Task.id, Task.earliest_start_date, Task.latest_start_date, Task.earliest_finish_date)
+                .where(Task.id.in_(task_ids[position:position + READ_CHUNK]))
+            )
+        )
+    changed = {
+        task_id: value for task_id, value in dates.items()
+        if task_id in current and current[task_id] != value
+    }
+    if changed:
+        # One executemany on the table; the ORM's bulk update by primary key
+        # does the same with noticeably more overhead per row
+        db.execute(
+            update(Task.__table__)
+            .where(Task.__table__.c.id == bindparam("task_id"))
+            .values(
+                earliest_start_date=bindparam("earliest"),
+                latest_start_date=bindparam("latest"),
+                earliest_finish_date=bindparam("finish")
+            ),
+            [
+                {"task_id": task_id, "earliest": earliest, "latest": latest, "finish": finish}
+                for task_id, (earliest, latest, finish) in changed.items()
+            ]
+        )
+    return changed
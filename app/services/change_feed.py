@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+# Events kept per project for clients that reconnect
+DEFAULT_HISTORY = 1000
+
+class FeedEvent:
+    __slots__ = ("sequence", "type", "data")
+
+    def __init__(self, sequence: int, event_type: str, data: str):
+        self.sequence = sequence
+        self.type = event_type
+        self.data = data  # Serialized once, shared by every subscriber
+
+class Subscription:
+    """Wakes one waiting client from whichever thread publishes"""
+
+    def __init__(self, project_id: int):
+        self.project_id = project_id
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self):
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass  # The client's loop has shut down
+
+    async def wait(self, timeout: float) -> bool:
+        """Waits for new events; False on timeout"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        return True
+
+class ChangeFeed:
+    """Per-project, sequence-numbered change events for push clients.
+
+    Writers publish from any thread once their change is committed. Each
+    project numbers its events from 1 and keeps the last ``history`` of
+    them, so a client that reconnects with the last id it saw is sent what
+    it missed. Ids carry the feed's ``epoch``, which changes on restart;
+    an id from another epoch, or one older than the history, cannot be
+    resumed and the client is told to reload instead.
+    """
+
+    def __init__(self, history: int = DEFAULT_HISTORY):
+        self.history = history
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events: Dict[int, Deque[FeedEvent]] = {}
+        self._sequences: Dict[int, int] = {}
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self.lock = threading.Lock()
+
+    def publish(self, project_id: int, event_type: str, data: Dict) -> int:
+        payload = json.dumps(data, default=str, separators=(",", ":"))
+        with self.lock:
+            sequence = self._sequences.get(project_id, 0) + 1
+            self._sequences[project_id] = sequence
+            events = self._events.get(project_id)
+            if events is None:
+                events = self._events[project_id] = deque(maxlen=self.history)
+            events.append(FeedEvent(sequence, event_type, payload))
+            subscribers = list(self._subscribers.get(project_id, ()))
+        for subscription in subscribers:
+            subscription.notify()
+        return sequence
+
+    def subscribe(self, project_id: int) -> Subscription:
+        """Must be called on the event loop that will wait on the subscription"""
+        subscription = Subscription(project_id)
+        with self.lock:
+            self._subscribers.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            subscribers = self._subscribers.get(subscription.project_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.project_id]
+
+    def last_sequence(self, project_id: int) -> int:
+        with self.lock:
+            return self._sequences.get(project_id, 0)
+
+    def since(self, project_id: int, sequence: int) -> Optional[List[FeedEvent]]:
+        """Events after ``sequence``, or None if some of them were already dropped"""
+        with self.lock:
+            events = self._events.get(project_id)
+            last = self._sequences.get(project_id, 0)
+            if sequence >= last:
+                return []
+            if events is None or events[0].sequence > sequence + 1:
+                return None
+            return [event for event in events if event.sequence > sequence]
+
+    def subscriber_count(self, project_id: Optional[int] = None) -> int:
+        with self.lock:
+            if project_id is not None:
+                return len(self._subscribers.get(project_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.epoch}-{sequence}"
+
+    def parse_event_id(self, event_id: Optional[str]) -> Tuple[bool, Optional[int]]:
+        """Returns (given, sequence); sequence is None when the id cannot be resumed"""
+        if not event_id:
+            return False, None
+        epoch, _, sequence = event_id.strip().rpartition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return True, None
+        return True, int(sequence)
+
+def format_event(event_id: str, event_type: str, data: str) -> str:
+    """One Server-Sent Events frame"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
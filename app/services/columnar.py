@@ -0,0 +1,207 @@
+import json
+import struct
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Requested with "Accept: application/vnd.project-manager.columnar"; JSON stays the default
+MEDIA_TYPE = "application/vnd.project-manager.columnar"
+
+# Layout of a payload, all little-endian:
+#
+#   magic     4 bytes, b"PMC1"
+#   length    uint32, byte length of the header
+#   header    UTF-8 JSON: {"meta": {...}, "columns": [{"name", "dtype", "offset", "length"}]}
+#   padding   to a multiple of 8 bytes
+#   buffers   one per column, each starting on an 8-byte boundary
+#
+# ``offset`` is relative to the first buffer and ``length`` counts elements,
+# so every buffer can be viewed in place as a typed array (Int32Array,
+# Float64Array, ...). Strings are two columns: ``<name>`` holds the UTF-8
+# bytes of every value back to back (dtype "utf8") and ``<name>_offsets``
+# the int32 start of each value plus the end of the last one.
+MAGIC = b"PMC1"
+ALIGNMENT = 8
+
+# numpy is imported by the encoders, so negotiating a JSON response doesn't load it
+DTYPES = {
+    "int32": "<i4",
+    "float64": "<f8",
+    "uint8": "u1",
+    "utf8": "u1",
+}
+
+def accepts_columnar(accept: Optional[str]) -> bool:
+    """True if the Accept header prefers the columnar format over JSON"""
+    if not accept:
+        return False
+    qualities: Dict[str, float] = {}
+    for item in accept.split(","):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_type.lower()] = quality
+    columnar = qualities.get(MEDIA_TYPE, 0.0)
+    json_quality = qualities.get("application/json", qualities.get("*/*", 0.0))
+    return columnar > 0 and columnar >= json_quality
+
+def _pad(length: int) -> int:
+    return -length % ALIGNMENT
+
+def encode(meta: Dict, columns: Dict[str, Tuple[str, "np.ndarray"]]) -> bytes:
+    """Packs ``columns`` (name -> (dtype, array)) and ``meta`` into one payload"""
+    import numpy as np
+    entries = []
+    buffers: List[bytes] = []
+    offset = 0
+    for name, (dtype, values) in columns.items():
+        data = np.ascontiguousarray(values, dtype=DTYPES[dtype]).tobytes()
+        entries.append({
+            "name": name,
+            "dtype": dtype,
+            "offset": offset,
+            "length": len(data) // np.dtype(DTYPES[dtype]).itemsize
+        })
+        buffers.append(data + b"\0" * _pad(len(data)))
+        offset += len(buffers[-1])
+    header = json.dumps({"meta": meta, "columns": entries}, separators=(",", ":")).encode()
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    return prefix + b"\0" * _pad(len(prefix)) + b"".join(buffers)
+
+def decode(payload: bytes) -> Tuple[Dict, Dict[str, "np.ndarray"]]:
+    """Unpacks a payload into its meta and column arrays; the reverse of encode"""
+    import numpy as np
+    if payload[:4] != MAGIC:
+        raise ValueError("Not a columnar payload")
+    (length,) = struct.unpack_from("<I", payload, 4)
+    header = json.loads(payload[8:8 + length])
+    start = 8 + length + _pad(8 + length)
+    columns = {
+        column["name"]: np.frombuffer(
+            payload,
+            dtype=DTYPES[column["dtype"]],
+            count=column["length"],
+            offset=start + column["offset"]
+        )
+        for column in header["columns"]
+    }
+    return header["meta"], columns
+
+def string_columns(name: str, values: Sequence[str]) -> Dict[str, Tuple[str, "np.ndarray"]]:
+    import numpy as np
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int32)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return {
+        name: ("utf8", np.frombuffer(b"".join(encoded), dtype=np.uint8)),
+        f"{name}_offsets": ("int32", offsets)
+    }
+
+def decode_strings(columns: Dict[str, "np.ndarray"], name: str) -> List[str]:
+    data = columns[name].tobytes()
+    offsets = columns[f"{name}_offsets"].tolist()
+    return [data[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+
+NAN = float("nan")
+
+def _float(value: Optional[float]) -> float:
+    return NAN if value is None else value
+
+def _days(values: Sequence[Optional[datetime]], epoch: datetime) -> "np.ndarray":
+    """Days from ``epoch``, NaN for None; much faster than going through datetime64"""
+    import numpy as np
+    return np.fromiter(
+        ((value - epoch).total_seconds() / 86400 if value is not None else NAN for value in values),
+        dtype=np.float64,
+        count=len(values)
+    )
+
+def encode_gantt(project_id: int, rows: List[Dict]) -> bytes:
+    """The rows of gantt_rows as parallel columns.
+
+    Dates are ``start``/``finish`` in days from ``meta.epoch`` (the
+    earliest start), NaN when unknown; a finish without an actual end is
+    the start plus the duration. ``parent`` is the row index of the
+    parent, -1 for none or a parent outside the rows. Predecessors are
+    CSR: the ids of row i's predecessors are
+    ``dependency_ids[dependency_offsets[i]:dependency_offsets[i + 1]]``.
+    Resource names are dictionary encoded the same way, as indexes into
+    the ``resource_names`` string table.
+    """
+    import numpy as np
+    starts = [row["start_date"] for row in rows]
+    dated = [value for value in starts if value is not None]
+    epoch = min(dated) if dated else datetime(1970, 1, 1)
+    start = _days(starts, epoch)
+    durations = np.array([_float(row["duration"]) for row in rows], dtype=np.float64)
+    # Open-ended tasks finish their duration (0 if unknown) after they start
+    finish = _days([row["end_date"] for row in rows], epoch)
+    finish = np.where(np.isnan(finish), start + np.nan_to_num(durations), finish)
+    positions = {row["id"]: position for position, row in enumerate(rows)}
+
+    dependency_offsets = np.zeros(len(rows) + 1, dtype=np.int32)
+    np.cumsum([len(row["dependencies"]) for row in rows], out=dependency_offsets[1:])
+    names: Dict[str, int] = {}
+    resource_offsets = np.zeros(len(rows) + 1, dtype=np.int32)
+    np.cumsum([len(row["assigned_resources"]) for row in rows], out=resource_offsets[1:])
+    resource_codes = [
+        names.setdefault(name, len(names)) for row in rows for name in row["assigned_resources"]
+    ]
+
+    columns = {
+        "id": ("int32", [row["id"] for row in rows]),
+        "start": ("float64", start),
+        "finish": ("float64", finish),
+        "duration": ("float64", durations),
+        "progress": ("float64", [_float(row["progress"]) for row in rows]),
+        "work_hours": ("float64", [_float(row["work_hours"]) for row in rows]),
+        "parent": ("int32", [positions.get(row["parent"], -1) for row in rows]),
+        "dependency_offsets": ("int32", dependency_offsets),
+        "dependency_ids": ("int32", [pred for row in rows for pred in row["dependencies"]]),
+        "resource_offsets": ("int32", resource_offsets),
+        "resource_codes": ("int32", resource_codes),
+    }
+    columns.update(string_columns("title", [row["title"] for row in rows]))
+    columns.update(string_columns("resource_names", list(names)))
+    meta = {
+        "format": "gantt",
+        "project_id": project_id,
+        "rows": len(rows),
+        "epoch": epoch.isoformat()
+    }
+    return encode(meta, columns)
+
+SCHEDULE_COLUMNS = ("earliest_start", "latest_start", "earliest_finish", "latest_finish", "total_float")
+
+def _schedule_columns(prefix: str, entries: Dict) -> Dict[str, Tuple[str, "np.ndarray"]]:
+    task_ids = list(entries)
+    columns = {f"{prefix}id": ("int32", task_ids)}
+    for field in SCHEDULE_COLUMNS:
+        columns[prefix + field] = ("float64", [entries[task_id][field] for task_id in task_ids])
+    return columns
+
+def encode_schedule(response: Dict) -> bytes:
+    """A schedule response as columns, in days from the project start.
+
+    ``task_schedules`` becomes ``id`` plus one float64 column per value,
+    ``changed_tasks`` the same columns prefixed with ``changed_``, and
+    ``critical_path`` an int32 column of task ids.
+    """
+    columns = {"critical_path": ("int32", response["critical_path"])}
+    if "task_schedules" in response:
+        columns.update(_schedule_columns("", response["task_schedules"]))
+    columns.update(_schedule_columns("changed_", response["changed_tasks"]))
+    meta = {
+        "format": "schedule",
+        "project_id": response["project_id"],
+        "project_duration": response["project_duration"]
+    }
+    return encode(meta, columns)
@@ -0,0 +1,465 @@
+import copy
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from ..models.task import Task, TaskDependency, DependencyType
+from .cpm_types import DEPENDENCY_CODES, FF, FS, SF, SS, SchedulingError
+
+def boundary_release(dependency: TaskDependency, boundaries: Dict[int, Tuple[float, float]]) -> float:
+    """Earliest start a dependency on a fixed outside task allows its successor"""
+    start, finish = boundaries[dependency.predecessor_id]
+    if dependency.dependency_type == DependencyType.START_TO_START:
+        return start + (dependency.lag_time or 0)
+    # Like the passes, every other type waits for the predecessor's finish
+    return finish + (dependency.lag_time or 0)
+
+class CompiledGraph:
+    """Tasks and dependencies compiled into flat integer/float arrays.
+
+    Tasks are addressed by their position in ``task_ids``. Edges are stored
+    once, sorted by successor, with a CSR row index in both directions:
+    ``in_offsets`` (edges into a task) and ``out_offsets``/``out_edges``
+    (edges out of a task). ``release`` is the earliest a task may start,
+    0 unless it depends on a task of another project (see from_records).
+    """
+
+    def __init__(
+        self,
+        task_ids: np.ndarray,
+        durations: np.ndarray,
+        edge_pred: np.ndarray,
+        edge_succ: np.ndarray,
+        edge_type: np.ndarray,
+        edge_lag: np.ndarray,
+        is_milestone: Optional[np.ndarray] = None,
+        is_locked: Optional[np.ndarray] = None,
+        missing: Sequence[int] = (),
+        release: Optional[np.ndarray] = None
+    ):
+        n = len(task_ids)
+        order = np.argsort(edge_succ, kind="stable")
+        self.task_ids = np.asarray(task_ids, dtype=np.int64)
+        self.durations = np.asarray(durations, dtype=np.float64)
+        self.edge_pred = np.asarray(edge_pred, dtype=np.int64)[order]
+        self.edge_succ = np.asarray(edge_succ, dtype=np.int64)[order]
+        self.edge_type = np.asarray(edge_type, dtype=np.int8)[order]
+        self.edge_lag = np.asarray(edge_lag, dtype=np.float64)[order]
+        self.is_milestone = (
+            np.zeros(n, dtype=bool) if is_milestone is None else np.asarray(is_milestone, dtype=bool)
+        )
+        self.is_locked = (
+            np.zeros(n, dtype=bool) if is_locked is None else np.asarray(is_locked, dtype=bool)
+        )
+        self.missing = list(missing)
+        self.release = (
+            np.zeros(n, dtype=np.float64) if release is None else np.asarray(release, dtype=np.float64)
+        )
+
+        self.in_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_succ, minlength=n), out=self.in_offsets[1:])
+        self.out_edges = np.argsort(self.edge_pred, kind="stable")
+        self.out_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_pred, minlength=n), out=self.out_offsets[1:])
+        self._levels = None
+        self._positions = None
+
+    @classmethod
+    def from_records(
+        cls,
+        tasks: Iterable[Task],
+        dependencies: Iterable[TaskDependency],
+        boundaries: Optional[Dict[int, Tuple[float, float]]] = None
+    ) -> "CompiledGraph":
+        """Compiles ORM tasks and dependencies (or any objects with the same attributes)
+
+        ``boundaries`` maps tasks outside ``tasks`` to their fixed
+        (earliest start, earliest finish). A dependency on one of them
+        becomes a release time of its successor instead of an edge; any
+        other dependency on an unknown task is reported in ``missing``.
+        """
+        boundaries = boundaries or {}
+        positions: Dict[int, int] = {}
+        task_ids, durations, milestones, locked = [], [], [], []
+        for task in tasks:
+            if task.id in positions:
+                position = positions[task.id]
+                durations[position] = task.duration or 0
+                milestones[position] = bool(task.is_milestone)
+                locked[position] = bool(task.is_locked)
+                continue
+            positions[task.id] = len(task_ids)
+            task_ids.append(task.id)
+            durations.append(task.duration or 0)
+            milestones.append(bool(task.is_milestone))
+            locked.append(bool(task.is_locked))
+
+        # Later rows for the same pair win, as with networkx.DiGraph.add_edge
+        edges = {}
+        missing = set()
+        release = np.zeros(len(task_ids), dtype=np.float64)
+        for dep in dependencies:
+            pred = positions.get(dep.predecessor_id)
+            succ = positions.get(dep.successor_id)
+            if pred is None and succ is not None and dep.predecessor_id in boundaries:
+                release[succ] = max(release[succ], boundary_release(dep, boundaries))
+                continue
+            if pred is None or succ is None:
+                missing.update(
+                    task_id for task_id in (dep.predecessor_id, dep.successor_id)
+                    if task_id not in positions
+                )
+                continue
+            edges[(pred, succ)] = (
+                DEPENDENCY_CODES[dep.dependency_type or DependencyType.FINISH_TO_START],
+                dep.lag_time or 0
+            )
+
+        graph = cls(
+            np.array(task_ids, dtype=np.int64),
+            np.array(durations, dtype=np.float64),
+            np.fromiter((pred for pred, _ in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((succ for _, succ in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((code for code, _ in edges.values()), dtype=np.int8, count=len(edges)),
+            np.fromiter((lag for _, lag in edges.values()), dtype=np.float64, count=len(edges)),
+            is_milestone=np.array(milestones, dtype=bool),
+            is_locked=np.array(locked, dtype=bool),
+            missing=sorted(missing),
+            release=release
+        )
+        graph._positions = positions
+        return graph
+
+    def __reduce__(self):
+        # Pickle only the primary arrays; the CSR indexes, levels and
+        # position map are rebuilt or recomputed on the receiving side
+        return (CompiledGraph, (
+            self.task_ids, self.durations, self.edge_pred, self.edge_succ,
+            self.edge_type, self.edge_lag, self.is_milestone, self.is_locked, self.missing,
+            self.release
+        ))
+
+    def __copy__(self):
+        # Shares every array, index and the levels; copy.copy would otherwise
+        # go through __reduce__ and rebuild the graph from scratch
+        graph = CompiledGraph.__new__(CompiledGraph)
+        graph.__dict__.update(self.__dict__)
+        return graph
+
+    def position(self, task_id: int) -> int:
+        try:
+            return self.positions[task_id]
+        except KeyError:
+            raise SchedulingError(f"Task {task_id} is not in the schedule") from None
+
+    def edge(self, pred_id: int, succ_id: int) -> int:
+        """Index of the edge from one task to another, found through the successor's CSR row"""
+        succ = self.position(succ_id)
+        first, last = self.in_offsets[succ], self.in_offsets[succ + 1]
+        matches = np.flatnonzero(self.edge_pred[first:last] == self.position(pred_id))
+        if not len(matches):
+            raise SchedulingError(f"There is no dependency from task {pred_id} to task {succ_id}")
+        return int(first + matches[0])
+
+    def with_changes(
+        self,
+        durations: Optional[Dict[int, float]] = None,
+        lags: Optional[Dict[Tuple[int, int], float]] = None,
+        removed: Iterable[Tuple[int, int]] = (),
+        added: Iterable[Tuple[int, int, DependencyType, float]] = ()
+    ) -> "CompiledGraph":
+        """A variant of this graph with some durations, lags or edges changed.
+
+        Keys are task ids and (predecessor id, successor id) pairs; added
+        edges replace an existing edge between the same tasks. Arrays that
+        stay the same are shared with this graph rather than copied, and
+        so are the topological levels while no edge is added or removed.
+        """
+        graph = copy.copy(self)
+        if durations:
+            graph.durations = self.durations.copy()
+            for task_id, duration in durations.items():
+                graph.durations[self.position(task_id)] = duration
+        if lags:
+            graph.edge_lag = self.edge_lag.copy()
+            for (pred_id, succ_id), lag in lags.items():
+                graph.edge_lag[self.edge(pred_id, succ_id)] = lag
+        removed, added = list(removed), list(added)
+        if not removed and not added:
+            return graph
+
+        keep = np.ones(self.num_edges, dtype=bool)
+        for pred_id, succ_id in removed:
+            keep[self.edge(pred_id, succ_id)] = False
+        for pred_id, succ_id, _, _ in added:
+            succ = self.position(succ_id)
+            row = slice(self.in_offsets[succ], self.in_offsets[succ + 1])
+            keep[row] &= self.edge_pred[row] != self.position(pred_id)
+        changed = CompiledGraph(
+            self.task_ids,
+            graph.durations,
+            np.concatenate([self.edge_pred[keep], np.array([self.position(edge[0]) for edge in added], dtype=np.int64)]),
+            np.concatenate([self.edge_succ[keep], np.array([self.position(edge[1]) for edge in added], dtype=np.int64)]),
+            np.concatenate([self.edge_type[keep], np.array([DEPENDENCY_CODES[edge[2]] for edge in added], dtype=np.int8)]),
+            np.concatenate([graph.edge_lag[keep], np.array([edge[3] for edge in added], dtype=np.float64)]),
+            is_milestone=self.is_milestone,
+            is_locked=self.is_locked,
+            missing=self.missing,
+            release=self.release
+        )
+        changed._positions = self._positions
+        return changed
+
+    @property
+    def num_tasks(self) -> int:
+        return len(self.task_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_pred)
+
+    @property
+    def positions(self) -> Dict[int, int]:
+        """Maps task id to array position"""
+        if self._positions is None:
+            self._positions = {task_id: i for i, task_id in enumerate(self.task_ids.tolist())}
+        return self._positions
+
+    def levels(self) -> "TopologicalLevels":
+        """Returns the topological levels, raising SchedulingError on cycles"""
+        if self._levels is None:
+            self._levels = TopologicalLevels(self)
+        return self._levels
+
+    def find_cycle(self) -> List[int]:
+        """Returns the task ids of one cycle, or an empty list if the graph is acyclic"""
+        remaining = _kahn_remaining(self)
+        if not remaining.any():
+            return []
+        node = int(np.flatnonzero(remaining)[0])
+        seen = {}
+        path = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            preds = self.edge_pred[self.in_offsets[node]:self.in_offsets[node + 1]]
+            node = int(preds[remaining[preds]][0])
+        cycle = path[seen[node]:]
+        cycle.reverse()
+        return [int(self.task_ids[i]) for i in cycle]
+
+def _kahn_remaining(graph: CompiledGraph, levels: Optional[np.ndarray] = None) -> np.ndarray:
+    """Runs Kahn's algorithm and returns the mask of tasks left on cycles"""
+    in_degree = np.diff(graph.in_offsets).tolist()
+    level = [0] * graph.num_tasks
+    succ = graph.edge_succ.tolist()
+    out_edges = graph.out_edges.tolist()
+    offsets = graph.out_offsets.tolist()
+    ready = [node for node, degree in enumerate(in_degree) if degree == 0]
+    for node in ready:  # ready grows while it is iterated
+        next_level = level[node] + 1
+        for e in out_edges[offsets[node]:offsets[node + 1]]:
+            s = succ[e]
+            if level[s] < next_level:
+                level[s] = next_level
+            in_degree[s] -= 1
+            if in_degree[s] == 0:
+                ready.append(s)
+    if levels is not None:
+        levels[:] = level
+    remaining = np.ones(graph.num_tasks, dtype=bool)
+    remaining[ready] = False
+    return remaining
+
+class TopologicalLevels:
+    """Tasks and edges grouped by topological level for level-at-a-time passes"""
+
+    def __init__(self, graph: CompiledGraph):
+        n = graph.num_tasks
+        level = np.zeros(n, dtype=np.int64)
+        if _kahn_remaining(graph, level).any():
+            raise SchedulingError("Circular dependencies detected")
+        self.count = int(level.max()) + 1 if n else 0
+        self.level = level
+
+        self.nodes = np.argsort(level, kind="stable")
+        self.node_offsets = np.searchsorted(level[self.nodes], np.arange(self.count + 1))
+
+        # Edges grouped by the level of their successor (forward pass) and of
+        # their predecessor (backward pass)
+        succ_level = level[graph.edge_succ]
+        self.in_edges = np.argsort(succ_level, kind="stable")
+        self.in_edge_offsets = np.searchsorted(succ_level[self.in_edges], np.arange(self.count + 1))
+        pred_level = level[graph.edge_pred]
+        self.out_edges = np.argsort(pred_level, kind="stable")
+        self.out_edge_offsets = np.searchsorted(pred_level[self.out_edges], np.arange(self.count + 1))
+
+# Graphs with fewer tasks per level than this run the passes as a scalar
+# loop over the precomputed order; numpy call overhead dominates otherwise.
+MIN_VECTOR_LEVEL_WIDTH = 8
+
+def forward_pass(graph: CompiledGraph, durations: Optional[np.ndarray] = None) -> np.ndarray:
+    """Returns earliest starts, one level of the DAG at a time"""
+    levels = graph.levels()
+    durations = graph.durations if durations is None else durations
+    if levels.count * MIN_VECTOR_LEVEL_WIDTH > graph.num_tasks:
+        return _forward_scalar(graph, levels, durations)
+
+    earliest_start = graph.release.copy()
+    from_start = graph.edge_type == SS
+    for l in range(1, levels.count):
+        edges = levels.in_edges[levels.in_edge_offsets[l]:levels.in_edge_offsets[l + 1]]
+        preds = graph.edge_pred[edges]
+        pred_start = earliest_start[preds]
+        times = np.where(from_start[edges], pred_start, pred_start + durations[preds]) + graph.edge_lag[edges]
+        np.maximum.at(earliest_start, graph.edge_succ[edges], times)
+    return earliest_start
+
+def backward_pass(
+    graph: CompiledGraph,
+    project_end: Union[float, np.ndarray],
+    durations: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Returns latest finishes, one level of the DAG at a time
+
+    ``project_end`` is where tasks without successors finish at the
+    latest: one value for all of them, or an array with one per task.
+    """
+    levels = graph.levels()
+    durations = graph.durations if durations is None else durations
+    ends = np.broadcast_to(np.asarray(project_end, dtype=np.float64), (graph.num_tasks,))
+    if levels.count * MIN_VECTOR_LEVEL_WIDTH > graph.num_tasks:
+        return _backward_scalar(graph, levels, ends, durations)
+
+    latest_finish = np.full(graph.num_tasks, np.inf)
+    sinks = np.diff(graph.out_offsets) == 0
+    latest_finish[sinks] = ends[sinks]
+    latest_start = np.empty(graph.num_tasks, dtype=np.float64)
+    to_finish = graph.edge_type == FF
+    for l in range(levels.count - 1, -1, -1):
+        edges = levels.out_edges[levels.out_edge_offsets[l]:levels.out_edge_offsets[l + 1]]
+        if len(edges):
+            succs = graph.edge_succ[edges]
+            times = np.where(to_finish[edges], latest_finish[succs], latest_start[succs]) - graph.edge_lag[edges]
+            np.minimum.at(latest_finish, graph.edge_pred[edges], times)
+        nodes = levels.nodes[levels.node_offsets[l]:levels.node_offsets[l + 1]]
+        latest_start[nodes] = latest_finish[nodes] - durations[nodes]
+    return latest_finish
+
+def _forward_scalar(graph: CompiledGraph, levels: TopologicalLevels, durations: np.ndarray) -> np.ndarray:
+    duration = durations.tolist()
+    pred = graph.edge_pred.tolist()
+    kind = graph.edge_type.tolist()
+    lag = graph.edge_lag.tolist()
+    offsets = graph.in_offsets.tolist()
+    earliest_start = graph.release.tolist()
+    for node in levels.nodes.tolist():
+        best = earliest_start[node]
+        for e in range(offsets[node], offsets[node + 1]):
+            p = pred[e]
+            if kind[e] == SS:
+                time = earliest_start[p] + lag[e]
+            else:
+                time = earliest_start[p] + duration[p] + lag[e]
+            if time > best:
+                best = time
+        earliest_start[node] = best
+    return np.array(earliest_start, dtype=np.float64)
+
+def _backward_scalar(
+    graph: CompiledGraph,
+    levels: TopologicalLevels,
+    ends: np.ndarray,
+    durations: np.ndarray
+) -> np.ndarray:
+    duration = durations.tolist()
+    succ = graph.edge_succ.tolist()
+    kind = graph.edge_type.tolist()
+    lag = graph.edge_lag.tolist()
+    out_edges = graph.out_edges.tolist()
+    offsets = graph.out_offsets.tolist()
+    latest_finish = ends.tolist()
+    latest_start = [0.0] * graph.num_tasks
+    for node in reversed(levels.nodes.tolist()):
+        first, last = offsets[node], offsets[node + 1]
+        if first < last:
+            best = float('inf')
+            for e in out_edges[first:last]:
+                s = succ[e]
+                if kind[e] == FF:
+                    time = latest_finish[s] - lag[e]
+                else:
+                    time = latest_start[s] - lag[e]
+                if time < best:
+                    best = time
+            latest_finish[node] = best
+        latest_start[node] = latest_finish[node] - duration[node]
+    return np.array(latest_finish, dtype=np.float64)
+
+def critical_path(
+    graph: CompiledGraph,
+    timings: Optional[Dict[str, float]] = None,
+    schedule: bool = True
+) -> Dict:
+    """Array implementation of ProjectScheduler.calculate_critical_path
+
+    When ``timings`` is given, the seconds spent in each phase are added to
+    it. Without ``schedule`` the per-task entries are left out, which is
+    most of the cost on large graphs.
+    """
+    mark = time.perf_counter()
+
+    def phase(name: str):
+        nonlocal mark
+        now = time.perf_counter()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + now - mark
+        mark = now
+
+    if graph.missing:
+        raise SchedulingError(
+            f"Dependencies reference tasks outside the schedule: {graph.missing}"
+        )
+    graph.levels()  # Raises on cycles before any work is done
+    phase("cycle_check")
+
+    earliest_start = forward_pass(graph)
+    earliest_finish = earliest_start + graph.durations
+    project_end = float(earliest_finish.max())
+    phase("forward_pass")
+    latest_finish = backward_pass(graph, project_end)
+    latest_start = latest_finish - graph.durations
+    total_float = latest_start - earliest_start
+    phase("backward_pass")
+
+    result = {
+        'critical_path': graph.task_ids[total_float == 0].tolist(),
+        'project_duration': project_end
+    }
+    if not schedule:
+        phase("results")
+        return result
+    columns = zip(
+        graph.task_ids.tolist(),
+        earliest_start.tolist(),
+        latest_start.tolist(),
+        earliest_finish.tolist(),
+        latest_finish.tolist(),
+        total_float.tolist()
+    )
+    result['schedule'] = {
+        task_id: {
+            'earliest_start': es,
+            'latest_start': ls,
+            'earliest_finish': ef,
+            'latest_finish': lf,
+            'total_float': tf
+        }
+        for task_id, es, ls, ef, lf, tf in columns
+    }
+    phase("results")
+    return result
+
+def timed_critical_path(graph: CompiledGraph) -> Tuple[Dict, Dict[str, float]]:
+    """critical_path plus its phase timings, for running in a worker process"""
+    timings: Dict[str, float] = {}
+    return critical_path(graph, timings), timings
@@ -0,0 +1,16 @@
+from ..models.task import DependencyType
+
+# The parts of cpm_engine that don't need numpy, so modules loaded at
+# startup can use them without importing it
+
+class SchedulingError(Exception):
+    pass
+
+# Integer codes used for dependency types in the compiled arrays
+DEPENDENCY_CODES = {
+    DependencyType.FINISH_TO_START: 0,
+    DependencyType.START_TO_START: 1,
+    DependencyType.FINISH_TO_FINISH: 2,
+    DependencyType.START_TO_FINISH: 3,
+}
+FS, SS, FF, SF = 0, 1, 2, 3
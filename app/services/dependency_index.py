@@ -0,0 +1,233 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+class CycleError(Exception):
+    pass
+
+class DependencyIndex:
+    """Adjacency index for one project that keeps an online topological order.
+
+    New edges that already point "forward" in the order are accepted in O(1).
+    Edges that point backward only search the region of the order between the
+    two endpoints (Pearce-Kelly), so the cost is bounded by the affected region
+    instead of the whole graph.
+
+    Tasks of other projects appear only as endpoints of cross-project edges
+    and are kept in ``external``. Their own edges are not in the index, so
+    while ``external`` is non-empty a cycle may run outside the index and
+    would_create_cycle cannot rule one out.
+    """
+
+    def __init__(self):
+        self.successors: Dict[int, Set[int]] = {}
+        self.predecessors: Dict[int, Set[int]] = {}
+        self.order: Dict[int, int] = {}
+        self.external: Set[int] = set()
+        self._next_position = 0
+        self._acyclic = True
+
+    @classmethod
+    def from_edges(cls, nodes: Iterable[int], edges: Iterable[Tuple[int, int]]) -> "DependencyIndex":
+        """Builds an index and its initial topological order with Kahn's algorithm"""
+        index = cls()
+        for node in nodes:
+            index.add_node(node)
+        for pred, succ in edges:
+            for node in (pred, succ):
+                if node not in index.order:
+                    index.add_node(node)
+                    index.external.add(node)
+            index.successors[pred].add(succ)
+            index.predecessors[succ].add(pred)
+
+        in_degree = {node: len(preds) for node, preds in index.predecessors.items()}
+        ready = [node for node in index.order if in_degree[node] == 0]
+        position = 0
+        while ready:
+            node = ready.pop()
+            index.order[node] = position
+            position += 1
+            for succ in index.successors[node]:
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    ready.append(succ)
+
+        if position < len(index.order):
+            # Legacy data already contains a cycle: keep the index usable but
+            # fall back to unbounded searches until it is rebuilt.
+            index._acyclic = False
+            for node, degree in in_degree.items():
+                if degree > 0:
+                    index.order[node] = position
+                    position += 1
+        index._next_position = position
+        return index
+
+    def __contains__(self, node: int) -> bool:
+        return node in self.order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @property
+    def is_acyclic(self) -> bool:
+        return self._acyclic
+
+    def add_node(self, node: int):
+        if node in self.order:
+            return
+        self.successors[node] = set()
+        self.predecessors[node] = set()
+        self.order[node] = self._next_position
+        self._next_position += 1
+
+    def remove_node(self, node: int):
+        if node not in self.order:
+            return
+        for succ in self.successors.pop(node):
+            self.predecessors[succ].discard(node)
+        for pred in self.predecessors.pop(node):
+            self.successors[pred].discard(node)
+        del self.order[node]
+        self.external.discard(node)
+
+    def has_edge(self, pred: int, succ: int) -> bool:
+        return succ in self.successors.get(pred, ())
+
+    def would_create_cycle(self, pred: int, succ: int) -> bool:
+        """Returns True if adding pred -> succ would close a cycle among the indexed edges.
+
+        Only conclusive when ``external`` is empty and both tasks belong to
+        the project; otherwise check the whole dependency table.
+        """
+        if pred == succ:
+            return True
+        if pred not in self.order or succ not in self.order:
+            return False
+        if self._acyclic and self.order[pred] < self.order[succ]:
+            return False
+        return self._forward_region(succ, pred) is None
+
+    def add_edge(self, pred: int, succ: int, external: Iterable[int] = ()):
+        """Adds pred -> succ, reordering only the affected region.
+
+        ``external`` names the endpoints that belong to another project.
+        """
+        if pred == succ:
+            raise CycleError(f"Task {pred} cannot depend on itself")
+        self.add_node(pred)
+        self.add_node(succ)
+        self.external.update(external)
+        if self.has_edge(pred, succ):
+            return
+
+        if self.order[pred] > self.order[succ] or not self._acyclic:
+            forward = self._forward_region(succ, pred)
+            if forward is None:
+                raise CycleError(f"Dependency {pred} -> {succ} would create a circular reference")
+            if self._acyclic:
+                self._reorder(self._backward_region(pred, self.order[succ]), forward)
+
+        self.successors[pred].add(succ)
+        self.predecessors[succ].add(pred)
+
+    def remove_edge(self, pred: int, succ: int):
+        """Removes pred -> succ; the current order stays a valid topological order"""
+        if pred in self.successors:
+            self.successors[pred].discard(succ)
+        if succ in self.predecessors:
+            self.predecessors[succ].discard(pred)
+        for node in (pred, succ):
+            # An outside task stays only while a cross-project edge still reaches it
+            if node in self.external and not self.successors[node] and not self.predecessors[node]:
+                self.remove_node(node)
+
+    def topological_order(self) -> List[int]:
+        return sorted(self.order, key=self.order.__getitem__)
+
+    def _forward_region(self, start: int, target: int) -> Optional[List[int]]:
+        """Nodes reachable from start that sit before target in the order, or None if target is reachable"""
+        upper = self.order[target] if self._acyclic else None
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for succ in self.successors[node]:
+                if succ == target:
+                    return None
+                if succ in visited:
+                    continue
+                if upper is not None and self.order[succ] > upper:
+                    continue
+                visited.add(succ)
+                stack.append(succ)
+        return list(visited)
+
+    def _backward_region(self, start: int, lower: int) -> List[int]:
+        """Nodes that reach start and sit after position lower in the order"""
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for pred in self.predecessors[node]:
+                if pred not in visited and self.order[pred] > lower:
+                    visited.add(pred)
+                    stack.append(pred)
+        return list(visited)
+
+    def _reorder(self, backward: List[int], forward: List[int]):
+        backward.sort(key=self.order.__getitem__)
+        forward.sort(key=self.order.__getitem__)
+        positions = sorted(self.order[node] for node in backward + forward)
+        for node, position in zip(backward + forward, positions):
+            self.order[node] = position
+
+class DependencyIndexRegistry:
+    """Holds one lazily loaded DependencyIndex per project"""
+
+    def __init__(self):
+        self._indexes: Dict[int, DependencyIndex] = {}
+        self.lock = threading.RLock()
+
+    def get(
+        self,
+        project_id: int,
+        loader: Callable[[], Tuple[Iterable[int], Iterable[Tuple[int, int]]]]
+    ) -> DependencyIndex:
+        with self.lock:
+            index = self._indexes.get(project_id)
+            if index is None:
+                nodes, edges = loader()
+                index = DependencyIndex.from_edges(nodes, edges)
+                self._indexes[project_id] = index
+            return index
+
+    def peek(self, project_id: int) -> Optional[DependencyIndex]:
+        with self.lock:
+            return self._indexes.get(project_id)
+
+    def add_edge(self, project_id: int, pred: int, succ: int, external: Iterable[int] = ()):
+        """Adds an edge to the project's index if it is loaded"""
+        with self.lock:
+            index = self._indexes.get(project_id)
+            if index is not None:
+                index.add_edge(pred, succ, external)
+
+    def remove_edge(self, project_id: int, pred: int, succ: int):
+        with self.lock:
+            index = self._indexes.get(project_id)
+            if index is not None:
+                index.remove_edge(pred, succ)
+
+    def add_task(self, project_id: int, task_id: int):
+        with self.lock:
+            index = self._indexes.get(project_id)
+            if index is not None:
+                index.add_node(task_id)
+
+    def invalidate(self, project_id: Optional[int] = None):
+        with self.lock:
+            if project_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(project_id, None)
@@ -0,0 +1,265 @@
+import csv
+import io
+import zipfile
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+from ..models.task import Task, TaskDependency, TaskResourceAssignment, Resource, DependencyType
+
+# Rows fetched per round trip from the server-side cursors
+FETCH_SIZE = 1000
+
+# Buffered output is flushed to the client once it grows past this many bytes
+FLUSH_BYTES = 64 * 1024
+
+# The first column names match the importer, so an export can be re-imported
+EXPORT_COLUMNS = [
+    "unique_id", "title", "description", "duration", "work_hours", "progress",
+    "priority", "status", "is_milestone", "is_locked", "parent", "predecessors",
+    "resources", "start_date", "end_date", "earliest_start", "earliest_finish",
+    "latest_start", "latest_finish", "total_float", "critical"
+]
+
+SCHEDULE_FIELDS = ("earliest_start", "earliest_finish", "latest_start", "latest_finish", "total_float")
+
+def _format_number(value: float) -> str:
+    return f"{value:g}"
+
+def _group_by_task(rows) -> Iterator[Tuple[int, List]]:
+    """Groups a task-ordered row stream into (task_id, rows) runs"""
+    task_id = None
+    group: List = []
+    for row in rows:
+        if row[0] != task_id:
+            if group:
+                yield task_id, group
+            task_id, group = row[0], []
+        group.append(row)
+    if group:
+        yield task_id, group
+
+class _MergeJoin:
+    """Looks up grouped rows for increasing task ids from a task-ordered stream"""
+
+    def __init__(self, rows):
+        self._groups = _group_by_task(rows)
+        self._current = next(self._groups, None)
+
+    def take(self, task_id: int) -> List:
+        while self._current is not None and self._current[0] < task_id:
+            self._current = next(self._groups, None)
+        if self._current is not None and self._current[0] == task_id:
+            return self._current[1]
+        return []
+
+def export_rows(
+    db: Session,
+    project_id: int,
+    schedule: Callable[[int], Optional[Dict]]
+) -> Iterator[List]:
+    """Yields one list of EXPORT_COLUMNS values per task, in task id order.
+
+    Tasks, predecessors and assignments are read from three cursors that
+    share the task id order and are merge-joined, so only one task's rows
+    are held at a time. ``schedule`` returns the CPM entry of a task id.
+    """
+    parent = aliased(Task)
+    predecessor = aliased(Task)
+    project_tasks = select(Task.id).where(Task.project_id == project_id)
+    stream = {"yield_per": FETCH_SIZE}
+
+    tasks = db.execute(
+        select(
+            Task.id, Task.unique_id, Task.title, Task.description, Task.duration,
+            Task.work_hours, Task.progress, Task.priority, Task.status,
+            Task.is_milestone, Task.is_locked, parent.unique_id.label("parent"),
+            Task.actual_start_date, Task.earliest_start_date, Task.actual_end_date
+        )
+        .outerjoin(parent, parent.id == Task.parent_id)
+        .where(Task.project_id == project_id)
+        .order_by(Task.id)
+        .execution_options(**stream)
+    )
+    predecessors = _MergeJoin(db.execute(
+        select(
+            TaskDependency.successor_id, predecessor.unique_id,
+            TaskDependency.dependency_type, TaskDependency.lag_time
+        )
+        .join(predecessor, predecessor.id == TaskDependency.predecessor_id)
+        .where(TaskDependency.successor_id.in_(project_tasks))
+        .order_by(TaskDependency.successor_id, TaskDependency.id)
+        .execution_options(**stream)
+    ))
+    resources = _MergeJoin(db.execute(
+        select(TaskResourceAssignment.task_id, Resource.name, TaskResourceAssignment.assigned_hours)
+        .join(Resource, Resource.id == TaskResourceAssignment.resource_id)
+        .where(TaskResourceAssignment.task_id.in_(project_tasks))
+        .order_by(TaskResourceAssignment.task_id, TaskResourceAssignment.id)
+        .execution_options(**stream)
+    ))
+
+    for task in tasks:
+        links = []
+        for _, uid, dep_type, lag in predecessors.take(task.id):
+            link = uid or ""
+            if dep_type and dep_type != DependencyType.FINISH_TO_START:
+                link += dep_type.value
+            if lag:
+                link += f"{lag:+g}"
+            links.append(link)
+        entry = schedule(task.id) or {}
+        yield [
+            task.unique_id,
+            task.title,
+            task.description,
+            task.duration,
+            task.work_hours,
+            task.progress,
+            task.priority.value if task.priority else None,
+            task.status.value if task.status else None,
+            bool(task.is_milestone),
+            bool(task.is_locked),
+            task.parent,
+            "; ".join(links),
+            "; ".join(
+                f"{name}:{_format_number(hours)}" for _, name, hours in resources.take(task.id)
+            ),
+            task.actual_start_date or task.earliest_start_date,
+            task.actual_end_date
+        ] + [entry.get(field) for field in SCHEDULE_FIELDS] + [
+            entry.get("total_float") == 0 if entry else None
+        ]
+
+class _TextBuffer(io.StringIO):
+    def drain(self) -> bytes:
+        data = self.getvalue().encode("utf-8")
+        self.seek(0)
+        self.truncate()
+        return data
+
+def stream_csv(rows: Iterator[List]) -> Iterator[bytes]:
+    """Encodes rows as CSV, yielding the header straight away and then ~64KB chunks"""
+    buffer = _TextBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # A BOM lets spreadsheet applications detect UTF-8
+    yield "\ufeff".encode("utf-8") + buffer.drain()
+
+    for row in rows:
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.drain()
+    yield buffer.drain()
+
+class _ByteSink(io.RawIOBase):
+    """Write-only, non-seekable file that collects what zipfile writes"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Schedule" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    )
+}
+
+def _xlsx_cell(value) -> str:
+    if value is None or value == "":
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value!r}</v></c>"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+def stream_xlsx(rows: Iterator[List]) -> Iterator[bytes]:
+    """Writes a single-sheet workbook as a streamed zip.
+
+    Cells use inline strings, so there is no shared-string table to
+    build up front, and the sheet XML is deflated as the rows arrive.
+    """
+    sink = _ByteSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData><row>'
+                + "".join(_xlsx_cell(column) for column in EXPORT_COLUMNS).encode("utf-8")
+                + b'</row>'
+            )
+            yield sink.drain()
+            pending = []
+            pending_size = 0
+            for row in rows:
+                line = "<row>" + "".join(_xlsx_cell(value) for value in row) + "</row>"
+                pending.append(line)
+                pending_size += len(line)
+                if pending_size >= FLUSH_BYTES:
+                    sheet.write("".join(pending).encode("utf-8"))
+                    pending, pending_size = [], 0
+                    yield sink.drain()
+            sheet.write(("".join(pending) + "</sheetData></worksheet>").encode("utf-8"))
+    yield sink.drain()
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "xlsx": (stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+}
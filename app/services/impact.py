@@ -0,0 +1,91 @@
+from collections import deque
+from typing import TYPE_CHECKING, Dict, List, Optional
+from .cpm_types import SS
+
+if TYPE_CHECKING:
+    from .schedule_cache import ScheduleState
+
+def _reach(neighbours: Dict[int, set], task_id: int, depth: Optional[int]) -> Dict[int, int]:
+    """Tasks reachable from task_id through ``neighbours``, with their fewest hops"""
+    hops = {task_id: 0}
+    queue = deque([task_id])
+    while queue:
+        node = queue.popleft()
+        next_hops = hops[node] + 1
+        if depth is not None and next_hops > depth:
+            continue
+        for neighbour in neighbours[node]:
+            if neighbour not in hops:
+                hops[neighbour] = next_hops
+                queue.append(neighbour)
+    return hops
+
+def task_impact(state: "ScheduleState", task_id: int, direction: str = "down", depth: Optional[int] = None) -> List[Dict]:
+    """Tasks that ``task_id`` holds up ("down") or that hold it up ("up").
+
+    Reachability comes from the state's dependency index, whose adjacency
+    and topological order are kept current by every dependency write, so
+    the walk only touches the tasks it returns. ``depth`` limits the
+    number of dependency hops.
+
+    Along the driving path between the two tasks, the longest chain of
+    dependency offsets (the predecessor's duration plus the lag, only
+    the lag for start-to-start), each task reports:
+
+    - ``lag``: the lags accumulated along that path
+    - ``path_float``: how many days the upstream task of the pair can slip
+      before the downstream one has to move
+    - ``via``: the next task on the path back towards ``task_id``
+
+    Only paths through the returned tasks count, which matters when
+    ``depth`` cuts paths short. The walk stays within the state's
+    project: predecessors in other projects only show as the earliest
+    starts they allow, and successors in other projects are not listed.
+    Call with the schedule cache lock held.
+    """
+    index = state.index
+    downstream = direction == "down"
+    hops = _reach(index.successors if downstream else index.predecessors, task_id, depth)
+    # Upstream neighbours come first in this order, so one pass settles every path
+    nodes = sorted(hops, key=index.order.__getitem__, reverse=not downstream)
+    neighbours = index.predecessors if downstream else index.successors
+    durations = state.durations
+    edges = state.edges
+    distance = {task_id: 0.0}
+    lags = {task_id: 0.0}
+    via: Dict[int, int] = {}
+    for node in nodes[1:]:
+        best = None
+        for neighbour in neighbours[node]:
+            reached = distance.get(neighbour)
+            if reached is None:
+                continue
+            pred = neighbour if downstream else node
+            code, lag = edges[(pred, node) if downstream else (node, neighbour)]
+            candidate = reached + (lag if code == SS else durations[pred] + lag)
+            if best is None or candidate > best:
+                best, best_neighbour, best_lag = candidate, neighbour, lag
+        if best is not None:
+            distance[node] = best
+            lags[node] = lags[best_neighbour] + best_lag
+            via[node] = best_neighbour
+
+    earliest_start = state.earliest_start
+    latest_finish = state.latest_finish
+    origin = earliest_start[task_id]
+    sign = 1 if downstream else -1
+    impacted = [
+        {
+            'task_id': node,
+            'depth': hops[node],
+            'via': via[node],
+            'lag': lags[node],
+            'path_float': sign * (earliest_start[node] - origin) - distance[node],
+            'earliest_start': earliest_start[node],
+            'total_float': latest_finish[node] - durations[node] - earliest_start[node]
+        }
+        for node in nodes[1:]
+        if node in via
+    ]
+    impacted.sort(key=lambda item: item['depth'])
+    return impacted
@@ -0,0 +1,374 @@
+import csv
+import io
+import re
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from ..models.task import (
+    Task, TaskDependency, TaskResourceAssignment, Resource,
+    DependencyType, TaskPriority, TaskStatus
+)
+from .versions import bump_project_versions
+
+# Rows are validated and inserted this many at a time
+CHUNK_SIZE = 1000
+
+# The report keeps at most this many row errors; error_count has the total
+MAX_REPORTED_ERRORS = 1000
+
+# "T12", "T12SS", "T12FF+2", "T12 SF -0.5"
+PREDECESSOR_PATTERN = re.compile(
+    r"^(?P<id>.+?)\s*(?P<type>FS|SS|FF|SF)?\s*(?P<lag>[+-]\s*\d+(?:\.\d+)?)?$",
+    re.IGNORECASE
+)
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+
+class TaskImportError(Exception):
+    pass
+
+class ImportReport:
+    def __init__(self):
+        self.tasks = 0
+        self.dependencies = 0
+        self.assignments = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+        # Other projects whose tasks the imported dependencies follow
+        self.linked_projects: Set[int] = set()
+
+    def error(self, row: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "message": message})
+
+    def as_dict(self) -> Dict:
+        return {
+            "imported_tasks": self.tasks,
+            "imported_dependencies": self.dependencies,
+            "imported_assignments": self.assignments,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "linked_projects": sorted(self.linked_projects)
+        }
+
+def read_csv(stream: BinaryIO) -> Iterator[Dict[str, str]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(text):
+        yield row
+
+def read_xlsx(stream: BinaryIO) -> Iterator[Dict[str, str]]:
+    """Streams the first worksheet row by row in openpyxl's read-only mode"""
+    try:
+        from openpyxl import load_workbook
+    except ModuleNotFoundError:
+        raise TaskImportError("Excel import requires the openpyxl package")
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        for values in rows:
+            yield {
+                name: "" if value is None else str(value)
+                for name, value in zip(header, values) if name
+            }
+    finally:
+        workbook.close()
+
+def read_rows(stream: BinaryIO, file_format: str) -> Iterator[Dict[str, str]]:
+    if file_format == "csv":
+        return read_csv(stream)
+    if file_format == "xlsx":
+        return read_xlsx(stream)
+    raise TaskImportError(f"Unsupported import format: {file_format}")
+
+def _parse_float(value: str, field: str, minimum: Optional[float] = None, maximum: Optional[float] = None) -> Optional[float]:
+    if value == "":
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{field} must be a number")
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise ValueError(f"{field} is out of range")
+    return number
+
+def _parse_enum(enum_type, value: str, field: str):
+    for member in enum_type:
+        if value.lower() in (member.value.lower(), member.name.lower()):
+            return member
+    raise ValueError(f"Unknown {field}: {value}")
+
+def _parse_predecessors(value: str) -> List[Tuple[str, DependencyType, float]]:
+    predecessors = []
+    for token in re.split(r"[;,]", value):
+        token = token.strip()
+        if not token:
+            continue
+        match = PREDECESSOR_PATTERN.match(token)
+        dep_type = DependencyType(match.group("type").upper()) if match.group("type") else DependencyType.FINISH_TO_START
+        lag = float(match.group("lag").replace(" ", "")) if match.group("lag") else 0
+        predecessors.append((match.group("id").strip(), dep_type, lag))
+    return predecessors
+
+class _PendingRow:
+    __slots__ = ("row", "unique_id", "parent", "predecessors", "resources")
+
+    def __init__(self, row, unique_id, parent, predecessors, resources):
+        self.row = row
+        self.unique_id = unique_id
+        self.parent = parent
+        self.predecessors = predecessors
+        self.resources = resources
+
+class TaskImporter:
+    """Streams task rows into one project inside a single transaction.
+
+    Recognised columns: unique_id and title (required), description,
+    duration, work_hours, progress, priority, status, is_milestone,
+    is_locked, parent (a unique_id), predecessors ("T1; T2SS+2") and
+    resources ("email or name:hours; ..."). Invalid rows are reported and
+    skipped. References are resolved after every row is in, so parents and
+    predecessors may appear later in the file or already exist in the
+    database, and the new dependencies get one cycle check on the final
+    graph.
+    """
+
+    def __init__(self, db: Session, project_id: int, chunk_size: int = CHUNK_SIZE):
+        self.db = db
+        self.project_id = project_id
+        self.chunk_size = chunk_size
+        self.report = ImportReport()
+        self.task_ids: Dict[str, int] = {}
+        self.pending: List[_PendingRow] = []
+        self.resources: Dict[str, int] = {}
+
+    def run(self, rows: Iterator[Dict[str, str]]) -> ImportReport:
+        try:
+            for name, email, resource_id in self.db.execute(
+                select(Resource.name, Resource.email, Resource.id)
+            ):
+                self.resources.setdefault(name.lower(), resource_id)
+                if email:
+                    self.resources[email.lower()] = resource_id
+
+            chunk = []
+            for number, row in enumerate(rows, start=2):  # Row 1 is the header
+                chunk.append((number, {
+                    key.strip().lower(): (value or "").strip()
+                    for key, value in row.items() if key is not None
+                }))
+                if len(chunk) >= self.chunk_size:
+                    self._insert_tasks(chunk)
+                    chunk = []
+            if chunk:
+                self._insert_tasks(chunk)
+
+            self._resolve_parents()
+            self._insert_dependencies()
+            self._insert_assignments()
+            bump_project_versions(self.db, [self.project_id, *self.report.linked_projects])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return self.report
+
+    def _insert_tasks(self, chunk: List[Tuple[int, Dict[str, str]]]):
+        values = []
+        pending = []
+        chunk_ids = set()
+        for number, row in chunk:
+            try:
+                unique_id = row.get("unique_id", "")
+                if not unique_id:
+                    raise ValueError("unique_id is required")
+                if not row.get("title"):
+                    raise ValueError("title is required")
+                if unique_id in self.task_ids or unique_id in chunk_ids:
+                    raise ValueError(f"Duplicate unique_id {unique_id}")
+                resources = []
+                for token in re.split(r"[;,]", row.get("resources", "")):
+                    if not token.strip():
+                        continue
+                    label, _, hours = token.rpartition(":")
+                    if not label:
+                        label, hours = hours, ""
+                    resource_id = self.resources.get(label.strip().lower())
+                    if resource_id is None:
+                        raise ValueError(f"Unknown resource {label.strip()}")
+                    resources.append((resource_id, _parse_float(hours.strip(), "resource hours", 0) or 0))
+                values.append({
+                    "unique_id": unique_id,
+                    "title": row["title"],
+                    "description": row.get("description") or None,
+                    "duration": _parse_float(row.get("duration", ""), "duration", 0),
+                    "work_hours": _parse_float(row.get("work_hours", ""), "work_hours", 0) or 0,
+                    "progress": _parse_float(row.get("progress", ""), "progress", 0, 100) or 0,
+                    "priority": _parse_enum(TaskPriority, row["priority"], "priority") if row.get("priority") else TaskPriority.MEDIUM,
+                    "status": _parse_enum(TaskStatus, row["status"], "status") if row.get("status") else TaskStatus.NOT_STARTED,
+                    "is_milestone": row.get("is_milestone", "").lower() in TRUE_VALUES,
+                    "is_locked": row.get("is_locked", "").lower() in TRUE_VALUES,
+                    "project_id": self.project_id
+                })
+                pending.append(_PendingRow(
+                    number, unique_id, row.get("parent") or None,
+                    _parse_predecessors(row.get("predecessors", "")), resources
+                ))
+                chunk_ids.add(unique_id)
+            except (ValueError, AttributeError) as e:
+                self.report.error(number, str(e))
+
+        existing = set(self.db.execute(
+            select(Task.unique_id).where(Task.unique_id.in_(chunk_ids))
+        ).scalars())
+        if existing:
+            for item in pending:
+                if item.unique_id in existing:
+                    self.report.error(item.row, f"unique_id {item.unique_id} already exists")
+            values = [value for value in values if value["unique_id"] not in existing]
+            pending = [item for item in pending if item.unique_id not in existing]
+        if not values:
+            return
+
+        self.db.execute(insert(Task), values)
+        self.task_ids.update(self.db.execute(
+            select(Task.unique_id, Task.id).where(Task.unique_id.in_([v["unique_id"] for v in values]))
+        ).all())
+        self.pending.extend(pending)
+        self.report.tasks += len(values)
+
+    def _lookup(self, unique_ids) -> Dict[str, int]:
+        """Resolves unique_ids from this file first, then from existing tasks"""
+        resolved = {uid: self.task_ids[uid] for uid in unique_ids if uid in self.task_ids}
+        missing = [uid for uid in unique_ids if uid not in resolved]
+        for start in range(0, len(missing), self.chunk_size):
+            resolved.update(self.db.execute(
+                select(Task.unique_id, Task.id)
+                .where(Task.unique_id.in_(missing[start:start + self.chunk_size]))
+            ).all())
+        return resolved
+
+    def _resolve_parents(self):
+        resolved = self._lookup({item.parent for item in self.pending if item.parent})
+        updates = []
+        for item in self.pending:
+            if not item.parent:
+                continue
+            parent_id = resolved.get(item.parent)
+            if parent_id is None or item.parent == item.unique_id:
+                self.report.error(item.row, f"Unknown parent {item.parent}")
+                continue
+            updates.append({"id": self.task_ids[item.unique_id], "parent_id": parent_id})
+        for start in range(0, len(updates), self.chunk_size):
+            self.db.execute(update(Task), updates[start:start + self.chunk_size])
+
+    def _insert_dependencies(self):
+        resolved = self._lookup({
+            uid for item in self.pending for uid, _, _ in item.predecessors
+        })
+        edges = {}
+        for item in self.pending:
+            successor_id = self.task_ids[item.unique_id]
+            for uid, dep_type, lag in item.predecessors:
+                predecessor_id = resolved.get(uid)
+                if predecessor_id is None:
+                    self.report.error(item.row, f"Unknown predecessor {uid}")
+                elif predecessor_id == successor_id:
+                    self.report.error(item.row, "A task cannot depend on itself")
+                else:
+                    edges[(predecessor_id, successor_id)] = (dep_type, lag, item.row)
+
+        for edge in self._edges_on_cycles(edges):
+            self.report.error(edges[edge][2], "Dependency would create a circular reference")
+            del edges[edge]
+
+        rows = [
+            {
+                "predecessor_id": pred,
+                "successor_id": succ,
+                "dependency_type": dep_type,
+                "lag_time": lag
+            }
+            for (pred, succ), (dep_type, lag, _) in edges.items()
+        ]
+        for start in range(0, len(rows), self.chunk_size):
+            self.db.execute(insert(TaskDependency), rows[start:start + self.chunk_size])
+        self.report.dependencies += len(rows)
+
+        outside = list({pred for pred, _ in edges} - set(self.task_ids.values()))
+        for start in range(0, len(outside), self.chunk_size):
+            self.report.linked_projects.update(self.db.execute(
+                select(Task.project_id).distinct()
+                .where(Task.id.in_(outside[start:start + self.chunk_size]))
+                .where(Task.project_id != self.project_id)
+            ).scalars())
+
+    def _edges_on_cycles(self, new_edges) -> List[Tuple[int, int]]:
+        """Runs one cycle check over existing plus new edges; returns the new edges inside cycles
+
+        Predecessors may belong to any project, so the existing edges are
+        every edge reachable from the project's tasks, across projects: a
+        cycle through a new edge returns to its predecessor along those.
+        """
+        if not new_edges:
+            return []
+        from .cpm_engine import CompiledGraph
+
+        reached = (
+            select(Task.id.label("task_id"))
+            .where(Task.project_id == self.project_id)
+            .cte("reached", recursive=True)
+        )
+        reached = reached.union(
+            select(TaskDependency.successor_id)
+            .join(reached, TaskDependency.predecessor_id == reached.c.task_id)
+        )
+        existing = self.db.execute(
+            select(TaskDependency.predecessor_id, TaskDependency.successor_id)
+            .where(TaskDependency.predecessor_id.in_(select(reached.c.task_id)))
+        ).all()
+        nodes = sorted({n for edge in list(new_edges) + existing for n in edge})
+        positions = {task_id: i for i, task_id in enumerate(nodes)}
+        pairs = list(new_edges) + [tuple(edge) for edge in existing]
+        graph = CompiledGraph(
+            nodes,
+            [0.0] * len(nodes),
+            [positions[p] for p, _ in pairs],
+            [positions[s] for _, s in pairs],
+            [0] * len(pairs),
+            [0.0] * len(pairs)
+        )
+        if not graph.find_cycle():
+            return []
+
+        import networkx as nx
+        cyclic = nx.DiGraph(pairs)
+        component = {}
+        for i, members in enumerate(nx.strongly_connected_components(cyclic)):
+            for node in members:
+                component[node] = i
+        return [(p, s) for p, s in new_edges if component[p] == component[s]]
+
+    def _insert_assignments(self):
+        rows = [
+            {
+                "task_id": self.task_ids[item.unique_id],
+                "resource_id": resource_id,
+                "assigned_hours": hours
+            }
+            for item in self.pending for resource_id, hours in item.resources
+        ]
+        for start in range(0, len(rows), self.chunk_size):
+            self.db.execute(insert(TaskResourceAssignment), rows[start:start + self.chunk_size])
+        self.report.assignments += len(rows)
+
+def import_tasks(
+    db: Session,
+    project_id: int,
+    stream: BinaryIO,
+    file_format: str,
+    chunk_size: int = CHUNK_SIZE
+) -> Dict:
+    """Imports a CSV or XLSX task sheet into a project and returns the report"""
+    return TaskImporter(db, project_id, chunk_size).run(read_rows(stream, file_format)).as_dict()
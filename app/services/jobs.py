@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Finished jobs kept for status polling; older ones are dropped first
+MAX_FINISHED_JOBS = 200
+
+class Job:
+    """One computation submitted to the process pool"""
+
+    def __init__(self, job_id: int, kind: str, project_id: Optional[int]):
+        self.id = job_id
+        self.kind = kind
+        self.project_id = project_id
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        # Resolves to the finalized result, after the worker's future
+        self.future: Future = Future()
+        self._worker_future: Optional[Future] = None
+
+    @property
+    def status(self) -> str:
+        if self.future.cancelled():
+            return "cancelled"
+        if self.future.done():
+            return "failed" if self.error is not None else "completed"
+        if self._worker_future is not None and self._worker_future.running():
+            return "running"
+        return "queued"
+
+    def as_dict(self, include_result: bool = True) -> Dict:
+        status = self.status
+        job = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'project_id': self.project_id,
+            'status': status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+        if include_result and status == "completed":
+            job['result'] = self.future.result()
+        return job
+
+class JobManager:
+    """Runs CPU-bound work in a process pool and tracks it as pollable jobs.
+
+    Work functions must be importable module-level functions, and their
+    arguments are pickled to the worker, so callers pass compiled arrays
+    rather than ORM objects. ``finalize`` runs back in this process on the
+    worker's result, e.g. to update caches or shape the response.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(
+            os.getenv("PROJECT_MANAGER_WORKERS", str(min(os.cpu_count() or 1, 4)))
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[int, Job]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # Created on first use so that importing the app does not fork workers
+        with self.lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable,
+        *args,
+        project_id: Optional[int] = None,
+        finalize: Optional[Callable[[Any], Any]] = None,
+        **kwargs
+    ) -> Job:
+        job = Job(next(self._ids), kind, project_id)
+        with self.lock:
+            self._jobs[job.id] = job
+            self._prune()
+        try:
+            job._worker_future = self.pool.submit(fn, *args, **kwargs)
+        except Exception as e:  # e.g. a broken pool after a worker crashed
+            with self.lock:
+                self._pool = None
+            self._fail(job, e)
+            return job
+        job._worker_future.add_done_callback(lambda worker: self._finish(job, worker, finalize))
+        return job
+
+    def _finish(self, job: Job, worker: Future, finalize: Optional[Callable]):
+        if worker.cancelled():
+            job.finished_at = datetime.utcnow()
+            job.future.cancel()
+            return
+        try:
+            result = worker.result()
+            if finalize is not None:
+                result = finalize(result)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            job.finished_at = datetime.utcnow()
+            job.future.set_result(result)
+
+    def _fail(self, job: Job, error: Exception):
+        job.error = str(error) or error.__class__.__name__
+        job.finished_at = datetime.utcnow()
+        job.future.set_exception(error)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self.lock:
+            return self._jobs.get(job_id)
+
+    def list(self, project_id: Optional[int] = None) -> List[Job]:
+        with self.lock:
+            return [
+                job for job in self._jobs.values()
+                if project_id is None or job.project_id == project_id
+            ]
+
+    def cancel(self, job: Job) -> bool:
+        """Cancels a job that has not started yet"""
+        return job._worker_future is not None and job._worker_future.cancel()
+
+    async def wait(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """Waits up to timeout seconds without blocking the event loop; True if the job is done"""
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            if not job.future.cancelled():
+                raise
+        except Exception:
+            pass  # Failures are reported through the job's status
+        return True
+
+    def shutdown(self):
+        with self.lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
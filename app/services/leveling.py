@@ -0,0 +1,150 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .cpm_engine import CompiledGraph, SS, forward_pass, backward_pass
+
+# Hours per day a resource can work when no capacity is recorded for it
+DEFAULT_CAPACITY = 8.0
+
+# Tolerance for comparing accumulated hours against capacity
+_EPSILON = 1e-9
+
+class UsageProfile:
+    """Hours booked per whole day for one resource, grown on demand"""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.hours = np.zeros(64, dtype=np.float64)
+
+    def _ensure(self, size: int):
+        if size > len(self.hours):
+            grown = np.zeros(max(size, 2 * len(self.hours)), dtype=np.float64)
+            grown[:len(self.hours)] = self.hours
+            self.hours = grown
+
+    def last_conflict(self, first_day: int, last_day: int, rate: float) -> int:
+        """Returns the last day in [first_day, last_day) that cannot take rate more hours, or -1"""
+        self._ensure(last_day)
+        over = np.flatnonzero(self.hours[first_day:last_day] + rate > self.capacity + _EPSILON)
+        return first_day + int(over[-1]) if len(over) else -1
+
+    def book(self, first_day: int, last_day: int, rate: float):
+        self._ensure(last_day)
+        self.hours[first_day:last_day] += rate
+
+def _day_span(start: float, duration: float) -> Tuple[int, int]:
+    first_day = max(int(math.floor(start)), 0)
+    return first_day, max(int(math.ceil(start + duration)), first_day + 1)
+
+def level_schedule(
+    graph: CompiledGraph,
+    demands: Dict[int, List[Tuple[int, float]]],
+    capacities: Dict[int, float],
+    priorities: Optional[Sequence[int]] = None,
+    default_capacity: float = DEFAULT_CAPACITY
+) -> Dict:
+    """Serial schedule generation over a compiled graph.
+
+    ``demands`` maps task positions to ``(resource_id, hours)`` pairs and
+    ``priorities`` holds one rank per task (higher is more important).
+    Locked tasks stay at their CPM earliest start and are booked first.
+    Every other task becomes eligible once its predecessors are placed and
+    is taken from a heap ordered by total float, then priority; it starts
+    at the first day where all of its resources have spare capacity.
+    """
+    n = graph.num_tasks
+    durations = graph.durations
+    earliest_start = forward_pass(graph)
+    project_end = float((earliest_start + durations).max()) if n else 0.0
+    latest_start = backward_pass(graph, project_end) - durations
+    total_float = latest_start - earliest_start
+    priorities = np.zeros(n, dtype=np.int64) if priorities is None else np.asarray(priorities)
+
+    profiles: Dict[int, UsageProfile] = {}
+    rates: List[List[Tuple[UsageProfile, float]]] = [[] for _ in range(n)]
+    for position, assignments in demands.items():
+        duration = durations[position]
+        if duration <= 0:
+            continue
+        for resource_id, hours in assignments:
+            if resource_id not in profiles:
+                profiles[resource_id] = UsageProfile(capacities.get(resource_id, default_capacity))
+            rates[position].append((profiles[resource_id], hours / duration))
+
+    start = [math.nan] * n
+    overallocated = []
+    remaining = np.diff(graph.in_offsets).tolist()
+    pred = graph.edge_pred.tolist()
+    succ = graph.edge_succ.tolist()
+    kind = graph.edge_type.tolist()
+    lag = graph.edge_lag.tolist()
+    in_offsets = graph.in_offsets.tolist()
+    out_offsets = graph.out_offsets.tolist()
+    out_edges = graph.out_edges.tolist()
+    duration_list = durations.tolist()
+    locked = graph.is_locked.tolist()
+    release = graph.release.tolist()
+
+    def place(position: int, at: float):
+        start[position] = at
+        first_day, last_day = _day_span(at, duration_list[position])
+        for profile, rate in rates[position]:
+            profile.book(first_day, last_day, rate)
+        for e in out_edges[out_offsets[position]:out_offsets[position + 1]]:
+            remaining[succ[e]] -= 1
+            if remaining[succ[e]] == 0 and not locked[succ[e]]:
+                heapq.heappush(heap, (
+                    total_float[succ[e]], -priorities[succ[e]], earliest_start[succ[e]], succ[e]
+                ))
+
+    heap = [
+        (total_float[position], -priorities[position], earliest_start[position], position)
+        for position in range(n) if remaining[position] == 0 and not locked[position]
+    ]
+    heapq.heapify(heap)
+    locked_positions = np.flatnonzero(graph.is_locked)
+    for position in locked_positions[np.argsort(earliest_start[locked_positions], kind="stable")]:
+        place(int(position), float(earliest_start[position]))
+
+    while heap:
+        position = heapq.heappop(heap)[3]
+        at = release[position]
+        for e in range(in_offsets[position], in_offsets[position + 1]):
+            p = pred[e]
+            if kind[e] == SS:
+                time = start[p] + lag[e]
+            else:
+                time = start[p] + duration_list[p] + lag[e]
+            if time > at:
+                at = time
+
+        if any(rate > profile.capacity + _EPSILON for profile, rate in rates[position]):
+            # No start date can fit this task; keep it as early as possible
+            overallocated.append(int(graph.task_ids[position]))
+        else:
+            while True:
+                first_day, last_day = _day_span(at, duration_list[position])
+                conflict = max(
+                    (profile.last_conflict(first_day, last_day, rate) for profile, rate in rates[position]),
+                    default=-1
+                )
+                if conflict < 0:
+                    break
+                at = float(conflict + 1)
+        place(position, float(at))
+
+    start = np.array(start, dtype=np.float64)
+    finish = start + durations
+    task_ids = graph.task_ids.tolist()
+    return {
+        'project_duration': float(finish.max()) if n else 0.0,
+        'unleveled_duration': project_end,
+        'overallocated': overallocated,
+        'schedule': {
+            task_id: {'start': s, 'finish': f, 'delay': d}
+            for task_id, s, f, d in zip(
+                task_ids, start.tolist(), finish.tolist(), (start - earliest_start).tolist()
+            )
+        }
+    }
@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+from .cpm_engine import CompiledGraph, backward_pass, forward_pass
+from .cpm_types import SchedulingError
+
+def project_components(project_ids: Iterable[int], links: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    """Groups projects into the sets that dependencies connect, largest first.
+
+    ``links`` are (predecessor project, successor project) pairs of the
+    cross-project dependencies. Projects in different groups share no
+    dependency path, so each group can be scheduled on its own.
+    """
+    parent = {project_id: project_id for project_id in project_ids}
+
+    def root(project_id: int) -> int:
+        while parent[project_id] != project_id:
+            parent[project_id] = parent[parent[project_id]]
+            project_id = parent[project_id]
+        return project_id
+
+    for pred_project, succ_project in links:
+        if pred_project in parent and succ_project in parent:
+            parent[root(pred_project)] = root(succ_project)
+    groups: Dict[int, List[int]] = {}
+    for project_id in parent:
+        groups.setdefault(root(project_id), []).append(project_id)
+    return sorted((sorted(group) for group in groups.values()), key=len, reverse=True)
+
+def pack_components(
+    components: Sequence[List[int]],
+    task_counts: Dict[int, int],
+    parts: int
+) -> List[List[int]]:
+    """Packs whole components into at most ``parts`` lists of projects with similar task counts.
+
+    Each part becomes one unit of work, so a portfolio of many small
+    projects costs a few worker round trips rather than one per project.
+    """
+    sizes = [(sum(task_counts.get(project_id, 0) for project_id in component), component) for component in components]
+    sizes.sort(key=lambda item: item[0], reverse=True)
+    packed: List[Tuple[int, List[int]]] = [(0, []) for _ in range(min(parts, len(sizes)))]
+    for size, component in sizes:
+        # The least loaded part takes the next largest component
+        position = min(range(len(packed)), key=lambda i: packed[i][0])
+        total, projects = packed[position]
+        packed[position] = (total + size, projects + component)
+    return [projects for _, projects in packed if projects]
+
+def schedule_projects(graph: CompiledGraph, task_projects: Sequence[int]) -> Dict[int, Dict]:
+    """CPM over the tasks of several whole projects, keyed by project id.
+
+    ``task_projects`` is the project of each task, in graph order.
+    Dependencies may cross projects. Every project finishes with its last
+    task, and the float of a task is measured against the finish of its
+    own project, so a project without links to the others gets exactly
+    the schedule of critical_path.
+    """
+    if graph.missing:
+        raise SchedulingError(
+            f"Dependencies reference tasks outside the portfolio: {graph.missing}"
+        )
+    graph.levels()  # Raises on cycles, including ones through several projects
+
+    earliest_start = forward_pass(graph)
+    earliest_finish = earliest_start + graph.durations
+    project_ids, project_of_task = np.unique(np.asarray(task_projects, dtype=np.int64), return_inverse=True)
+    project_ends = np.zeros(len(project_ids), dtype=np.float64)
+    np.maximum.at(project_ends, project_of_task, earliest_finish)
+    latest_finish = backward_pass(graph, project_ends[project_of_task])
+    latest_start = latest_finish - graph.durations
+    total_float = latest_start - earliest_start
+
+    results: Dict[int, Dict] = {}
+    order = np.argsort(project_of_task, kind="stable")
+    bounds = np.searchsorted(project_of_task[order], np.arange(len(project_ids) + 1))
+    for index, project_id in enumerate(project_ids.tolist()):
+        positions = order[bounds[index]:bounds[index + 1]]
+        task_ids = graph.task_ids[positions]
+        columns = zip(
+            task_ids.tolist(),
+            earliest_start[positions].tolist(),
+            latest_start[positions].tolist(),
+            earliest_finish[positions].tolist(),
+            latest_finish[positions].tolist(),
+            total_float[positions].tolist()
+        )
+        results[project_id] = {
+            'critical_path': task_ids[total_float[positions] == 0].tolist(),
+            'project_duration': float(project_ends[index]),
+            'schedule': {
+                task_id: {
+                    'earliest_start': es,
+                    'latest_start': ls,
+                    'earliest_finish': ef,
+                    'latest_finish': lf,
+                    'total_float': tf
+                }
+                for task_id, es, ls, ef, lf, tf in columns
+            }
+        }
+    return results
@@ -0,0 +1,159 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+from .schedule_cache import ScheduleCache, ScheduleChanges
+
+# Seconds without a new change before a project's batch is applied
+DEFAULT_DEBOUNCE = 0.05
+
+# Upper bound on how long the first change of a batch waits, so a
+# continuous drag still updates the schedule a few times a second
+DEFAULT_MAX_DELAY = 0.5
+
+class RecalculationQueue:
+    """Debounces schedule updates per project and applies them as merged batches.
+
+    Writes submit their ScheduleChanges and return at once. A project's
+    batch is applied once no change has arrived for ``debounce`` seconds,
+    or ``max_delay`` seconds after its first change, whichever is sooner.
+    Batches of one project never run concurrently; changes that arrive
+    while one runs are merged into the next. Readers call flush() so they
+    always see the newest state. ``on_apply`` is called with the project id
+    and the schedule entries that changed after every non-empty batch.
+    """
+
+    def __init__(
+        self,
+        cache: ScheduleCache,
+        debounce: float = DEFAULT_DEBOUNCE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        on_apply: Optional[Callable[[int, Dict[int, Dict]], None]] = None
+    ):
+        self.cache = cache
+        self.on_apply = on_apply
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._pending: Dict[int, ScheduleChanges] = {}
+        self._submissions: Dict[int, int] = {}
+        self._first: Dict[int, float] = {}
+        self._last: Dict[int, float] = {}
+        self._timers: Dict[int, threading.Timer] = {}
+        self._running: Dict[int, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+        self.submitted = 0
+        self.applied_submissions = 0
+        self.batches = 0
+        self.flushes = 0
+        self.apply_seconds = 0.0
+
+    def submit(self, project_id: int, changes: ScheduleChanges):
+        """Queues a batch of edits that were already committed to the database"""
+        # Bump the generation now, so a schedule being computed from an
+        # older snapshot is not cached over this write
+        self.cache.touch(project_id)
+        now = time.monotonic()
+        with self.lock:
+            pending = self._pending.get(project_id)
+            if pending is None:
+                pending = self._pending[project_id] = ScheduleChanges()
+                self._first[project_id] = now
+                self._submissions[project_id] = 0
+            pending.merge(changes)
+            self._submissions[project_id] += 1
+            self._last[project_id] = now
+            self.submitted += 1
+            if project_id not in self._timers:
+                self._arm(project_id, self.debounce)
+
+    def _arm(self, project_id: int, delay: float):
+        timer = threading.Timer(delay, self._fire, args=(project_id,))
+        timer.daemon = True
+        self._timers[project_id] = timer
+        timer.start()
+
+    def _fire(self, project_id: int):
+        with self.lock:
+            if project_id not in self._pending:
+                self._timers.pop(project_id, None)
+                return
+            due = min(
+                self._last[project_id] + self.debounce,
+                self._first[project_id] + self.max_delay
+            )
+            wait = due - time.monotonic()
+            if wait > 0:
+                self._arm(project_id, wait)
+                return
+            self._timers.pop(project_id, None)
+        self._run(project_id)
+
+    def _run(self, project_id: int):
+        with self.lock:
+            running = self._running.setdefault(project_id, threading.Lock())
+        with running:
+            with self.lock:
+                changes = self._pending.pop(project_id, None)
+                submissions = self._submissions.pop(project_id, 0)
+                self._first.pop(project_id, None)
+                self._last.pop(project_id, None)
+            if changes is None:
+                return
+            started = time.perf_counter()
+            delta = self.cache.apply(project_id, changes)
+            with self.lock:
+                self.apply_seconds += time.perf_counter() - started
+                self.batches += 1
+                self.applied_submissions += submissions
+            if delta and self.on_apply is not None:
+                self.on_apply(project_id, delta)
+
+    def flush(self, project_id: int):
+        """Applies the project's pending changes now, waiting for a running batch"""
+        with self.lock:
+            timer = self._timers.pop(project_id, None)
+            if timer is not None:
+                timer.cancel()
+            if project_id in self._pending:
+                self.flushes += 1
+        self._run(project_id)
+
+    def invalidate(self, project_id: Optional[int] = None):
+        """Drops pending changes along with the cached schedule(s)"""
+        with self.lock:
+            project_ids = list(self._pending) if project_id is None else [project_id]
+            for pid in project_ids:
+                timer = self._timers.pop(pid, None)
+                if timer is not None:
+                    timer.cancel()
+                self._pending.pop(pid, None)
+                self._submissions.pop(pid, None)
+                self._first.pop(pid, None)
+                self._last.pop(pid, None)
+            running = self._running.get(project_id) if project_id is not None else None
+        if running is None:
+            self.cache.invalidate(project_id)
+            return
+        # A batch taken before the invalidation must not land on a reloaded state
+        with running:
+            self.cache.invalidate(project_id)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                'debounce_ms': self.debounce * 1000,
+                'max_delay_ms': self.max_delay * 1000,
+                'pending_projects': len(self._pending),
+                'queue_depth': sum(self._submissions.values()),
+                'pending_changes': sum(len(changes) for changes in self._pending.values()),
+                'submitted': self.submitted,
+                'batches': self.batches,
+                'flushes': self.flushes,
+                # Submissions folded into each applied batch; 1.0 means no coalescing
+                'coalescing_ratio': (
+                    self.applied_submissions / self.batches if self.batches else None
+                ),
+                'mean_apply_ms': (
+                    self.apply_seconds / self.batches * 1000 if self.batches else None
+                )
+            }
@@ -0,0 +1,199 @@
+import itertools
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from ..models.task import DependencyType
+from .cpm_types import SchedulingError
+
+if TYPE_CHECKING:
+    from .cpm_engine import CompiledGraph
+
+class Scenario:
+    """A what-if variant of a project, kept as its differences from the project.
+
+    Durations are keyed by task id; lags, removed and added dependencies
+    by (predecessor id, successor id). The project's tasks and edges are
+    never copied: apply() derives a graph from the cached base graph that
+    shares every array the overrides leave alone.
+    """
+
+    def __init__(
+        self,
+        scenario_id: int,
+        project_id: int,
+        name: str,
+        durations: Optional[Dict[int, float]] = None,
+        lags: Optional[Dict[Tuple[int, int], float]] = None,
+        removed_dependencies: Iterable[Tuple[int, int]] = (),
+        added_dependencies: Iterable[Tuple[int, int, DependencyType, float]] = (),
+        persisted: bool = False,
+        created_at: Optional[datetime] = None
+    ):
+        self.id = scenario_id
+        self.project_id = project_id
+        self.name = name
+        self.durations = dict(durations or {})
+        self.lags = dict(lags or {})
+        self.removed_dependencies = list(removed_dependencies)
+        self.added_dependencies = list(added_dependencies)
+        self.persisted = persisted
+        self.created_at = created_at or datetime.utcnow()
+
+    @classmethod
+    def from_changes(cls, scenario_id: int, project_id: int, name: str, changes: Dict, **kwargs) -> "Scenario":
+        """Rebuilds a scenario from the JSON of changes()"""
+        return cls(
+            scenario_id,
+            project_id,
+            name,
+            durations={int(task_id): duration for task_id, duration in changes.get("durations", {}).items()},
+            lags={
+                (lag["predecessor_id"], lag["successor_id"]): lag["lag_time"]
+                for lag in changes.get("lags", [])
+            },
+            removed_dependencies=[
+                (dep["predecessor_id"], dep["successor_id"])
+                for dep in changes.get("removed_dependencies", [])
+            ],
+            added_dependencies=[
+                (
+                    dep["predecessor_id"],
+                    dep["successor_id"],
+                    DependencyType(dep.get("dependency_type", DependencyType.FINISH_TO_START.value)),
+                    dep.get("lag_time", 0)
+                )
+                for dep in changes.get("added_dependencies", [])
+            ],
+            **kwargs
+        )
+
+    def changes(self) -> Dict:
+        """The overrides as JSON-ready data, the form they are persisted in"""
+        return {
+            "durations": {str(task_id): duration for task_id, duration in self.durations.items()},
+            "lags": [
+                {"predecessor_id": pred, "successor_id": succ, "lag_time": lag}
+                for (pred, succ), lag in self.lags.items()
+            ],
+            "removed_dependencies": [
+                {"predecessor_id": pred, "successor_id": succ}
+                for pred, succ in self.removed_dependencies
+            ],
+            "added_dependencies": [
+                {
+                    "predecessor_id": pred,
+                    "successor_id": succ,
+                    "dependency_type": dependency_type.value,
+                    "lag_time": lag
+                }
+                for pred, succ, dependency_type, lag in self.added_dependencies
+            ]
+        }
+
+    def as_dict(self) -> Dict:
+        return dict(
+            self.changes(),
+            id=self.id,
+            project_id=self.project_id,
+            name=self.name,
+            persisted=self.persisted,
+            created_at=self.created_at
+        )
+
+    def task_ids(self) -> set:
+        """Every task the overrides refer to"""
+        task_ids = set(self.durations)
+        for pairs in (self.lags, self.removed_dependencies, self.added_dependencies):
+            for pair in pairs:
+                task_ids.update(pair[:2])
+        return task_ids
+
+    def apply(self, graph: "CompiledGraph") -> "CompiledGraph":
+        return graph.with_changes(
+            durations=self.durations,
+            lags=self.lags,
+            removed=self.removed_dependencies,
+            added=self.added_dependencies
+        )
+
+def evaluate_scenarios(graph: "CompiledGraph", scenarios: List[Scenario], base: bool = False) -> Dict:
+    """Duration and critical path of each scenario over ``graph``, keyed by scenario id.
+
+    A scenario that can't be scheduled, e.g. because it creates a cycle,
+    gets an ``error`` instead. With ``base`` the unchanged graph is
+    included under the key "base". Runs in a worker process.
+    """
+    from .scheduler import ProjectScheduler
+    scheduler = ProjectScheduler()
+    results: Dict = {}
+    if base:
+        scheduler.use_graph(graph)
+        results["base"] = scheduler.calculate_critical_path(schedule=False)
+    for scenario in scenarios:
+        try:
+            scheduler.use_graph(scenario.apply(graph))
+            results[scenario.id] = scheduler.calculate_critical_path(schedule=False)
+        except SchedulingError as e:
+            results[scenario.id] = {"error": str(e)}
+    return results
+
+class ScenarioStore:
+    """Scenarios by id, and the compiled project graph they apply to.
+
+    Persisted scenarios are loaded on first use; the rest live only in
+    memory. Both draw ids from one counter, so a persisted scenario keeps
+    its id as the primary key of its row. Base graphs are cached per
+    project and dropped when the project's version moves on.
+    """
+
+    def __init__(self):
+        self._scenarios: Dict[int, Scenario] = {}
+        self._bases: Dict[int, Tuple[int, "CompiledGraph"]] = {}
+        self._ids = itertools.count(1)
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def load(self, scenarios: Iterable[Scenario]):
+        with self.lock:
+            for scenario in scenarios:
+                self._scenarios[scenario.id] = scenario
+            self._ids = itertools.count(max(self._scenarios, default=0) + 1)
+            self.loaded = True
+
+    def next_id(self) -> int:
+        with self.lock:
+            return next(self._ids)
+
+    def add(self, scenario: Scenario):
+        with self.lock:
+            self._scenarios[scenario.id] = scenario
+
+    def get(self, project_id: int, scenario_id: int) -> Optional[Scenario]:
+        with self.lock:
+            scenario = self._scenarios.get(scenario_id)
+        return scenario if scenario is not None and scenario.project_id == project_id else None
+
+    def list(self, project_id: int) -> List[Scenario]:
+        with self.lock:
+            return [scenario for scenario in self._scenarios.values() if scenario.project_id == project_id]
+
+    def remove(self, scenario_id: int) -> Optional[Scenario]:
+        with self.lock:
+            return self._scenarios.pop(scenario_id, None)
+
+    def remove_project(self, project_id: int):
+        """Drops the project's scenarios and its cached base graph"""
+        with self.lock:
+            for scenario_id in [s.id for s in self._scenarios.values() if s.project_id == project_id]:
+                del self._scenarios[scenario_id]
+            self._bases.pop(project_id, None)
+
+    def base(self, project_id: int, version: int) -> Optional["CompiledGraph"]:
+        """The project's cached graph if it was compiled at this version"""
+        with self.lock:
+            cached = self._bases.get(project_id)
+        return cached[1] if cached is not None and cached[0] == version else None
+
+    def set_base(self, project_id: int, version: int, graph: "CompiledGraph"):
+        with self.lock:
+            self._bases[project_id] = (version, graph)
@@ -0,0 +1,413 @@
+import heapq
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from ..models.task import Task, TaskDependency, DependencyType
+from .cpm_types import DEPENDENCY_CODES, SS, FF
+from .dependency_index import DependencyIndex
+
+if TYPE_CHECKING:
+    from .cpm_engine import CompiledGraph
+
+class ScheduleChanges:
+    """A batch of edits to apply to a cached schedule"""
+
+    def __init__(self):
+        self.durations: Dict[int, float] = {}
+        self.added_edges: Dict[Tuple[int, int], Tuple[int, float]] = {}
+        self.removed_edges: Set[Tuple[int, int]] = set()
+        self.removed_tasks: Set[int] = set()
+
+    def set_duration(self, task_id: int, duration: Optional[float]):
+        self.removed_tasks.discard(task_id)
+        self.durations[task_id] = duration or 0
+
+    def add_edge(
+        self,
+        pred: int,
+        succ: int,
+        dependency_type: Optional[DependencyType] = None,
+        lag: Optional[float] = None
+    ):
+        """Adds an edge, or replaces the type and lag of an existing one"""
+        self.removed_edges.discard((pred, succ))
+        self.added_edges[(pred, succ)] = (
+            DEPENDENCY_CODES[dependency_type or DependencyType.FINISH_TO_START],
+            lag or 0
+        )
+
+    def remove_edge(self, pred: int, succ: int):
+        self.added_edges.pop((pred, succ), None)
+        self.removed_edges.add((pred, succ))
+
+    def remove_task(self, task_id: int):
+        self.durations.pop(task_id, None)
+        self.removed_tasks.add(task_id)
+
+    def merge(self, other: "ScheduleChanges"):
+        """Folds a later batch into this one; the later values win"""
+        for task_id in other.removed_tasks:
+            self.remove_task(task_id)
+        for task_id, duration in other.durations.items():
+            self.set_duration(task_id, duration)
+        for edge in other.removed_edges:
+            self.remove_edge(*edge)
+        for edge, value in other.added_edges.items():
+            self.removed_edges.discard(edge)
+            self.added_edges[edge] = value
+
+    def __len__(self) -> int:
+        return (
+            len(self.durations) + len(self.added_edges)
+            + len(self.removed_edges) + len(self.removed_tasks)
+        )
+
+class ScheduleState:
+    """CPM results for one project that can be updated in place.
+
+    Edits are pushed forward through successors and backward through
+    predecessors in topological order, and propagation stops wherever a
+    recomputed value does not move. The arithmetic is the same as
+    cpm_engine, so an updated state matches a full recompute exactly.
+
+    ``boundaries`` are the (earliest start, earliest finish) the state
+    was computed with for tasks of other projects that its tasks depend
+    on; the cache drops the state when those move.
+    """
+
+    def __init__(
+        self,
+        compiled: "CompiledGraph",
+        result: Dict,
+        boundaries: Optional[Dict[int, Tuple[float, float]]] = None
+    ):
+        task_ids = compiled.task_ids.tolist()
+        self.durations: Dict[int, float] = dict(zip(task_ids, compiled.durations.tolist()))
+        self.edges: Dict[Tuple[int, int], Tuple[int, float]] = {
+            (task_ids[p], task_ids[s]): (code, lag)
+            for p, s, code, lag in zip(
+                compiled.edge_pred.tolist(),
+                compiled.edge_succ.tolist(),
+                compiled.edge_type.tolist(),
+                compiled.edge_lag.tolist()
+            )
+        }
+        self.index = DependencyIndex.from_edges(task_ids, self.edges)
+        self.boundaries = dict(boundaries or {})
+        # Earliest starts allowed by the boundary tasks
+        self.release: Dict[int, float] = {
+            task_id: release
+            for task_id, release in zip(task_ids, compiled.release.tolist()) if release
+        }
+        schedule = result['schedule']
+        self.earliest_start = {task_id: schedule[task_id]['earliest_start'] for task_id in task_ids}
+        self.latest_finish = {task_id: schedule[task_id]['latest_finish'] for task_id in task_ids}
+        self.project_end = result['project_duration']
+
+    @classmethod
+    def from_records(
+        cls,
+        tasks: Iterable[Task],
+        dependencies: Iterable[TaskDependency],
+        boundaries: Optional[Dict[int, Tuple[float, float]]] = None
+    ) -> "ScheduleState":
+        # Loads numpy and the CPM engine on the first schedule, not at startup
+        from .scheduler import ProjectScheduler
+        scheduler = ProjectScheduler()
+        scheduler.build_dependency_graph(tasks, dependencies, boundaries)
+        return cls(scheduler.compiled, scheduler.calculate_critical_path(), boundaries)
+
+    def entry(self, task_id: int) -> Dict:
+        duration = self.durations[task_id]
+        earliest_start = self.earliest_start[task_id]
+        latest_finish = self.latest_finish[task_id]
+        latest_start = latest_finish - duration
+        return {
+            'earliest_start': earliest_start,
+            'latest_start': latest_start,
+            'earliest_finish': earliest_start + duration,
+            'latest_finish': latest_finish,
+            'total_float': latest_start - earliest_start
+        }
+
+    def result(self) -> Dict:
+        """Returns the schedule in the shape of ProjectScheduler.calculate_critical_path"""
+        schedule = {task_id: self.entry(task_id) for task_id in self.durations}
+        return {
+            'critical_path': [
+                task_id for task_id, entry in schedule.items() if entry['total_float'] == 0
+            ],
+            'project_duration': self.project_end,
+            'schedule': schedule
+        }
+
+    def apply(self, changes: ScheduleChanges) -> Dict[int, Dict]:
+        """Applies a batch of edits and returns the entries that changed"""
+        forward: Set[int] = set()
+        backward: Set[int] = set()
+        resized: Set[int] = set()
+
+        for task_id in changes.removed_tasks:
+            if task_id not in self.durations:
+                continue
+            forward.update(self.index.successors[task_id])
+            backward.update(self.index.predecessors[task_id])
+            for succ in self.index.successors[task_id]:
+                self.edges.pop((task_id, succ), None)
+            for pred in self.index.predecessors[task_id]:
+                self.edges.pop((pred, task_id), None)
+            self.index.remove_node(task_id)
+            del self.durations[task_id]
+            del self.earliest_start[task_id]
+            del self.latest_finish[task_id]
+        forward -= changes.removed_tasks
+        backward -= changes.removed_tasks
+
+        for task_id, duration in changes.durations.items():
+            if task_id not in self.durations:
+                self.index.add_node(task_id)
+                self.durations[task_id] = duration
+                self.earliest_start[task_id] = 0.0
+                self.latest_finish[task_id] = self.project_end
+                forward.add(task_id)
+                backward.add(task_id)
+                resized.add(task_id)
+            elif self.durations[task_id] != duration:
+                self.durations[task_id] = duration
+                resized.add(task_id)
+
+        for pred, succ in changes.removed_edges:
+            if self.edges.pop((pred, succ), None) is not None:
+                self.index.remove_edge(pred, succ)
+                forward.add(succ)
+                backward.add(pred)
+
+        for (pred, succ), value in changes.added_edges.items():
+            if pred not in self.durations or succ not in self.durations:
+                continue
+            if self.edges.get((pred, succ)) == value:
+                continue
+            self.index.add_edge(pred, succ)
+            self.edges[(pred, succ)] = value
+            forward.add(succ)
+            backward.add(pred)
+
+        changed = self._propagate_forward(forward, resized)
+        project_end = max(
+            (self.earliest_start[t] + self.durations[t] for t in self.durations),
+            default=0.0
+        )
+        if project_end != self.project_end:
+            self.project_end = project_end
+            backward.update(t for t in self.durations if not self.index.successors[t])
+        changed |= self._propagate_backward(backward, resized)
+        changed |= resized
+        return {task_id: self.entry(task_id) for task_id in changed}
+
+    def _propagate_forward(self, dirty: Set[int], resized: Set[int]) -> Set[int]:
+        order = self.index.order
+        heap = [(order[t], t) for t in dirty]
+        # A resized task's finish moves even if its start does not
+        heap.extend((order[s], s) for t in resized for s in self.index.successors[t])
+        heapq.heapify(heap)
+        queued = {t for _, t in heap}
+        changed = set()
+        while heap:
+            _, node = heapq.heappop(heap)
+            queued.discard(node)
+            best = self.release.get(node, 0.0)
+            for pred in self.index.predecessors[node]:
+                code, lag = self.edges[(pred, node)]
+                if code == SS:
+                    time = self.earliest_start[pred] + lag
+                else:
+                    time = self.earliest_start[pred] + self.durations[pred] + lag
+                if time > best:
+                    best = time
+            if best == self.earliest_start[node]:
+                continue
+            self.earliest_start[node] = best
+            changed.add(node)
+            for succ in self.index.successors[node]:
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, (order[succ], succ))
+        return changed
+
+    def _propagate_backward(self, dirty: Set[int], resized: Set[int]) -> Set[int]:
+        order = self.index.order
+        heap = [(-order[t], t) for t in dirty]
+        # A resized task's latest start moves even if its finish does not
+        heap.extend((-order[p], p) for t in resized for p in self.index.predecessors[t])
+        heapq.heapify(heap)
+        queued = {t for _, t in heap}
+        changed = set()
+        while heap:
+            _, node = heapq.heappop(heap)
+            queued.discard(node)
+            successors = self.index.successors[node]
+            if successors:
+                best = float('inf')
+                for succ in successors:
+                    code, lag = self.edges[(node, succ)]
+                    if code == FF:
+                        time = self.latest_finish[succ] - lag
+                    else:
+                        time = self.latest_finish[succ] - self.durations[succ] - lag
+                    if time < best:
+                        best = time
+            else:
+                best = self.project_end
+            if best == self.latest_finish[node]:
+                continue
+            self.latest_finish[node] = best
+            changed.add(node)
+            for pred in self.index.predecessors[node]:
+                if pred not in queued:
+                    queued.add(pred)
+                    heapq.heappush(heap, (-order[pred], pred))
+        return changed
+
+class ScheduleCache:
+    """Keeps one ScheduleState per project plus the tasks changed since the last read
+
+    Every write bumps the project's generation, cached or not. A state
+    computed off-thread is only stored if no write happened since its
+    inputs were read (see generation/store). ``on_store`` is called with
+    the project id whenever a fully computed state is cached, outside the
+    lock.
+
+    A state scheduled against other projects' tasks is dropped whenever
+    one of those tasks moves, is removed or loses its cached schedule.
+    """
+
+    def __init__(self, on_store: Optional[Callable[[int], None]] = None):
+        self.on_store = on_store
+        self._states: Dict[int, ScheduleState] = {}
+        self._pending: Dict[int, Set[int]] = {}
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        # Boundary task id -> projects whose cached states were computed from its dates
+        self._watchers: Dict[int, Set[int]] = {}
+        self.lock = threading.RLock()
+
+    def get(
+        self,
+        project_id: int,
+        loader: Callable[[], Tuple]
+    ) -> ScheduleState:
+        """Cached state, else one computed from ``loader()``'s from_records arguments"""
+        with self.lock:
+            state = self._states.get(project_id)
+            if state is not None:
+                return state
+            state = ScheduleState.from_records(*loader())
+            self._cache(project_id, state)
+        if self.on_store is not None:
+            self.on_store(project_id)
+        return state
+
+    def peek(self, project_id: int) -> Optional[ScheduleState]:
+        with self.lock:
+            return self._states.get(project_id)
+
+    def generation(self, project_id: int) -> Tuple[int, int]:
+        """Token to read before loading a project's records for store()"""
+        with self.lock:
+            return self._epoch, self._generations.get(project_id, 0)
+
+    def store(self, project_id: int, state: ScheduleState, generation: Tuple[int, int]) -> ScheduleState:
+        """Caches a state computed elsewhere unless it was superseded meanwhile
+
+        Returns the state to answer from: an already cached one wins, and a
+        stale one is returned uncached so the next read recomputes it.
+        """
+        with self.lock:
+            current = self._states.get(project_id)
+            if current is not None:
+                return current
+            if generation != self.generation(project_id):
+                return state
+            self._cache(project_id, state)
+        if self.on_store is not None:
+            self.on_store(project_id)
+        return state
+
+    def _cache(self, project_id: int, state: ScheduleState):
+        self._states[project_id] = state
+        self._pending[project_id] = set()
+        for task_id in state.boundaries:
+            self._watchers.setdefault(task_id, set()).add(project_id)
+        self._release_watchers(state.durations, state)
+
+    def _release_watchers(self, task_ids: Iterable[int], state: Optional[ScheduleState] = None):
+        """Drops cached states whose boundary dates for ``task_ids`` no longer match ``state``
+
+        Without a state, every watcher of the tasks is dropped.
+        """
+        for task_id in task_ids:
+            watchers = self._watchers.get(task_id)
+            if not watchers:
+                continue
+            if state is not None and task_id in state.durations:
+                start = state.earliest_start[task_id]
+                current = (start, start + state.durations[task_id])
+            else:
+                current = None
+            for watcher in list(watchers):
+                cached = self._states.get(watcher)
+                if cached is None:
+                    watchers.discard(watcher)
+                elif cached.boundaries.get(task_id) != current:
+                    self.invalidate(watcher)
+
+    def touch(self, project_id: int):
+        """Marks the project as written, superseding states computed from older reads"""
+        with self.lock:
+            self._generations[project_id] = self._generations.get(project_id, 0) + 1
+
+    def apply(self, project_id: int, changes: ScheduleChanges) -> Dict[int, Dict]:
+        """Applies changes to a cached project; uncached projects are left to load lazily"""
+        with self.lock:
+            self.touch(project_id)
+            state = self._states.get(project_id)
+            if state is None or not len(changes):
+                return {}
+            try:
+                delta = state.apply(changes)
+            except Exception:
+                # The write itself already succeeded; recompute fully on the next read
+                self.invalidate(project_id)
+                return {}
+            self._pending[project_id].update(delta)
+            self._release_watchers(changes.removed_tasks)
+            self._release_watchers(delta, state)
+            return delta
+
+    def pop_changes(self, project_id: int) -> Dict[int, Dict]:
+        """Returns the entries changed since the previous call for this project"""
+        with self.lock:
+            state = self._states.get(project_id)
+            pending = self._pending.get(project_id)
+            if state is None or not pending:
+                return {}
+            self._pending[project_id] = set()
+            return {
+                task_id: state.entry(task_id)
+                for task_id in pending if task_id in state.durations
+            }
+
+    def invalidate(self, project_id: Optional[int] = None):
+        with self.lock:
+            if project_id is None:
+                self._epoch += 1
+                self._states.clear()
+                self._pending.clear()
+                self._watchers.clear()
+            else:
+                self.touch(project_id)
+                state = self._states.pop(project_id, None)
+                self._pending.pop(project_id, None)
+                if state is not None:
+                    for task_id in state.boundaries:
+                        self._watchers.get(task_id, set()).discard(project_id)
+                    self._release_watchers(state.durations)
@@ -1,17 +1,69 @@
+import time
 from datetime import datetime, timedelta
-import networkx as nx
-from typing import Dict, List, Optional, Set
-from ..models.task import Task, TaskDependency, DependencyType
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+from ..models.task import Task, TaskDependency, DependencyType, TaskPriority
+from . import cpm_engine
+from .cpm_engine import CompiledGraph, SchedulingError, boundary_release
+from .leveling import DEFAULT_CAPACITY, level_schedule
+from ..metrics import record_phases
 
-class SchedulingError(Exception):
-    pass
+if TYPE_CHECKING:
+    import networkx as nx
+
+# "array" compiles the graph into flat arrays (see cpm_engine); "networkx"
+# keeps the original node-dict implementation as a fallback.
+BACKENDS = ("array", "networkx")
+
+# Leveling places higher ranks first among tasks with equal float
+PRIORITY_RANKS = {
+    TaskPriority.LOW: 0,
+    TaskPriority.MEDIUM: 1,
+    TaskPriority.HIGH: 2,
+    TaskPriority.CRITICAL: 3,
+}
 
 class ProjectScheduler:
-    def __init__(self):
-        self.graph = nx.DiGraph()
+    def __init__(self, backend: str = "array"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown scheduler backend: {backend}")
+        self.backend = backend
+        self.compiled: Optional[CompiledGraph] = None
+        self._graph: Optional["nx.DiGraph"] = None
+        # Dependencies on outside tasks, which the networkx backend keeps off the graph
+        self._boundaries: Dict[int, Tuple[float, float]] = {}
+        self._boundary_dependencies: List[TaskDependency] = []
+
+    @property
+    def graph(self) -> "nx.DiGraph":
+        """The networkx view of the dependency graph, built on first access"""
+        if self._graph is None:
+            # networkx is only loaded by this view and the networkx backend
+            import networkx as nx
+            self._graph = nx.DiGraph()
+            if self.compiled is not None:
+                self._populate_graph_from_compiled()
+        return self._graph
         
-    def build_dependency_graph(self, tasks: List[Task], dependencies: List[TaskDependency]):
-        """Builds a directed graph representing task dependencies"""
+    def build_dependency_graph(
+        self,
+        tasks: List[Task],
+        dependencies: List[TaskDependency],
+        boundaries: Optional[Dict[int, Tuple[float, float]]] = None
+    ):
+        """Builds a directed graph representing task dependencies
+
+        ``boundaries`` fixes the (earliest start, earliest finish) of tasks
+        of other projects that these tasks depend on; see
+        CompiledGraph.from_records.
+        """
+        started = time.perf_counter()
+        boundaries = boundaries or {}
+        if self.backend == "array":
+            self.compiled = CompiledGraph.from_records(tasks, dependencies, boundaries)
+            self._graph = None
+            record_phases({'graph_build': time.perf_counter() - started})
+            return
+
         self.graph.clear()
         
         # Add all tasks as nodes
@@ -24,20 +76,70 @@ class ProjectScheduler:
                 earliest_finish=None,
                 latest_finish=None,
                 is_milestone=task.is_milestone,
-                is_locked=task.is_locked
+                is_locked=task.is_locked,
+                release=0.0
             )
         
-        # Add dependencies as edges
+        # Add dependencies as edges; ones on fixed outside tasks become release times
+        self._boundaries = boundaries
+        self._boundary_dependencies = []
         for dep in dependencies:
+            if dep.predecessor_id in boundaries and dep.predecessor_id not in self.graph:
+                if dep.successor_id in self.graph:
+                    node = self.graph.nodes[dep.successor_id]
+                    node['release'] = max(node['release'], boundary_release(dep, boundaries))
+                    self._boundary_dependencies.append(dep)
+                continue
             self.graph.add_edge(
                 dep.predecessor_id,
                 dep.successor_id,
                 type=dep.dependency_type,
                 lag=dep.lag_time or 0
             )
+        record_phases({'graph_build': time.perf_counter() - started})
+            
+    def _populate_graph_from_compiled(self):
+        compiled = self.compiled
+        codes = {code: dep_type for dep_type, code in cpm_engine.DEPENDENCY_CODES.items()}
+        for task_id, duration, milestone, locked, release in zip(
+            compiled.task_ids.tolist(),
+            compiled.durations.tolist(),
+            compiled.is_milestone.tolist(),
+            compiled.is_locked.tolist(),
+            compiled.release.tolist()
+        ):
+            self._graph.add_node(
+                task_id,
+                duration=duration,
+                earliest_start=None,
+                latest_start=None,
+                earliest_finish=None,
+                latest_finish=None,
+                is_milestone=milestone,
+                is_locked=locked,
+                release=release
+            )
+        task_ids = compiled.task_ids
+        for pred, succ, code, lag in zip(
+            task_ids[compiled.edge_pred].tolist(),
+            task_ids[compiled.edge_succ].tolist(),
+            compiled.edge_type.tolist(),
+            compiled.edge_lag.tolist()
+        ):
+            self._graph.add_edge(pred, succ, type=codes[code], lag=lag)
             
     def detect_cycles(self) -> List[List[int]]:
-        """Detects any circular dependencies in the task graph"""
+        """Detects any circular dependencies in the task graph
+
+        The networkx backend enumerates every cycle; the array backend
+        returns a single witness cycle, which is all callers rely on.
+        """
+        if self.backend == "array":
+            if self.compiled is None:
+                return []
+            cycle = self.compiled.find_cycle()
+            return [cycle] if cycle else []
+        import networkx as nx
         try:
             cycles = list(nx.simple_cycles(self.graph))
             if cycles:
@@ -46,31 +148,52 @@ class ProjectScheduler:
         except nx.NetworkXNoCycle:
             return []
             
-    def calculate_critical_path(self) -> Dict:
-        """Implements the Critical Path Method (CPM) algorithm"""
+    def use_graph(self, compiled: CompiledGraph):
+        """Schedules an already compiled graph, e.g. a variant from CompiledGraph.with_changes"""
+        self.compiled = compiled
+        self._graph = None
+
+    def calculate_critical_path(self, schedule: bool = True) -> Dict:
+        """Implements the Critical Path Method (CPM) algorithm
+
+        Without ``schedule`` only the critical path and duration are returned.
+        """
+        timings: Dict[str, float] = {}
+        if self.backend == "array":
+            if self.compiled is None:
+                raise SchedulingError("No dependency graph has been built")
+            result = cpm_engine.critical_path(self.compiled, timings, schedule=schedule)
+            record_phases(timings)
+            return result
+        
+        mark = time.perf_counter()
         if self.detect_cycles():
             raise SchedulingError("Circular dependencies detected")
+        timings['cycle_check'] = time.perf_counter() - mark
+        mark = time.perf_counter()
             
         # Forward pass - earliest times
+        import networkx as nx
         sorted_nodes = list(nx.topological_sort(self.graph))
         for node in sorted_nodes:
             predecessors = list(self.graph.predecessors(node))
+            release = self.graph.nodes[node].get('release', 0)
             if not predecessors:  # Start tasks
-                self.graph.nodes[node]['earliest_start'] = 0
+                self.graph.nodes[node]['earliest_start'] = release
             else:
                 # Calculate earliest start based on dependencies
-                max_predecessor_time = 0
+                max_predecessor_time = release
                 for pred in predecessors:
                     pred_finish = (self.graph.nodes[pred]['earliest_start'] + 
                                  self.graph.nodes[pred]['duration'])
                     edge_data = self.graph.edges[(pred, node)]
                     if edge_data['type'] == DependencyType.FINISH_TO_START:
-                        time = pred_finish + edge_data['lag']
+                        candidate = pred_finish + edge_data['lag']
                     elif edge_data['type'] == DependencyType.START_TO_START:
-                        time = self.graph.nodes[pred]['earliest_start'] + edge_data['lag']
+                        candidate = self.graph.nodes[pred]['earliest_start'] + edge_data['lag']
                     else:  # Handle other dependency types
-                        time = pred_finish + edge_data['lag']
-                    max_predecessor_time = max(max_predecessor_time, time)
+                        candidate = pred_finish + edge_data['lag']
+                    max_predecessor_time = max(max_predecessor_time, candidate)
                 
                 self.graph.nodes[node]['earliest_start'] = max_predecessor_time
                 
@@ -80,6 +203,9 @@ class ProjectScheduler:
                 self.graph.nodes[node]['duration']
             )
             
+        timings['forward_pass'] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        
         # Backward pass - latest times
         project_end = max(
             self.graph.nodes[node]['earliest_finish'] 
@@ -96,12 +222,12 @@ class ProjectScheduler:
                 for succ in successors:
                     edge_data = self.graph.edges[(node, succ)]
                     if edge_data['type'] == DependencyType.FINISH_TO_START:
-                        time = self.graph.nodes[succ]['latest_start'] - edge_data['lag']
+                        candidate = self.graph.nodes[succ]['latest_start'] - edge_data['lag']
                     elif edge_data['type'] == DependencyType.FINISH_TO_FINISH:
-                        time = self.graph.nodes[succ]['latest_finish'] - edge_data['lag']
+                        candidate = self.graph.nodes[succ]['latest_finish'] - edge_data['lag']
                     else:
-                        time = self.graph.nodes[succ]['latest_start'] - edge_data['lag']
-                    min_successor_time = min(min_successor_time, time)
+                        candidate = self.graph.nodes[succ]['latest_start'] - edge_data['lag']
+                    min_successor_time = min(min_successor_time, candidate)
                 
                 self.graph.nodes[node]['latest_finish'] = min_successor_time
                 
@@ -111,6 +237,9 @@ class ProjectScheduler:
                 self.graph.nodes[node]['duration']
             )
             
+        timings['backward_pass'] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        
         # Calculate float and identify critical path
         critical_path = []
         for node in self.graph.nodes:
@@ -122,7 +251,7 @@ class ProjectScheduler:
             if total_float == 0:
                 critical_path.append(node)
                 
-        return {
+        result = {
             'critical_path': critical_path,
             'project_duration': project_end,
             'schedule': {
@@ -136,8 +265,75 @@ class ProjectScheduler:
                 for node in self.graph.nodes
             }
         }
+        if not schedule:
+            del result['schedule']
+        timings['results'] = time.perf_counter() - mark
+        record_phases(timings)
+        return result
+
+    def level_resources(
+        self,
+        tasks: List[Task],
+        resource_capacity: Dict[int, float],
+        assignments: Optional[Iterable] = None,
+        default_capacity: float = DEFAULT_CAPACITY
+    ) -> Dict:
+        """Levels resources over the built graph with serial schedule generation
+
+        ``resource_capacity`` maps resource ids to hours per day. Assignments
+        are read from ``assignments`` (rows with task_id, resource_id and
+        assigned_hours) when given, otherwise from each task's
+        resource_assignments relationship.
+        """
+        compiled, demands, priorities = self.leveling_inputs(tasks, assignments)
+        return level_schedule(
+            compiled,
+            demands,
+            resource_capacity,
+            priorities=priorities,
+            default_capacity=default_capacity
+        )
+
+    def leveling_inputs(self, tasks: List[Task], assignments: Optional[Iterable] = None):
+        """Returns the compiled graph, per-position demands and priority ranks for level_schedule"""
+        compiled = self.compiled
+        if compiled is None or self.backend != "array":
+            compiled = CompiledGraph.from_records(
+                tasks, self._edge_records() + self._boundary_dependencies, self._boundaries
+            )
+        if compiled.missing:
+            raise SchedulingError(
+                f"Dependencies reference tasks outside the schedule: {compiled.missing}"
+            )
+        
+        if assignments is None:
+            assignments = [
+                assignment for task in tasks for assignment in task.resource_assignments
+            ]
+        positions = compiled.positions
+        demands: Dict[int, List] = {}
+        for assignment in assignments:
+            position = positions.get(assignment.task_id)
+            if position is not None and assignment.assigned_hours:
+                demands.setdefault(position, []).append(
+                    (assignment.resource_id, assignment.assigned_hours)
+                )
         
-    def level_resources(self, tasks: List[Task], resource_capacity: Dict):
-        """Optional resource leveling algorithm"""
-        # TODO: Implement resource leveling logic
-        pass
+        priorities = [0] * compiled.num_tasks
+        for task in tasks:
+            if task.id in positions:
+                priorities[positions[task.id]] = PRIORITY_RANKS.get(
+                    task.priority, PRIORITY_RANKS[TaskPriority.MEDIUM]
+                )
+        return compiled, demands, priorities
+
+    def _edge_records(self) -> List[TaskDependency]:
+        return [
+            TaskDependency(
+                predecessor_id=pred,
+                successor_id=succ,
+                dependency_type=data['type'],
+                lag_time=data['lag']
+            )
+            for pred, succ, data in self.graph.edges(data=True)
+        ]
@@ -0,0 +1,183 @@
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .cpm_engine import CompiledGraph, SS, FF, critical_path
+
+DISTRIBUTIONS = ("pert", "triangular")
+
+# Upper bound on samples x tasks per duration matrix (~32MB of float64)
+MAX_CHUNK_CELLS = 4_000_000
+
+# Tolerance on total float when counting a task as critical in a sample
+CRITICAL_TOLERANCE = 1e-6
+
+class SimulationPlan:
+    """Per-level edge groupings reused by every chunk of a simulation"""
+
+    def __init__(self, graph: CompiledGraph):
+        levels = graph.levels()
+        self.graph = graph
+        self.forward = []
+        self.backward = []
+        for l in range(levels.count):
+            # in_edges keeps the successor-sorted edge order within a level
+            edges = levels.in_edges[levels.in_edge_offsets[l]:levels.in_edge_offsets[l + 1]]
+            if l and len(edges):
+                succs = graph.edge_succ[edges]
+                starts = np.flatnonzero(np.r_[True, succs[1:] != succs[:-1]])
+                self.forward.append((edges, starts, succs[starts]))
+            else:
+                self.forward.append(None)
+
+            edges = levels.out_edges[levels.out_edge_offsets[l]:levels.out_edge_offsets[l + 1]]
+            edges = edges[np.argsort(graph.edge_pred[edges], kind="stable")]
+            nodes = levels.nodes[levels.node_offsets[l]:levels.node_offsets[l + 1]]
+            if len(edges):
+                preds = graph.edge_pred[edges]
+                starts = np.flatnonzero(np.r_[True, preds[1:] != preds[:-1]])
+                self.backward.append((edges, starts, preds[starts], nodes))
+            else:
+                self.backward.append((None, None, None, nodes))
+        self.is_sink = np.diff(graph.out_offsets) == 0
+
+def sample_durations(
+    rng: np.random.Generator,
+    base: np.ndarray,
+    samples: int,
+    distribution: str,
+    optimistic_factor: float,
+    pessimistic_factor: float
+) -> np.ndarray:
+    """Draws a (tasks, samples) matrix of durations around the base durations"""
+    low = base * optimistic_factor
+    high = base * pessimistic_factor
+    spread = high - low
+    variable = spread > 0
+    durations = np.repeat(base[:, None], samples, axis=1)
+    if not variable.any():
+        return durations
+
+    low, mode, spread = low[variable, None], base[variable, None], spread[variable, None]
+    size = (len(mode), samples)
+    if distribution == "triangular":
+        draws = rng.triangular(low, mode, low + spread, size=size)
+    elif distribution == "pert":
+        alpha = 1 + 4 * (mode - low) / spread
+        beta = 1 + 4 * (low + spread - mode) / spread
+        draws = low + rng.beta(alpha, beta, size=size) * spread
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    durations[variable] = draws
+    return durations
+
+def simulate_chunk(
+    plan: SimulationPlan,
+    samples: int,
+    seed: np.random.SeedSequence,
+    distribution: str,
+    optimistic_factor: float,
+    pessimistic_factor: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Runs CPM for a block of samples at once; returns finishes and critical counts
+
+    Matrices are task-major (tasks, samples) so that gathering the rows of
+    an edge's endpoints reads contiguous memory.
+    """
+    graph = plan.graph
+    rng = np.random.default_rng(seed)
+    durations = sample_durations(
+        rng, graph.durations, samples, distribution, optimistic_factor, pessimistic_factor
+    )
+    lags = graph.edge_lag[:, None]
+
+    # Forward pass: max over each successor's incoming edges via reduceat
+    earliest_start = np.repeat(graph.release[:, None], samples, axis=1)
+    from_start = (graph.edge_type == SS)[:, None]
+    for group in plan.forward:
+        if group is None:
+            continue
+        edges, starts, succs = group
+        preds = graph.edge_pred[edges]
+        pred_start = earliest_start[preds]
+        times = np.where(from_start[edges], pred_start, pred_start + durations[preds]) + lags[edges]
+        earliest_start[succs] = np.maximum(
+            earliest_start[succs], np.maximum.reduceat(times, starts, axis=0)
+        )
+    finish = (earliest_start + durations).max(axis=0)
+
+    # Backward pass: min over each predecessor's outgoing edges
+    latest_finish = np.where(plan.is_sink[:, None], finish[None, :], np.inf)
+    latest_start = np.empty_like(durations)
+    to_finish = (graph.edge_type == FF)[:, None]
+    for edges, starts, preds, nodes in reversed(plan.backward):
+        if edges is not None:
+            succs = graph.edge_succ[edges]
+            times = np.where(to_finish[edges], latest_finish[succs], latest_start[succs]) - lags[edges]
+            latest_finish[preds] = np.minimum.reduceat(times, starts, axis=0)
+        latest_start[nodes] = latest_finish[nodes] - durations[nodes]
+
+    critical = np.abs(latest_start - earliest_start) <= CRITICAL_TOLERANCE
+    return finish, critical.sum(axis=1)
+
+def _run_chunk(args):
+    return simulate_chunk(*args)
+
+def simulate(
+    graph: CompiledGraph,
+    samples: int,
+    distribution: str = "pert",
+    optimistic_factor: float = 0.8,
+    pessimistic_factor: float = 1.5,
+    percentiles: Sequence[float] = (50, 80, 95),
+    seed: Optional[int] = None,
+    executor: Optional[Executor] = None
+) -> Dict:
+    """Monte Carlo schedule risk analysis over one topological order
+
+    Samples are evaluated as task-major (tasks, samples) matrices in memory-bounded
+    chunks. The chunks run here one after another, or on ``executor`` when
+    the caller has one to share; simulate never starts a pool of its own,
+    since it already runs inside a JobManager worker when served by the
+    API. The chunking and seeds do not depend on where the chunks run, so
+    a seeded run gives the same answer either way.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    n = graph.num_tasks
+    plan = SimulationPlan(graph)
+    chunk_size = max(1, min(samples, MAX_CHUNK_CELLS // max(n, 1)))
+    sizes = [chunk_size] * (samples // chunk_size)
+    if samples % chunk_size:
+        sizes.append(samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [
+        (plan, size, chunk_seed, distribution, optimistic_factor, pessimistic_factor)
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+
+    if executor is not None and len(chunks) > 1:
+        results = list(executor.map(_run_chunk, chunks))
+    else:
+        results = [_run_chunk(chunk) for chunk in chunks]
+
+    finish = np.concatenate([result[0] for result in results])
+    critical = np.sum([result[1] for result in results], axis=0)
+    return {
+        'samples': samples,
+        'mean_duration': float(finish.mean()),
+        'std_duration': float(finish.std()),
+        'min_duration': float(finish.min()),
+        'max_duration': float(finish.max()),
+        'percentiles': {
+            p: float(value)
+            for p, value in zip(percentiles, np.percentile(finish, list(percentiles)))
+        },
+        'criticality': dict(zip(graph.task_ids.tolist(), (critical / samples).tolist()))
+    }
+
+def simulate_project(graph: CompiledGraph, samples: int, **options) -> Dict:
+    """simulate() plus the deterministic CPM duration, as one unit of work"""
+    deterministic = critical_path(graph)
+    result = simulate(graph, samples, **options)
+    result['deterministic_duration'] = deterministic['project_duration']
+    return result
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..models.task import Project
+
+# Bounds of the serialized response cache
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def bump_project_versions(db: Session, project_ids: Iterable[Optional[int]]):
+    """Marks projects as changed; call inside the write's transaction, before commit"""
+    project_ids = {project_id for project_id in project_ids if project_id is not None}
+    if project_ids:
+        db.execute(
+            update(Project)
+            .where(Project.id.in_(project_ids))
+            .values(version=Project.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+class ResponseCache:
+    """LRU of serialized response bodies and their headers, bounded by entry count and total size.
+
+    Keys include the version of the data a body was built from, so entries
+    never need invalidating: a write bumps the version, later requests
+    miss, and the stale bodies age out.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._bodies: "OrderedDict[Hashable, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self.lock:
+            entry = self._bodies.get(key)
+            if entry is not None:
+                self._bodies.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, body: bytes, headers: Optional[Dict[str, str]] = None):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._bodies[key] = (body, headers or {})
+            self._size += len(body)
+            while len(self._bodies) > self.max_entries or self._size > self.max_bytes:
+                _, (evicted, _) = self._bodies.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self._bodies.clear()
+            self._size = 0
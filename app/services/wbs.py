@@ -0,0 +1,232 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+class WbsNode:
+    """One task in the WBS; summaries hold values rolled up from their children"""
+
+    __slots__ = (
+        "id", "parent_id", "title", "children",
+        "start", "finish", "duration", "work_hours", "earned_hours", "progress", "cost"
+    )
+
+    def __init__(self, task_id: int):
+        self.id = task_id
+        self.parent_id: Optional[int] = None
+        self.title = ""
+        self.children: List["WbsNode"] = []
+        self.start: Optional[datetime] = None
+        self.finish: Optional[datetime] = None
+        self.duration = 0.0
+        self.work_hours = 0.0
+        # Work hours done, progress / 100 * work_hours, so progress rolls up weighted by work
+        self.earned_hours = 0.0
+        self.progress = 0.0
+        self.cost = 0.0
+
+    def set_values(self, row):
+        """Takes a task's own values from a row of the rollup query"""
+        self.title = row.title
+        self.start = row.start
+        self.duration = float(row.duration or 0)
+        # row.end is the actual or scheduled finish; tasks started on their
+        # own dates without an actual end count their duration in days
+        self.finish = row.end or (
+            self.start + timedelta(days=self.duration) if self.start is not None else None
+        )
+        self.work_hours = float(row.work_hours or 0)
+        self.progress = float(row.progress or 0)
+        self.earned_hours = self.progress / 100 * self.work_hours
+        self.cost = float(row.cost or 0)
+
+    def rollup(self):
+        """Recomputes a summary from its direct children"""
+        _aggregate(self, self.children)
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+def _aggregate(target, children: List[WbsNode]):
+    starts = [child.start for child in children if child.start is not None]
+    finishes = [child.finish for child in children if child.finish is not None]
+    target.start = min(starts) if starts else None
+    target.finish = max(finishes) if finishes else None
+    if target.start is not None and target.finish is not None:
+        target.duration = (target.finish - target.start).total_seconds() / 86400
+    else:
+        # Undated children: the longest one is the best lower bound
+        target.duration = max((child.duration for child in children), default=0.0)
+    target.work_hours = sum(child.work_hours for child in children)
+    target.earned_hours = sum(child.earned_hours for child in children)
+    if target.work_hours:
+        target.progress = target.earned_hours / target.work_hours * 100
+    else:
+        target.progress = sum(child.progress for child in children) / len(children) if children else 0.0
+    target.cost = sum(child.cost for child in children)
+
+class WbsRollup:
+    """Summary task values of one project, kept up to date per task.
+
+    A parent/child index over ``Task.parent_id`` is built once, and every
+    summary is computed in a single post-order pass. Summary values come
+    from their children only: start/finish span the children, duration is
+    that span in days, work hours and cost are summed, and progress is
+    weighted by work hours. After a leaf changes only its ancestor chain
+    is recomputed.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[int, WbsNode] = {}
+        self.roots: List[WbsNode] = []
+        self.totals = WbsNode(0)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "WbsRollup":
+        rollup = cls()
+        rows = list(rows)
+        for row in rows:
+            node = rollup.nodes[row.id] = WbsNode(row.id)
+            node.set_values(row)
+        for row in rows:
+            rollup._attach(rollup.nodes[row.id], row.parent_id)
+        rollup._break_cycles()
+        for node in rollup._post_order():
+            if node.children:
+                node.rollup()
+        _aggregate(rollup.totals, rollup.roots)
+        return rollup
+
+    def _attach(self, node: WbsNode, parent_id: Optional[int]):
+        parent = self.nodes.get(parent_id) if parent_id is not None else None
+        if parent is None:
+            # Tasks whose parent lies outside the project are roots here
+            node.parent_id = None
+            self.roots.append(node)
+        else:
+            node.parent_id = parent_id
+            parent.children.append(node)
+
+    def _break_cycles(self):
+        """Turns tasks on a parent_id cycle, which no root reaches, into roots"""
+        reached = {node.id for node in self._pre_order()}
+        for node in sorted(self.nodes.values(), key=lambda node: node.id):
+            if node.id in reached:
+                continue
+            parent = self.nodes[node.parent_id]
+            parent.children.remove(node)
+            node.parent_id = None
+            self.roots.append(node)
+            reached.update(descendant.id for descendant in self._pre_order([node]))
+
+    def _pre_order(self, roots: Optional[List[WbsNode]] = None) -> Iterable[WbsNode]:
+        stack = list(reversed(roots if roots is not None else self.roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def _post_order(self) -> List[WbsNode]:
+        return list(self._pre_order())[::-1]
+
+    def _rollup_ancestors(self, parent_id: Optional[int]):
+        while parent_id is not None:
+            parent = self.nodes[parent_id]
+            parent.rollup()
+            parent_id = parent.parent_id
+        _aggregate(self.totals, self.roots)
+
+    def update_task(self, row) -> bool:
+        """Applies a task's new values; returns False if its place in the tree changed"""
+        node = self.nodes.get(row.id)
+        if node is None:
+            return self.add_task(row)
+        parent_id = row.parent_id if row.parent_id in self.nodes else None
+        if parent_id != node.parent_id:
+            return False
+        if node.children:
+            node.title = row.title  # Everything else is rolled up
+            return True
+        node.set_values(row)
+        self._rollup_ancestors(node.parent_id)
+        return True
+
+    def add_task(self, row) -> bool:
+        node = self.nodes[row.id] = WbsNode(row.id)
+        node.set_values(row)
+        self._attach(node, row.parent_id)
+        self.roots.sort(key=lambda root: root.id)
+        self._rollup_ancestors(node.parent_id)
+        return True
+
+    def _entry(self, node: WbsNode, code: str, level: int) -> Dict:
+        return {
+            'id': node.id,
+            'parent_id': node.parent_id,
+            'wbs': code,
+            'level': level,
+            'title': node.title,
+            'is_summary': bool(node.children),
+            'start_date': _isoformat(node.start),
+            'end_date': _isoformat(node.finish),
+            'duration': node.duration,
+            'work_hours': node.work_hours,
+            'progress': node.progress,
+            'cost': node.cost
+        }
+
+    def rows(self) -> List[Dict]:
+        """Every task in WBS order, numbered 1, 1.1, 1.2, 2, ... by task id within a parent.
+
+        Dates are ISO strings already, so the rows can be dumped as JSON as is.
+        """
+        rows = []
+        stack = [
+            (root, str(number), 0)
+            for number, root in reversed(list(enumerate(sorted(self.roots, key=lambda n: n.id), 1)))
+        ]
+        while stack:
+            node, code, level = stack.pop()
+            rows.append(self._entry(node, code, level))
+            children = sorted(node.children, key=lambda child: child.id)
+            for number in range(len(children), 0, -1):
+                stack.append((children[number - 1], f"{code}.{number}", level + 1))
+        return rows
+
+    def summary(self) -> Dict:
+        totals = self.totals
+        return {
+            'start_date': _isoformat(totals.start),
+            'end_date': _isoformat(totals.finish),
+            'duration': totals.duration,
+            'work_hours': totals.work_hours,
+            'progress': totals.progress,
+            'cost': totals.cost
+        }
+
+class WbsRegistry:
+    """Holds one lazily built WbsRollup per project"""
+
+    def __init__(self):
+        self._rollups: Dict[int, WbsRollup] = {}
+        self.lock = threading.RLock()
+
+    def get(self, project_id: int, loader: Callable[[], Iterable]) -> WbsRollup:
+        with self.lock:
+            rollup = self._rollups.get(project_id)
+            if rollup is None:
+                rollup = self._rollups[project_id] = WbsRollup.from_rows(loader())
+            return rollup
+
+    def update_task(self, project_id: int, row):
+        """Applies one task's new values, dropping the project's rollup if the tree changed"""
+        with self.lock:
+            rollup = self._rollups.get(project_id)
+            if rollup is not None and not rollup.update_task(row):
+                del self._rollups[project_id]
+
+    def invalidate(self, project_id: Optional[int] = None):
+        with self.lock:
+            if project_id is None:
+                self._rollups.clear()
+            else:
+                self._rollups.pop(project_id, None)
@@ -0,0 +1,32 @@
+import time
+from typing import Dict, List, Tuple
+
+class StartupTimer:
+    """Wall time of each phase of backend startup, from the first import of app.main"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str):
+        """Ends ``phase``, which ran since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def total(self) -> float:
+        return self._last - self.started
+
+    def as_dict(self) -> Dict:
+        return {
+            'total_ms': round(self.total() * 1000, 1),
+            'phases': {phase: round(seconds * 1000, 1) for phase, seconds in self.phases}
+        }
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f}" for phase, seconds in self.phases)
+        return f"Backend started in {self.total() * 1000:.0f} ms ({phases})"
+
+# Started as early as possible: app.main imports this before anything else
+startup_timer = StartupTimer()
@@ -0,0 +1,53 @@
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+import typer
+
+from .generator import SHAPES
+from .suite import (
+    DEFAULT_THRESHOLD, compare, format_comparison, format_results,
+    load_report, run_suite, save_report
+)
+
+cli = typer.Typer(help="Scheduler and API benchmarks on generated projects")
+
+@cli.command()
+def run(
+    sizes: List[int] = typer.Option([1000, 10000], "--size", help="Task count; repeat for several"),
+    shapes: List[str] = typer.Option(list(SHAPES), "--shape", help="chain, fanout or layered; repeat for several"),
+    repeat: int = typer.Option(5, "--repeat", help="Timed runs per case"),
+    seed: int = typer.Option(0, "--seed", help="Generator seed"),
+    backend: str = typer.Option("array", "--backend", help="Scheduler backend: array or networkx"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the JSON report here"),
+    baseline: Optional[Path] = typer.Option(
+        None, "--compare", exists=True, dir_okay=False, help="Report of an earlier run to compare against"
+    ),
+    threshold: float = typer.Option(DEFAULT_THRESHOLD, "--threshold", help="Allowed median slowdown, 0.2 = 20%")
+):
+    """Generates projects into a temporary SQLite file and times the hot paths"""
+    for shape in shapes:
+        if shape not in SHAPES:
+            raise typer.BadParameter(f"Unknown shape: {shape}", param_hint="--shape")
+    previous = load_report(baseline) if baseline else None
+
+    with tempfile.TemporaryDirectory(prefix="project-manager-bench-") as data_dir:
+        report = run_suite(
+            Path(data_dir), sizes, shapes, repeat, seed, backend,
+            log=lambda line: typer.echo(line, err=True)
+        )
+
+    typer.echo(format_results(report))
+    if output:
+        save_report(report, output)
+        typer.echo(f"Report written to {output}")
+    if previous:
+        rows = compare(previous, report, threshold)
+        typer.echo("")
+        typer.echo(format_comparison(rows))
+        regressions = [row for row in rows if row['regressed']]
+        if regressions:
+            typer.echo(f"{len(regressions)} case(s) regressed by more than {threshold:.0%}", err=True)
+            raise typer.Exit(code=1)
+
+if __name__ == "__main__":
+    cli()
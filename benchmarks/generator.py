@@ -0,0 +1,223 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.models.task import (
+    Project, Task, TaskDependency, TaskResourceAssignment, Resource,
+    DependencyType, TaskPriority, TaskStatus
+)
+
+# Dependency graph shapes:
+#   chain   - long sequential chains with occasional links between them (deep)
+#   fanout  - an out-tree where every task feeds a few successors, plus joins (wide)
+#   layered - layers of parallel tasks, each depending on tasks of the layer before
+SHAPES = ("chain", "fanout", "layered")
+
+# Relative frequency of each dependency type
+DEPENDENCY_MIX = [
+    (DependencyType.FINISH_TO_START, 0.70),
+    (DependencyType.START_TO_START, 0.15),
+    (DependencyType.FINISH_TO_FINISH, 0.10),
+    (DependencyType.START_TO_FINISH, 0.05)
+]
+
+# Share of dependencies with a lag, drawn from LAG_RANGE days (negative is lead time)
+LAG_SHARE = 0.25
+LAG_RANGE = (-2, 5)
+
+# Tasks per work package, and work packages per phase, in the hierarchy
+PACKAGE_SIZE = 25
+PHASE_SIZE = 20
+
+MILESTONE_SHARE = 0.03
+CHAIN_LENGTH = 200
+FANOUT = 4
+
+class SyntheticProject:
+    """A generated project; tasks, dependencies and assignments refer to tasks by index"""
+
+    def __init__(self, name: str, shape: str, start_date: datetime):
+        self.name = name
+        self.shape = shape
+        self.start_date = start_date
+        self.tasks: List[Dict] = []
+        self.parents: List[Optional[int]] = []
+        # (predecessor index, successor index, type, lag)
+        self.dependencies: List[Tuple[int, int, DependencyType, float]] = []
+        self.resources: List[Dict] = []
+        # (task index, resource index, hours)
+        self.assignments: List[Tuple[int, int, float]] = []
+
+    def describe(self) -> Dict:
+        return {
+            'shape': self.shape,
+            'tasks': len(self.tasks),
+            'dependencies': len(self.dependencies),
+            'resources': len(self.resources),
+            'assignments': len(self.assignments),
+            'summary_tasks': len({parent for parent in self.parents if parent is not None})
+        }
+
+def _predecessors(shape: str, count: int, rng: random.Random) -> List[Tuple[int, int]]:
+    """Returns (predecessor, successor) index pairs; predecessors always come first, so the graph is acyclic"""
+    edges = []
+    if shape == "chain":
+        for i in range(1, count):
+            if i % CHAIN_LENGTH:
+                edges.append((i - 1, i))
+            elif rng.random() < 0.5:
+                # Hand over from somewhere in the previous chain
+                edges.append((rng.randrange(i - CHAIN_LENGTH, i), i))
+    elif shape == "fanout":
+        for i in range(1, count):
+            edges.append(((i - 1) // FANOUT, i))
+            if i > FANOUT and rng.random() < 0.3:
+                join = rng.randrange(0, i - 1)
+                if join != (i - 1) // FANOUT:
+                    edges.append((join, i))
+    elif shape == "layered":
+        width = max(int(count ** 0.5), 1)
+        for i in range(width, count):
+            layer_start = i - i % width
+            previous = range(layer_start - width, layer_start)
+            for predecessor in rng.sample(previous, min(rng.randint(1, 3), width)):
+                edges.append((predecessor, i))
+            if layer_start >= 2 * width and rng.random() < 0.1:
+                # Skip a few layers back
+                edges.append((rng.randrange(max(layer_start - 5 * width, 0), layer_start - width), i))
+    else:
+        raise ValueError(f"Unknown shape: {shape}")
+    return edges
+
+def generate_project(
+    num_tasks: int,
+    shape: str = "layered",
+    seed: int = 0,
+    num_resources: Optional[int] = None,
+    start_date: datetime = datetime(2026, 1, 5)
+) -> SyntheticProject:
+    """Generates a reproducible project of ``num_tasks`` tasks.
+
+    Tasks are grouped into work packages and phases, dependencies mix all
+    four types with some lags and leads, and most tasks get one or two
+    resource assignments. Start dates come from an FS forward pass, so
+    Gantt and allocation queries see a realistic spread of dates.
+    """
+    rng = random.Random(seed)
+    project = SyntheticProject(f"Synthetic {shape} {num_tasks}", shape, start_date)
+
+    # Hierarchy: the first task of a package is its summary, and the first
+    # package of a phase holds the phase summary
+    phase_span = PACKAGE_SIZE * PHASE_SIZE
+    for i in range(num_tasks):
+        if i % phase_span == 0:
+            parent = None
+        elif i % PACKAGE_SIZE == 0:
+            parent = i - i % phase_span
+        else:
+            parent = i - i % PACKAGE_SIZE
+        project.parents.append(parent)
+
+    weights = [weight for _, weight in DEPENDENCY_MIX]
+    types = [dep_type for dep_type, _ in DEPENDENCY_MIX]
+    for predecessor, successor in _predecessors(shape, num_tasks, rng):
+        lag = float(rng.randint(*LAG_RANGE)) if rng.random() < LAG_SHARE else 0.0
+        project.dependencies.append((
+            predecessor, successor, rng.choices(types, weights)[0], lag
+        ))
+
+    durations = []
+    for i in range(num_tasks):
+        milestone = i > 0 and rng.random() < MILESTONE_SHARE
+        durations.append(0.0 if milestone else float(rng.choice((1, 1, 2, 2, 3, 5, 8, 13))))
+
+    # Forward pass treating every link as finish-to-start
+    offsets = [0.0] * num_tasks
+    for predecessor, successor, _, lag in project.dependencies:
+        offsets[successor] = max(offsets[successor], offsets[predecessor] + durations[predecessor] + lag)
+
+    priorities = list(TaskPriority)
+    for i, duration in enumerate(durations):
+        start = start_date + timedelta(days=offsets[i])
+        # The earliest fifth of the work is done or under way
+        if offsets[i] + duration < offsets[-1] * 0.1:
+            status, progress = TaskStatus.COMPLETED, 100.0
+        elif offsets[i] < offsets[-1] * 0.2:
+            status, progress = TaskStatus.IN_PROGRESS, float(rng.randint(0, 9) * 10)
+        else:
+            status, progress = TaskStatus.NOT_STARTED, 0.0
+        project.tasks.append({
+            'title': f"Task {i + 1}",
+            'duration': duration,
+            'work_hours': duration * 8,
+            'progress': progress,
+            'priority': rng.choice(priorities),
+            'status': status,
+            'is_milestone': duration == 0,
+            'is_locked': False,
+            'earliest_start_date': start
+        })
+
+    resource_count = num_resources or max(num_tasks // 50, 10)
+    project.resources = [
+        {'name': f"Resource {r + 1}", 'role': rng.choice(("Engineer", "Designer", "Analyst")),
+         'cost_per_hour': float(rng.randint(40, 120)), 'capacity_hours_per_day': 8.0}
+        for r in range(resource_count)
+    ]
+    for i, duration in enumerate(durations):
+        if duration == 0:
+            continue
+        roll = rng.random()
+        count = 0 if roll < 0.05 else 1 if roll < 0.75 else 2
+        for resource in rng.sample(range(resource_count), count):
+            project.assignments.append((i, resource, duration * 8 * rng.choice((0.5, 1.0))))
+    return project
+
+def write_project(db: Session, project: SyntheticProject, chunk_size: int = 5000) -> int:
+    """Bulk-inserts a generated project and returns its id.
+
+    Ids are allocated up front past the current maximum, so rows go in
+    with executemany inserts and no per-row round trips.
+    """
+    db_project = Project(name=project.name, start_date=project.start_date)
+    db.add(db_project)
+    db.flush()
+    project_id = db_project.id
+
+    first_task = (db.execute(select(func.max(Task.id))).scalar() or 0) + 1
+    first_resource = (db.execute(select(func.max(Resource.id))).scalar() or 0) + 1
+
+    def chunks(rows):
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    db.execute(insert(Resource), [
+        dict(resource, id=first_resource + r, email=f"bench-{project_id}-{r + 1}@example.com")
+        for r, resource in enumerate(project.resources)
+    ])
+    for rows in chunks([
+        dict(
+            task,
+            id=first_task + i,
+            unique_id=f"P{project_id}-T{i + 1}",
+            parent_id=first_task + parent if parent is not None else None,
+            project_id=project_id
+        )
+        for i, (task, parent) in enumerate(zip(project.tasks, project.parents))
+    ]):
+        db.execute(insert(Task), rows)
+    for rows in chunks([
+        {'predecessor_id': first_task + predecessor, 'successor_id': first_task + successor,
+         'dependency_type': dep_type, 'lag_time': lag}
+        for predecessor, successor, dep_type, lag in project.dependencies
+    ]):
+        db.execute(insert(TaskDependency), rows)
+    for rows in chunks([
+        {'task_id': first_task + task, 'resource_id': first_resource + resource,
+         'assigned_hours': hours}
+        for task, resource, hours in project.assignments
+    ]):
+        db.execute(insert(TaskResourceAssignment), rows)
+    db.commit()
+    return project_id
@@ -0,0 +1,401 @@
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Section 4.1 of the requirements: schedule updates complete within 500ms
+SCHEDULE_UPDATE_TARGET_MS = 500
+
+# A case counts as regressed when its median grows by more than this share
+DEFAULT_THRESHOLD = 0.2
+
+# Medians below this many ms are too noisy to flag
+NOISE_FLOOR_MS = 1.0
+
+REPORT_VERSION = 1
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Seconds a started backend has to answer its first request
+STARTUP_TIMEOUT = 60
+
+def measure(fn: Callable[[], None], repeat: int, warmup: int = 1, setup: Optional[Callable] = None) -> Dict:
+    """Times ``fn`` ``repeat`` times after ``warmup`` untimed calls; ``setup`` runs untimed before each call"""
+    samples = []
+    for run in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        if run >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+def summarize(samples: List[float]) -> Dict:
+    samples = sorted(samples)
+    return {
+        'runs': len(samples),
+        'min_ms': round(samples[0], 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(int(len(samples) * 0.95), len(samples) - 1)], 3),
+        'max_ms': round(samples[-1], 3)
+    }
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def measure_startup(data_dir: Path, repeat: int, warmup: int = 1) -> Dict[str, Dict]:
+    """Starts the backend the way the Electron shell does and times its first response.
+
+    ``first_response`` runs from spawning ``python -m app.main`` until
+    ``GET /projects/`` answers; the other cases are the phases the backend
+    reports on ``/startup``. The warmup run also creates the database.
+    """
+    import httpx
+
+    samples: Dict[str, List[float]] = {}
+    env = dict(os.environ, PROJECT_MANAGER_DATA_DIR=str(data_dir))
+    for run in range(warmup + repeat):
+        port = _free_port()
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.main", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+                while True:
+                    try:
+                        client.get("/projects/", params={"limit": 1}).raise_for_status()
+                        break
+                    except httpx.TransportError:
+                        if server.poll() is not None:
+                            raise RuntimeError("The backend exited during startup")
+                        if time.perf_counter() - started > STARTUP_TIMEOUT:
+                            raise RuntimeError("The backend did not answer in time")
+                        time.sleep(0.005)
+                elapsed = (time.perf_counter() - started) * 1000
+                phases = client.get("/startup").json()["phases"]
+        finally:
+            server.terminate()
+            server.wait()
+        if run >= warmup:
+            samples.setdefault("first_response", []).append(elapsed)
+            for phase, phase_ms in phases.items():
+                samples.setdefault(phase, []).append(phase_ms)
+    return {name: summarize(values) for name, values in samples.items()}
+
+def _use_data_dir(data_dir: Path):
+    """Points the app at a scratch database; must happen before app.database is imported"""
+    loaded = sys.modules.get("app.database")
+    if loaded is not None and Path(loaded.data_dir) != data_dir:
+        raise RuntimeError(
+            "app.database was imported before the benchmark database was configured"
+        )
+    os.environ["PROJECT_MANAGER_DATA_DIR"] = str(data_dir)
+
+def run_suite(
+    data_dir: Path,
+    sizes: List[int],
+    shapes: List[str],
+    repeat: int = 5,
+    seed: int = 0,
+    backend: str = "array",
+    log: Callable[[str], None] = print
+) -> Dict:
+    """Runs every case for each size and shape and returns the report.
+
+    Each project is generated into the database at ``data_dir``, measured,
+    and deleted again, so the listing only ever sees one project.
+    """
+    _use_data_dir(data_dir)
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+    from app import main
+    from app.database import SessionLocal
+    from app.models.task import (
+        Project, Task, TaskDependency, TaskResourceAssignment, Resource, SavedScenario, ScheduleBaseline
+    )
+    from app.services import columnar
+    from app.services.scheduler import ProjectScheduler
+    from .generator import generate_project, write_project
+
+    client = TestClient(main.app)
+    results: Dict[str, Dict] = {}
+    projects: Dict[str, Dict] = {}
+    log("startup: measuring")
+    for name, timing in measure_startup(data_dir, repeat).items():
+        results[f"startup/{name}"] = timing
+        log(f"startup/{name}: median {timing['median_ms']}ms, p95 {timing['p95_ms']}ms")
+    try:
+        for shape in shapes:
+            for size in sizes:
+                label = f"{shape}/{size}"
+                log(f"{label}: generating")
+                generated = generate_project(size, shape, seed=seed)
+                db = SessionLocal()
+                try:
+                    started = time.perf_counter()
+                    project_id = write_project(db, generated)
+                    projects[label] = dict(
+                        generated.describe(),
+                        write_ms=round((time.perf_counter() - started) * 1000, 1)
+                    )
+                    task_ids = db.execute(
+                        select(Task.id).where(Task.project_id == project_id).order_by(Task.id)
+                    ).scalars().all()
+                    tasks, dependencies, _ = main.load_project_graph(db, project_id)
+                finally:
+                    db.close()
+
+                def case(name: str, timing: Dict):
+                    results[f"{label}/{name}"] = timing
+                    log(f"{label}/{name}: median {timing['median_ms']}ms, p95 {timing['p95_ms']}ms")
+
+                # Scheduler hot paths, on the rows the API loads
+                scheduler = ProjectScheduler(backend)
+                case("build_dependency_graph", measure(
+                    lambda: scheduler.build_dependency_graph(tasks, dependencies), repeat
+                ))
+                case("detect_cycles", measure(scheduler.detect_cycles, repeat))
+                case("calculate_critical_path", measure(scheduler.calculate_critical_path, repeat))
+
+                # API paths, through the ASGI app
+                rng = random.Random(seed)
+                existing = {(dep.predecessor_id, dep.successor_id) for dep in dependencies}
+
+                def full_schedule():
+                    response = client.post(f"/projects/{project_id}/schedule", params={"changes_only": True})
+                    response.raise_for_status()
+
+                case("schedule_full", measure(
+                    full_schedule, repeat, setup=lambda: main.recalc_queue.invalidate(project_id)
+                ))
+
+                def portfolio_schedule():
+                    response = client.post("/portfolio/schedule", json={"project_ids": [project_id]})
+                    response.raise_for_status()
+
+                case("portfolio_schedule", measure(portfolio_schedule, repeat))
+
+                for position in rng.sample(range(len(task_ids)), min(8, len(task_ids))):
+                    client.post(f"/projects/{project_id}/scenarios", json={
+                        "name": f"slip {position}",
+                        "durations": {task_ids[position]: generated.tasks[position]['duration'] + 5}
+                    }).raise_for_status()
+
+                def scenario_compare():
+                    response = client.post(f"/projects/{project_id}/scenarios/compare")
+                    response.raise_for_status()
+
+                case("scenario_compare", measure(scenario_compare, repeat))
+
+                baseline = client.post(f"/projects/{project_id}/baselines", json={"name": "benchmark"})
+                baseline.raise_for_status()
+
+                def baseline_variance():
+                    response = client.get(
+                        f"/projects/{project_id}/baselines/{baseline.json()['id']}/variance",
+                        params={"changed_only": False}
+                    )
+                    response.raise_for_status()
+
+                case("baseline_variance", measure(baseline_variance, repeat))
+
+                def task_impact():
+                    # Downstream of the first task: the whole project on most shapes
+                    response = client.get(f"/tasks/{task_ids[0]}/impact")
+                    response.raise_for_status()
+
+                case("task_impact", measure(task_impact, repeat))
+
+                def schedule_update():
+                    position = rng.randrange(len(task_ids))
+                    task = generated.tasks[position]
+                    parent = generated.parents[position]
+                    body = {
+                        'title': task['title'],
+                        'project_id': project_id,
+                        'parent_id': task_ids[parent] if parent is not None else None,
+                        'duration': task['duration'] + rng.randint(1, 3),
+                        'work_hours': task['work_hours'],
+                        'priority': task['priority'].value,
+                        'status': task['status'].value,
+                        'progress': task['progress'],
+                        'is_milestone': task['is_milestone'],
+                        'earliest_start_date': task['earliest_start_date'].isoformat()
+                    }
+                    client.put(f"/tasks/{task_ids[position]}", json=body).raise_for_status()
+                    full_schedule()
+
+                update = measure(schedule_update, repeat)
+                update['target_ms'] = SCHEDULE_UPDATE_TARGET_MS
+                update['meets_target'] = update['p95_ms'] <= SCHEDULE_UPDATE_TARGET_MS
+                case("schedule_update", update)
+
+                def new_dependency():
+                    while True:
+                        successor = rng.randrange(1, len(task_ids))
+                        predecessor = rng.randrange(0, successor)
+                        pair = (task_ids[predecessor], task_ids[successor])
+                        if pair not in existing:
+                            existing.add(pair)
+                            return pair
+
+                created = []
+
+                def create_dependency():
+                    predecessor, successor = new_dependency()
+                    client.post(
+                        f"/tasks/{successor}/dependencies/",
+                        json={'predecessor_id': predecessor, 'dependency_type': 'FS', 'lag_time': 0}
+                    ).raise_for_status()
+                    created.append((predecessor, successor))
+
+                case("create_dependency", measure(create_dependency, repeat))
+                for predecessor, successor in created:
+                    client.delete(f"/tasks/{successor}/dependencies/{predecessor}").raise_for_status()
+
+                case("get_gantt_data", measure(
+                    lambda: client.get(f"/projects/{project_id}/gantt").raise_for_status(), repeat
+                ))
+                for name, accept in (
+                    ("get_gantt_data_uncached", "application/json"),
+                    ("get_gantt_columnar_uncached", columnar.MEDIA_TYPE)
+                ):
+                    case(name, measure(
+                        lambda accept=accept: client.get(
+                            f"/projects/{project_id}/gantt", headers={"Accept": accept}
+                        ).raise_for_status(),
+                        repeat,
+                        setup=main.response_cache.clear
+                    ))
+                case("list_projects", measure(
+                    lambda: client.get("/projects/").raise_for_status(), repeat
+                ))
+                case("list_projects_uncached", measure(
+                    lambda: client.get("/projects/").raise_for_status(),
+                    repeat,
+                    setup=main.response_cache.clear
+                ))
+
+                db = SessionLocal()
+                try:
+                    project_tasks = select(Task.id).where(Task.project_id == project_id)
+                    resource_ids = db.execute(
+                        select(TaskResourceAssignment.resource_id)
+                        .where(TaskResourceAssignment.task_id.in_(project_tasks))
+                    ).scalars().all()
+                    db.query(TaskDependency).filter(
+                        TaskDependency.successor_id.in_(project_tasks)
+                    ).delete(synchronize_session=False)
+                    db.query(TaskResourceAssignment).filter(
+                        TaskResourceAssignment.task_id.in_(project_tasks)
+                    ).delete(synchronize_session=False)
+                    db.query(Resource).filter(Resource.id.in_(set(resource_ids))).delete(synchronize_session=False)
+                    db.query(Task).filter(Task.project_id == project_id).delete(synchronize_session=False)
+                    db.query(SavedScenario).filter(SavedScenario.project_id == project_id).delete(synchronize_session=False)
+                    db.query(ScheduleBaseline).filter(
+                        ScheduleBaseline.project_id == project_id
+                    ).delete(synchronize_session=False)
+                    db.query(Project).filter(Project.id == project_id).delete(synchronize_session=False)
+                    db.commit()
+                finally:
+                    db.close()
+                main.dependency_indexes.invalidate(project_id)
+                main.recalc_queue.invalidate(project_id)
+                main.scenario_store.remove_project(project_id)
+                main.allocation_index.invalidate()
+    finally:
+        client.close()
+        main.jobs.shutdown()
+
+    return {
+        'version': REPORT_VERSION,
+        'created_at': datetime.utcnow().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'revision': _git_revision()
+        },
+        'settings': {
+            'sizes': sizes,
+            'shapes': shapes,
+            'repeat': repeat,
+            'seed': seed,
+            'backend': backend
+        },
+        'projects': projects,
+        'results': results
+    }
+
+def save_report(report: Dict, path: Path):
+    path.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+def load_report(path: Path) -> Dict:
+    report = json.loads(path.read_text())
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(f"{path} is not a version {REPORT_VERSION} benchmark report")
+    return report
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Pairs up the cases both reports ran and flags medians that grew past ``threshold``"""
+    rows = []
+    for key, timing in sorted(current['results'].items()):
+        before = baseline['results'].get(key)
+        if before is None:
+            continue
+        ratio = timing['median_ms'] / before['median_ms'] if before['median_ms'] else None
+        rows.append({
+            'case': key,
+            'baseline_ms': before['median_ms'],
+            'current_ms': timing['median_ms'],
+            'ratio': round(ratio, 3) if ratio is not None else None,
+            'regressed': (
+                ratio is not None
+                and ratio > 1 + threshold
+                and timing['median_ms'] >= NOISE_FLOOR_MS
+            )
+        })
+    return rows
+
+def format_results(report: Dict) -> str:
+    lines = [f"{'case':<48} {'median ms':>10} {'p95 ms':>10}"]
+    for key, timing in sorted(report['results'].items()):
+        flag = ""
+        if 'meets_target' in timing:
+            flag = "  ok" if timing['meets_target'] else f"  over {timing['target_ms']}ms target"
+        lines.append(f"{key:<48} {timing['median_ms']:>10.2f} {timing['p95_ms']:>10.2f}{flag}")
+    return "\n".join(lines)
+
+def format_comparison(rows: List[Dict]) -> str:
+    lines = [f"{'case':<48} {'baseline':>10} {'current':>10} {'ratio':>7}"]
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else "-"
+        flag = "  REGRESSION" if row['regressed'] else ""
+        lines.append(
+            f"{row['case']:<48} {row['baseline_ms']:>10.2f} {row['current_ms']:>10.2f} {ratio:>7}{flag}"
+        )
+    return "\n".join(lines)
@@ -12,10 +12,13 @@ async function createWindow() {
     const port = await portfinder.getPortPromise();
 
     // Start Python backend
-    const pythonExecutable = path.join(app.getAppPath(), 'backend', 'venv', 'Scripts', 'python.exe');
-    const pythonScript = path.join(app.getAppPath(), 'backend', 'app', 'main.py');
+    const backendDir = path.join(app.getAppPath(), 'backend');
+    const pythonExecutable = path.join(backendDir, 'venv', 'Scripts', 'python.exe');
     
-    pythonProcess = spawn(pythonExecutable, [pythonScript, '--port', port.toString()], {
+    // Run as a module so the package's relative imports resolve; the
+    // backend prints its startup-time breakdown once it is serving
+    pythonProcess = spawn(pythonExecutable, ['-m', 'app.main', '--host', '127.0.0.1', '--port', port.toString()], {
+        cwd: backendDir,
         stdio: 'pipe'
     });
 
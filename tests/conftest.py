@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+import pytest
+
+# app.database opens its file on import, so the scratch directory must be
+# in place before any test module imports the app
+os.environ["PROJECT_MANAGER_DATA_DIR"] = tempfile.mkdtemp(prefix="project_manager_tests_")
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def make_project(client):
+    def make(name: str = "Project", **fields) -> int:
+        response = client.post("/projects/", json={"name": name, **fields})
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+    return make
+
+@pytest.fixture
+def make_task(client):
+    def make(project_id: int, title: str, duration: float, **fields) -> int:
+        response = client.post("/tasks/", json={
+            "title": title, "project_id": project_id, "duration": duration, **fields
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+    return make
+
+@pytest.fixture
+def link(client):
+    def add(successor_id: int, predecessor_id: int, **fields):
+        return client.post(
+            f"/tasks/{successor_id}/dependencies/",
+            json={"predecessor_id": predecessor_id, **fields}
+        )
+    return add
+
+@pytest.fixture
+def linked(make_project, make_task, link):
+    """An upstream project (a0 -> a1) and a project (b0 -> b1) where b0 waits for a1"""
+    upstream = make_project("Upstream", start_date="2026-01-05T00:00:00")
+    project = make_project("Downstream", start_date="2026-01-05T00:00:00")
+    a0, a1 = make_task(upstream, "a0", 2), make_task(upstream, "a1", 3)
+    b0, b1 = make_task(project, "b0", 1), make_task(project, "b1", 2)
+    for successor, predecessor in [(a1, a0), (b0, a1), (b1, b0)]:
+        assert link(successor, predecessor).status_code == 200
+    return {"upstream": upstream, "project": project, "a0": a0, "a1": a1, "b0": b0, "b1": b1}
+
+@pytest.fixture
+def earliest_starts(client):
+    """Schedules a project and returns each task's earliest start"""
+    def schedule(project_id: int):
+        response = client.post(f"/projects/{project_id}/schedule")
+        assert response.status_code == 200, response.text
+        return {
+            int(task_id): entry["earliest_start"]
+            for task_id, entry in response.json()["task_schedules"].items()
+        }
+    return schedule
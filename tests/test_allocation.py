@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.allocation import AllocationIndex
+
+def row(task_id, resource_id, hours, start, end):
+    return SimpleNamespace(
+        task_id=task_id, project_id=1, resource_id=resource_id, assigned_hours=hours,
+        start=start, end=end, duration=None
+    )
+
+@pytest.fixture
+def index():
+    index = AllocationIndex()
+    index.load([(7, 8.0)], [
+        row(1, 7, 12, datetime(2026, 1, 5), datetime(2026, 1, 7)),  # 6h a day
+        row(2, 7, 8, datetime(2026, 1, 6), datetime(2026, 1, 8)),  # 4h a day
+    ])
+    return index
+
+def segments(allocation):
+    return [(segment["start"].day, segment["end"].day, segment["hours_per_day"]) for segment in allocation["segments"]]
+
+def test_overlapping_bookings_add_up(index):
+    assert segments(index.allocation(7)) == [(5, 6, 6.0), (6, 7, 10.0), (7, 8, 4.0)]
+    periods = index.allocation(7)["overallocations"]
+    assert [(period["start"].day, period["end"].day, period["task_ids"]) for period in periods] == [(6, 7, [1, 2])]
+    assert [report["resource_id"] for report in index.overallocations()] == [7]
+
+def test_update_task_replaces_its_booking(index):
+    index.update_task(2, [row(2, 7, 2, datetime(2026, 1, 6), datetime(2026, 1, 8))])
+    assert segments(index.allocation(7)) == [(5, 6, 6.0), (6, 7, 7.0), (7, 8, 1.0)]
+    assert index.overallocations() == []
+    index.remove_task(1)
+    assert segments(index.allocation(7)) == [(6, 8, 1.0)]
+
+def test_windows_accept_aware_datetimes(index):
+    window = (
+        datetime(2026, 1, 6, 4, tzinfo=timezone(timedelta(hours=2))),
+        datetime(2026, 1, 7, tzinfo=timezone.utc)
+    )
+    assert [(s["start"], s["hours_per_day"]) for s in index.allocation(7, *window)["segments"]] == [
+        (datetime(2026, 1, 6, 2), 10.0)
+    ]
+    assert index.allocation(99) is None
+
+@pytest.mark.parametrize("window", [
+    {"from": "2026-01-05T00:00:00Z"},
+    {"from": "2026-01-05T01:00:00+02:00", "to": "2026-01-06T00:00:00Z"},
+])
+def test_allocation_endpoint_accepts_aware_from(client, make_project, make_task, window):
+    # Worked Monday to Thursday, so the task runs Thursday 01-01 and Monday 01-05
+    project = make_project("Allocation", start_date="2026-01-01T00:00:00")
+    client.put(f"/projects/{project}/calendar", json={"working_weekdays": [0, 1, 2, 3]})
+    resource = client.post(
+        "/resources/", json={"name": "r", "email": f"allocation-{project}@example.com"}
+    ).json()["id"]
+    make_task(
+        project, "work", 2, work_hours=16,
+        resource_assignments=[{"resource_id": resource, "assigned_hours": 16}]
+    )
+    client.post(f"/projects/{project}/schedule")
+    response = client.get(f"/resources/{resource}/allocation", params=window)
+    assert response.status_code == 200, response.text
+    assert response.json()["segments"] == [
+        {"start": "2026-01-05T00:00:00", "end": "2026-01-06T00:00:00", "hours_per_day": 8.0}
+    ]
+    assert client.get("/resources/overallocations", params=window).status_code == 200
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from app.services.baselines import decode_baseline, encode_baseline, schedule_columns, schedule_variance
+
+def test_columns_follow_task_ids():
+    columns = schedule_columns(
+        {3: 2.0, 1: 0.0}, {3: 1.0, 1: 2.0}, [(3, 8.0, 100.0), (1, None, None), (9, 1.0, 1.0)]
+    )
+    assert columns["task_id"].tolist() == [1, 3]
+    assert columns["earliest_finish"].tolist() == [2.0, 3.0]
+    assert columns["work_hours"].tolist() == [0.0, 8.0]
+    assert columns["cost"].tolist() == [0.0, 100.0]
+    assert schedule_columns({}, {}, [(1, 1.0, 1.0)])["task_id"].tolist() == []
+
+def test_encoded_baseline_round_trips():
+    columns = schedule_columns({n: float(n) for n in range(1, 500)}, {n: 2.0 for n in range(1, 500)}, [])
+    data = encode_baseline(columns)
+    decoded = decode_baseline(data)
+    assert set(decoded) == set(columns)
+    for name, values in columns.items():
+        np.testing.assert_array_equal(decoded[name], values)
+    assert decoded["task_id"].dtype == np.int64
+    assert len(data) < sum(values.nbytes for values in columns.values())
+
+def test_variance_matches_tasks_by_id():
+    baseline = schedule_columns({1: 0.0, 2: 2.0, 3: 2.0}, {1: 2.0, 2: 1.0, 3: 1.0}, [(1, 8.0, 10.0)])
+    current = schedule_columns({1: 0.0, 2: 3.0, 4: 0.0}, {1: 2.0, 2: 1.0, 4: 5.0}, [(1, 16.0, 10.0)])
+    variance = schedule_variance(baseline, current)
+    assert variance["project_duration"] == {"baseline": 3.0, "current": 5.0, "variance": 2.0}
+    assert variance["totals"]["work_hours"] == {"baseline": 8.0, "current": 16.0, "variance": 8.0}
+    assert (variance["added_tasks"], variance["removed_tasks"]) == ([4], [3])
+    assert (variance["changed_tasks"], variance["slipped_tasks"], variance["max_finish_slip"]) == (2, 1, 1.0)
+    assert [(task["task_id"], task["finish_variance"], task["work_variance"]) for task in variance["tasks"]] == [
+        (1, 0.0, 8.0), (2, 1.0, 0.0)
+    ]
+    assert len(schedule_variance(baseline, current, changed_only=False)["tasks"]) == 2
+    assert schedule_variance(baseline, baseline)["tasks"] == []
+
+@pytest.fixture
+def project(client, make_project, make_task, link):
+    project = make_project(start_date="2026-01-05T00:00:00")
+    resource = client.post("/resources/", json={
+        "name": "r", "email": f"baseline-{project}@example.com", "cost_per_hour": 10
+    }).json()["id"]
+    a = make_task(
+        project, "a", 2, work_hours=8, resource_assignments=[{"resource_id": resource, "assigned_hours": 8}]
+    )
+    b = make_task(project, "b", 3)
+    link(b, a)
+    return project, a, b
+
+def test_baseline_endpoints(client, project, make_task):
+    project, a, b = project
+    response = client.post(f"/projects/{project}/baselines", json={"name": "plan"})
+    assert response.status_code == 200, response.text
+    baseline = response.json()
+    assert (baseline["task_count"], baseline["project_duration"]) == (2, 5.0)
+    assert baseline["size_bytes"] > 0
+    assert [row["id"] for row in client.get(f"/projects/{project}/baselines").json()] == [baseline["id"]]
+
+    client.put(f"/tasks/{a}", json={"title": "a", "project_id": project, "duration": 4, "work_hours": 8})
+    added = make_task(project, "c", 1)
+    variance = client.get(f"/projects/{project}/baselines/{baseline['id']}/variance").json()
+    assert variance["project_duration"] == {"baseline": 5.0, "current": 7.0, "variance": 2.0}
+    assert variance["totals"]["cost"] == {"baseline": 80.0, "current": 80.0, "variance": 0.0}
+    assert variance["added_tasks"] == [added]
+    assert {task["task_id"]: task["finish_variance"] for task in variance["tasks"]} == {a: 2.0, b: 2.0}
+
+    assert client.delete(f"/projects/{project}/baselines/{baseline['id']}").status_code == 200
+    assert client.get(f"/projects/{project}/baselines/{baseline['id']}/variance").status_code == 404
+    assert client.delete(f"/projects/{project}/baselines/{baseline['id']}").status_code == 404
+
+def test_baseline_variance_with_a_cross_project_predecessor(client, linked):
+    project = linked["project"]
+    baseline = client.post(f"/projects/{project}/baselines", json={"name": "plan"})
+    assert baseline.status_code == 200, baseline.text
+    assert baseline.json()["project_duration"] == 8.0
+
+    client.put(f"/tasks/{linked['a0']}", json={"title": "a0", "project_id": linked["upstream"], "duration": 4})
+    variance = client.get(f"/projects/{project}/baselines/{baseline.json()['id']}/variance")
+    assert variance.status_code == 200, variance.text
+    assert variance.json()["project_duration"] == {"baseline": 8.0, "current": 10.0, "variance": 2.0}
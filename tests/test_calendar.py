@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.services.calendar import WorkingCalendar, weekday_mask
+
+# Monday 2026-01-05, 09:00
+START = datetime(2026, 1, 5, 9)
+
+def naive_date(calendar: WorkingCalendar, offset: int) -> date:
+    """The offset-th working day, found by stepping day by day"""
+    def works(day):
+        ordinal = day.toordinal()
+        if ordinal in calendar.holidays:
+            return False
+        return ordinal in calendar.working_dates or bool(calendar.working_weekdays & (1 << day.weekday()))
+    day = START.date()
+    while not works(day):
+        day += timedelta(days=1)
+    step = 1 if offset >= 0 else -1
+    for _ in range(abs(offset)):
+        day += timedelta(days=step)
+        while not works(day):
+            day += timedelta(days=step)
+    return day
+
+def test_offsets_skip_weekends():
+    calendar = WorkingCalendar(START)
+    assert calendar.to_datetimes([0, 1, 4, 5, 5.5, -1]) == [
+        datetime(2026, 1, 5, 9), datetime(2026, 1, 6, 9), datetime(2026, 1, 9, 9),
+        datetime(2026, 1, 12, 9), datetime(2026, 1, 12, 21), datetime(2026, 1, 2, 9)
+    ]
+    assert calendar.to_datetimes([]) == []
+
+def test_holidays_and_working_dates():
+    calendar = WorkingCalendar(START, holidays=[date(2026, 1, 6)], working_dates=[date(2026, 1, 10)])
+    days = [value.date() for value in calendar.to_datetimes(range(6))]
+    assert days == [date(2026, 1, d) for d in (5, 7, 8, 9, 10, 12)]
+    assert calendar.without([date(2026, 1, 10)]).to_datetimes([4])[0].date() == date(2026, 1, 12)
+
+@pytest.mark.parametrize("weekdays", [[0, 1, 2, 3, 4], [0, 1, 2, 3], [5, 6], [2]])
+def test_far_offsets_match_a_day_by_day_walk(weekdays):
+    calendar = WorkingCalendar(START, weekday_mask(weekdays), holidays=[date(2027, 3, 3)])
+    offsets = [-700, -1, 0, 3, 365, 2000]
+    assert [value.date() for value in calendar.to_datetimes(offsets)] == [
+        naive_date(calendar, offset) for offset in offsets
+    ]
+
+def test_to_offsets_inverts_to_datetimes():
+    calendar = WorkingCalendar(START, weekday_mask([0, 1, 2, 3]), holidays=[date(2026, 1, 13)])
+    offsets = [-3.0, 0.0, 0.25, 4.5, 10.0, 1500.75]
+    assert calendar.to_offsets(calendar.to_datetimes(offsets)) == pytest.approx(offsets)
+    # A Friday counts as the following Monday
+    assert calendar.to_offsets([datetime(2026, 1, 9, 15)]) == [4.0]
+
+def test_start_on_a_day_off_moves_to_the_next_working_day():
+    calendar = WorkingCalendar(datetime(2026, 1, 3))
+    assert calendar.to_datetimes([0]) == [datetime(2026, 1, 5)]
+
+def test_working_spans_split_at_days_off():
+    calendar = WorkingCalendar(START, holidays=[date(2026, 1, 14)])
+    assert calendar.working_spans(datetime(2026, 1, 8, 12), datetime(2026, 1, 16)) == [
+        (datetime(2026, 1, 8, 12), datetime(2026, 1, 10)),
+        (datetime(2026, 1, 12), datetime(2026, 1, 14)),
+        (datetime(2026, 1, 15), datetime(2026, 1, 16)),
+    ]
+    assert calendar.working_spans(datetime(2026, 1, 6), datetime(2026, 1, 8)) == [
+        (datetime(2026, 1, 6), datetime(2026, 1, 8))
+    ]
+    assert calendar.working_spans(datetime(2026, 1, 10), datetime(2026, 1, 12)) == []
+
+def test_a_calendar_needs_a_working_day():
+    with pytest.raises(ValueError):
+        WorkingCalendar(START, 0)
+
+def test_calendar_update_moves_task_dates(client, make_project, make_task, link):
+    project = make_project(start_date="2026-01-05T00:00:00")
+    a, b = make_task(project, "a", 2), make_task(project, "b", 1)
+    link(b, a)
+    client.post(f"/projects/{project}/schedule")
+    calendar = {"working_weekdays": [0, 1, 2, 3], "holidays": ["2026-01-06"], "working_dates": []}
+    response = client.put(f"/projects/{project}/calendar", json=calendar)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/projects/{project}/calendar").json() == calendar
+    tasks = {task["id"]: task for task in client.get(f"/projects/{project}").json()["tasks"]}
+    # a works Monday and, after the holiday, Wednesday; b follows on Thursday
+    assert tasks[b]["earliest_start_date"] == "2026-01-08T00:00:00"
+
+    clash = dict(calendar, working_dates=["2026-01-06"])
+    assert client.put(f"/projects/{project}/calendar", json=clash).status_code == 400
+    assert client.put(f"/projects/{project}/calendar", json={"working_weekdays": [7]}).status_code == 400
+
+def test_calendar_update_with_a_cross_project_predecessor(client, linked, earliest_starts):
+    project = linked["project"]
+    response = client.put(f"/projects/{project}/calendar", json={"working_weekdays": [0, 1, 2, 3]})
+    assert response.status_code == 200, response.text
+    assert earliest_starts(project)[linked["b0"]] == 5.0
+    # Worked Monday to Thursday, offset 5 from Monday 2026-01-05 is the next Tuesday
+    tasks = {task["id"]: task for task in client.get(f"/projects/{project}").json()["tasks"]}
+    assert tasks[linked["b0"]]["earliest_start_date"] == "2026-01-13T00:00:00"
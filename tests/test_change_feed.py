@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.change_feed import ChangeFeed, format_event
+
+def test_events_are_numbered_per_project_and_resumable():
+    feed = ChangeFeed(history=3)
+    for number in range(5):
+        feed.publish(1, "task", {"n": number})
+    feed.publish(2, "task", {})
+    assert (feed.last_sequence(1), feed.last_sequence(2), feed.last_sequence(3)) == (5, 1, 0)
+    assert [(event.sequence, event.data) for event in feed.since(1, 3)] == [(4, '{"n":3}'), (5, '{"n":4}')]
+    assert feed.since(1, 5) == []
+    # Events 1 and 2 were dropped from the history of three
+    assert feed.since(1, 2) is not None
+    assert feed.since(1, 1) is None
+
+def test_event_ids_carry_the_epoch():
+    feed, other = ChangeFeed(), ChangeFeed()
+    assert feed.parse_event_id(feed.event_id(7)) == (True, 7)
+    assert feed.parse_event_id(other.event_id(7)) == (True, None)
+    assert feed.parse_event_id("garbage") == (True, None)
+    assert feed.parse_event_id(None) == (False, None)
+    assert format_event("e-1", "task", "{}") == "id: e-1\nevent: task\ndata: {}\n\n"
+
+def frames(client, project_id: int, count: int, last_event_id=None, before=None):
+    """Reads the first ``count`` frames of the project's change stream"""
+    from app.main import stream_project_changes
+
+    async def read():
+        headers = {"last-event-id": last_event_id} if last_event_id else {}
+        response = await stream_project_changes(project_id, SimpleNamespace(headers=headers))
+        stream = response.body_iterator
+        try:
+            first = asyncio.ensure_future(stream.__anext__())
+            if before is not None:
+                # Let the stream settle on its position, so the write is pushed rather than replayed
+                await asyncio.sleep(0.2)
+                await asyncio.get_running_loop().run_in_executor(None, before)
+            received = [await asyncio.wait_for(first, 5)]
+            return received + [await asyncio.wait_for(stream.__anext__(), 5) for _ in range(count - 1)]
+        finally:
+            await stream.aclose()
+
+    return [dict(
+        line.split(": ", 1) for line in frame.strip().splitlines()
+    ) for frame in client.portal.call(read)]
+
+@pytest.fixture
+def project(client, make_project, make_task):
+    project = make_project(start_date="2026-01-05T00:00:00")
+    task = make_task(project, "a", 2)
+    return project, task
+
+def rename(client, project, task, title):
+    client.put(f"/tasks/{task}", json={"title": title, "project_id": project, "duration": 2})
+
+def test_stream_pushes_task_changes(client, project):
+    project, task = project
+    [frame] = frames(client, project, 1, before=lambda: rename(client, project, task, "renamed"))
+    assert frame["event"] == "task"
+    assert '"renamed"' in frame["data"]
+
+def test_stream_resumes_after_the_last_event_id(client, project):
+    from app.main import change_feed
+    project, task = project
+    seen = change_feed.event_id(change_feed.last_sequence(project))
+    rename(client, project, task, "missed")
+    [frame] = frames(client, project, 1, last_event_id=seen)
+    assert frame["event"] == "task"
+    assert '"missed"' in frame["data"]
+
+def test_unknown_event_id_gets_a_reset(client, project):
+    project, _ = project
+    [frame] = frames(client, project, 1, last_event_id="stale-3")
+    assert frame["event"] == "reset"
+    assert frame["data"] == '{"reason":"unknown event id"}'
+
+def test_dropped_events_get_a_reset(client, project, monkeypatch):
+    from app.main import change_feed
+    project, task = project
+    seen = change_feed.event_id(change_feed.last_sequence(project))
+    for title in ("x", "y"):
+        rename(client, project, task, title)
+    # Only the newest event is left
+    monkeypatch.setattr(change_feed, "_events", {
+        pid: type(events)(list(events)[-1:], events.maxlen) for pid, events in change_feed._events.items()
+    })
+    frame = frames(client, project, 1, last_event_id=seen)[0]
+    assert frame["event"] == "reset"
+    assert frame["data"] == '{"reason":"events missed"}'
+
+def test_unknown_project_is_not_found(client):
+    assert client.get("/projects/999999/changes").status_code == 404
@@ -0,0 +1,97 @@
+import json
+import struct
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services import columnar
+
+def test_encode_decode_round_trip():
+    columns = {
+        "id": ("int32", [3, -1, 7]),
+        "value": ("float64", [1.5, float("nan"), -2.0]),
+        "flag": ("uint8", [1, 0, 1]),
+    }
+    columns.update(columnar.string_columns("title", ["a", "", "große Aufgabe"]))
+    payload = columnar.encode({"rows": 3}, columns)
+    meta, decoded = columnar.decode(payload)
+
+    assert meta == {"rows": 3}
+    assert decoded["id"].tolist() == [3, -1, 7]
+    np.testing.assert_array_equal(decoded["value"], [1.5, np.nan, -2.0])
+    assert decoded["flag"].tolist() == [1, 0, 1]
+    assert columnar.decode_strings(decoded, "title") == ["a", "", "große Aufgabe"]
+    # Every buffer starts on an 8-byte boundary of the payload
+    (length,) = struct.unpack_from("<I", payload, 4)
+    start = len(payload) - sum(array.nbytes + -array.nbytes % 8 for array in decoded.values())
+    assert start == 8 + length + -(8 + length) % 8
+    assert all(column["offset"] % 8 == 0 for column in json.loads(payload[8:8 + length])["columns"])
+
+def test_other_payloads_are_rejected():
+    with pytest.raises(ValueError):
+        columnar.decode(b'{"json": true}')
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, False),
+    ("application/json", False),
+    (columnar.MEDIA_TYPE, True),
+    (f"application/json;q=0.5, {columnar.MEDIA_TYPE}", True),
+    (f"{columnar.MEDIA_TYPE};q=0.5, */*", False),
+    (f"{columnar.MEDIA_TYPE};q=0", False),
+])
+def test_accept_header_negotiation(accept, expected):
+    assert columnar.accepts_columnar(accept) is expected
+
+def test_gantt_columns_match_the_rows():
+    rows = [
+        {"id": 10, "title": "a", "start_date": datetime(2026, 1, 5), "end_date": datetime(2026, 1, 7),
+         "duration": 2, "progress": 50, "work_hours": 16, "parent": None,
+         "assigned_resources": ["Ada", "Bo"], "dependencies": []},
+        {"id": 11, "title": "b", "start_date": datetime(2026, 1, 7), "end_date": None,
+         "duration": 3, "progress": None, "work_hours": None, "parent": 10,
+         "assigned_resources": ["Bo"], "dependencies": [10]},
+        {"id": 12, "title": "c", "start_date": None, "end_date": None,
+         "duration": None, "progress": 0, "work_hours": 0, "parent": 99,
+         "assigned_resources": [], "dependencies": [10, 11]},
+    ]
+    meta, columns = columnar.decode(columnar.encode_gantt(4, rows))
+    assert meta == {"format": "gantt", "project_id": 4, "rows": 3, "epoch": "2026-01-05T00:00:00"}
+    assert columns["id"].tolist() == [10, 11, 12]
+    np.testing.assert_array_equal(columns["start"], [0, 2, np.nan])
+    # b has no end, so it finishes its duration after its start
+    np.testing.assert_array_equal(columns["finish"], [2, 5, np.nan])
+    np.testing.assert_array_equal(columns["progress"], [50, np.nan, 0])
+    assert columns["parent"].tolist() == [-1, 0, -1]
+    offsets, ids = columns["dependency_offsets"].tolist(), columns["dependency_ids"].tolist()
+    assert [ids[offsets[i]:offsets[i + 1]] for i in range(3)] == [[], [10], [10, 11]]
+    names = columnar.decode_strings(columns, "resource_names")
+    offsets, codes = columns["resource_offsets"].tolist(), columns["resource_codes"].tolist()
+    assert [[names[code] for code in codes[offsets[i]:offsets[i + 1]]] for i in range(3)] == [
+        ["Ada", "Bo"], ["Bo"], []
+    ]
+    assert columnar.decode_strings(columns, "title") == ["a", "b", "c"]
+
+def test_endpoints_serve_the_same_values_as_json(client, make_project, make_task, link):
+    project = make_project(start_date="2026-01-05T00:00:00")
+    a, b = make_task(project, "a", 2), make_task(project, "b", 3)
+    link(b, a)
+    accept = {"Accept": columnar.MEDIA_TYPE}
+
+    response = client.post(f"/projects/{project}/schedule", headers=accept)
+    assert response.headers["content-type"] == columnar.MEDIA_TYPE
+    meta, columns = columnar.decode(response.content)
+    expected = client.post(f"/projects/{project}/schedule").json()
+    assert meta["project_duration"] == expected["project_duration"] == 5.0
+    assert columns["critical_path"].tolist() == expected["critical_path"]
+    assert {
+        task_id: columns["earliest_start"][position]
+        for position, task_id in enumerate(columns["id"].tolist())
+    } == {int(task_id): entry["earliest_start"] for task_id, entry in expected["task_schedules"].items()}
+
+    response = client.get(f"/projects/{project}/gantt", headers=accept)
+    assert response.headers["vary"] == "Accept"
+    meta, columns = columnar.decode(response.content)
+    rows = client.get(f"/projects/{project}/gantt").json()
+    assert columns["id"].tolist() == [row["id"] for row in rows]
+    assert columnar.decode_strings(columns, "title") == [row["title"] for row in rows]
@@ -0,0 +1,47 @@
+import json
+
+def feed_events(project_id: int, after: int):
+    from app.main import change_feed
+    return [(event.type, json.loads(event.data)) for event in change_feed.since(project_id, after)]
+
+def test_cycle_within_a_project_is_rejected(make_project, make_task, link):
+    project = make_project()
+    a, b, c = (make_task(project, title, 1) for title in "abc")
+    assert link(b, a).status_code == 200
+    assert link(c, b).status_code == 200
+    assert link(a, c).status_code == 400
+    assert link(a, a).status_code == 400
+
+def test_dependency_closing_a_cycle_through_another_project_is_rejected(linked, link, earliest_starts):
+    assert link(linked["a0"], linked["b1"]).status_code == 400
+    assert earliest_starts(linked["project"])[linked["b0"]] == 5.0
+
+def test_deleted_dependency_no_longer_blocks(client, make_project, make_task, link):
+    project = make_project()
+    a, b = make_task(project, "a", 1), make_task(project, "b", 1)
+    assert link(b, a).status_code == 200
+    assert client.delete(f"/tasks/{b}/dependencies/{a}").status_code == 200
+    assert client.delete(f"/tasks/{b}/dependencies/{a}").status_code == 404
+    assert link(a, b).status_code == 200
+
+def test_cross_project_dependency_changes_reset_the_successors_feed(client, make_project, make_task, link):
+    from app.main import change_feed
+    # The predecessor's project has the greater id, so it is not the last
+    # project a loop over both would leave behind
+    project = make_project("Successor")
+    upstream = make_project("Predecessor")
+    assert upstream > project
+    successor, predecessor = make_task(project, "s", 1), make_task(upstream, "p", 1)
+    client.post(f"/projects/{project}/schedule")
+
+    for action, request in [
+        ("added", lambda: link(successor, predecessor)),
+        ("removed", lambda: client.delete(f"/tasks/{successor}/dependencies/{predecessor}")),
+    ]:
+        marks = {pid: change_feed.last_sequence(pid) for pid in (project, upstream)}
+        assert request().status_code == 200
+        events, upstream_events = feed_events(project, marks[project]), feed_events(upstream, marks[upstream])
+        assert ("dependency", action) in [(kind, data.get("action")) for kind, data in events]
+        assert ("dependency", action) in [(kind, data.get("action")) for kind, data in upstream_events]
+        assert "reset" in [kind for kind, _ in events]
+        assert "reset" not in [kind for kind, _ in upstream_events]
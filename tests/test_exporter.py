@@ -0,0 +1,60 @@
+import csv
+import io
+import zipfile
+
+from app.services.exporter import EXPORT_COLUMNS
+
+def read_csv(client, project_id: int):
+    response = client.get(f"/projects/{project_id}/export")
+    assert response.status_code == 200, response.text
+    assert response.content.startswith("\ufeff".encode("utf-8"))
+    reader = csv.reader(io.StringIO(response.content.decode("utf-8-sig")))
+    header = next(reader)
+    assert header == EXPORT_COLUMNS
+    return [dict(zip(header, values)) for values in reader]
+
+def test_rows_carry_links_resources_and_cpm_values(client, make_project):
+    project = make_project("Export", start_date="2026-01-05T00:00:00")
+    client.post("/resources/", json={"name": f"Ada{project}", "email": f"export-{project}@example.com"})
+    # Imported rows read back in the importer's own notation
+    report = client.post(f"/projects/{project}/import", files={"file": ("tasks.csv", (
+        "unique_id,title,duration,predecessors,parent,resources\n"
+        f"Ax{project},a,3,,,Ada{project}:12.5\n"
+        f"Bx{project},b,1,Ax{project}SS+1,Ax{project},\n"
+        f"Cx{project},c,2,Ax{project},,\n"
+    ).encode())}).json()
+    assert (report["imported_tasks"], report["error_count"]) == (3, 0), report
+    client.post(f"/projects/{project}/schedule")
+
+    rows = {row["title"]: row for row in read_csv(client, project)}
+    assert list(rows) == ["a", "b", "c"]
+    assert rows["a"]["resources"] == f"Ada{project}:12.5"
+    assert rows["b"]["parent"] == f"Ax{project}"
+    assert rows["b"]["predecessors"] == f"Ax{project}SS+1"
+    assert rows["c"]["predecessors"] == f"Ax{project}"
+    # a -> c is the critical chain; b has three days of float
+    assert [rows["c"][field] for field in ("earliest_start", "earliest_finish")] == ["3.0", "5.0"]
+    assert [rows[title]["critical"] for title in "abc"] == ["True", "False", "True"]
+    assert rows["b"]["total_float"] == "3.0"
+
+def test_unscheduled_rows_leave_cpm_columns_empty(client, make_project, make_task):
+    project = make_project()
+    make_task(project, "a", 2)
+    [row] = read_csv(client, project)
+    assert row["duration"] == "2.0"
+    assert row["predecessors"] == row["resources"] == ""
+
+def test_xlsx_holds_a_row_per_task(client, make_project, make_task):
+    project = make_project()
+    for title in ("a", "b & c"):
+        make_task(project, title, 1)
+    response = client.get(f"/projects/{project}/export", params={"format": "xlsx"})
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as workbook:
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row") == 3
+    assert "b &amp; c" in sheet
+
+def test_export_rejects_unknown_formats_and_projects(client):
+    assert client.get("/projects/1/export", params={"format": "pdf"}).status_code == 422
+    assert client.get("/projects/999999/export").status_code == 404
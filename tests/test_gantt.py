@@ -0,0 +1,50 @@
+import pytest
+
+@pytest.fixture
+def chain(client, make_project, make_task, link):
+    """Four 2-day tasks in a row; 2026-01-01 is a Thursday, so they start on 01-01, 01-05, 01-07 and 01-09"""
+    project = make_project("Gantt", start_date="2026-01-01T00:00:00")
+    ids = [make_task(project, f"t{i}", 2) for i in range(4)]
+    for predecessor, successor in zip(ids, ids[1:]):
+        assert link(successor, predecessor).status_code == 200
+    client.post(f"/projects/{project}/schedule")
+    return project, ids
+
+def test_rows_carry_dates_and_dependencies(client, chain):
+    project, ids = chain
+    rows = client.get(f"/projects/{project}/gantt").json()
+    assert [(row["id"], row["start_date"]) for row in rows] == list(zip(ids, [
+        "2026-01-01T00:00:00", "2026-01-05T00:00:00", "2026-01-07T00:00:00", "2026-01-09T00:00:00"
+    ]))
+    assert [row["dependencies"] for row in rows] == [[], [ids[0]], [ids[1]], [ids[2]]]
+
+@pytest.mark.parametrize("window", [
+    {"from": "2026-01-07T00:00:00Z"},
+    {"from": "2026-01-07T01:00:00+02:00"},
+    {"from": "2026-01-07T00:00:00"},
+])
+def test_from_accepts_aware_and_naive_datetimes(client, chain, window):
+    project, ids = chain
+    response = client.get(f"/projects/{project}/gantt", params=window)
+    assert response.status_code == 200, response.text
+    assert [row["id"] for row in response.json()] == ids[1:]
+
+def test_window_keeps_overlapping_tasks(client, chain):
+    project, ids = chain
+    rows = client.get(f"/projects/{project}/gantt", params={
+        "from": "2026-01-06T00:00:00Z", "to": "2026-01-07T00:00:00Z"
+    }).json()
+    assert [row["id"] for row in rows] == ids[1:3]
+    assert client.get(f"/projects/{project}/gantt", params={"from": "2027-01-01T00:00:00Z"}).json() == []
+
+def test_parent_id_selects_the_subtree(client, make_project, make_task):
+    project = make_project()
+    root = make_task(project, "root", 1)
+    child = make_task(project, "child", 1, parent_id=root)
+    grandchild = make_task(project, "grandchild", 1, parent_id=child)
+    make_task(project, "other", 1)
+    rows = client.get(f"/projects/{project}/gantt", params={"parent_id": root}).json()
+    assert [row["id"] for row in rows] == [child, grandchild]
+
+def test_unknown_project_is_not_found(client):
+    assert client.get("/projects/999999/gantt").status_code == 404
@@ -0,0 +1,78 @@
+import pytest
+
+FIELDS = ("depth", "via", "lag", "path_float", "earliest_start", "total_float")
+
+@pytest.fixture
+def diamond(make_project, make_task, link):
+    """a -> b (FS +1) -> d and a -> c (SS +1) -> d; b is the driving branch"""
+    project = make_project(start_date="2026-01-05T00:00:00")
+    ids = {
+        title: make_task(project, title, duration)
+        for title, duration in [("a", 2), ("b", 3), ("c", 1), ("d", 1)]
+    }
+    for succ, pred, fields in [
+        ("b", "a", {"lag_time": 1}),
+        ("c", "a", {"dependency_type": "SS", "lag_time": 1}),
+        ("d", "b", {}),
+        ("d", "c", {}),
+    ]:
+        assert link(ids[succ], ids[pred], **fields).status_code == 200
+    return project, ids
+
+def impact(client, task_id, **params):
+    response = client.get(f"/tasks/{task_id}/impact", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def rows(result, ids):
+    titles = {task_id: title for title, task_id in ids.items()}
+    return {
+        titles[row["task_id"]]: tuple(
+            titles[row[field]] if field == "via" else row[field] for field in FIELDS
+        )
+        for row in result["tasks"]
+    }
+
+def test_downstream_paths_carry_lag_and_float(client, diamond):
+    _, ids = diamond
+    result = impact(client, ids["a"])
+    assert rows(result, ids) == {
+        "b": (1, "a", 1.0, 0.0, 3.0, 0.0),
+        "c": (1, "a", 1.0, 0.0, 1.0, 4.0),
+        "d": (2, "b", 1.0, 0.0, 6.0, 0.0),
+    }
+    assert [row["depth"] for row in result["tasks"]] == [1, 1, 2]
+    assert result["count"] == 3
+
+def test_upstream_path_float_is_the_slack_before_the_task_moves(client, diamond):
+    _, ids = diamond
+    assert rows(impact(client, ids["d"], direction="up"), ids) == {
+        "b": (1, "d", 0.0, 0.0, 3.0, 0.0),
+        "c": (1, "d", 0.0, 4.0, 1.0, 4.0),
+        "a": (2, "b", 1.0, 0.0, 0.0, 0.0),
+    }
+
+def test_depth_limits_the_hops(client, diamond):
+    _, ids = diamond
+    assert set(rows(impact(client, ids["a"], depth=1), ids)) == {"b", "c"}
+    assert impact(client, ids["d"])["tasks"] == []
+
+def test_impact_follows_dependency_writes(client, diamond, make_task, link):
+    project, ids = diamond
+    ids["e"] = make_task(project, "e", 1)
+    assert link(ids["e"], ids["c"], lag_time=2).status_code == 200
+    assert rows(impact(client, ids["a"]), ids)["e"] == (2, "c", 3.0, 0.0, 4.0, 2.0)
+    client.delete(f"/tasks/{ids['e']}/dependencies/{ids['c']}")
+    assert "e" not in rows(impact(client, ids["a"]), ids)
+
+def test_bad_requests(client, diamond):
+    _, ids = diamond
+    assert client.get(f"/tasks/{ids['a']}/impact", params={"direction": "sideways"}).status_code == 422
+    assert client.get(f"/tasks/{ids['a']}/impact", params={"depth": 0}).status_code == 422
+    assert client.get("/tasks/999999/impact").status_code == 404
+
+def test_impact_with_a_cross_project_predecessor(client, linked):
+    # Only tasks of the task's own project are listed
+    for task, direction, expected in [("b1", "up", "b0"), ("b0", "down", "b1")]:
+        result = impact(client, linked[task], direction=direction)
+        assert [row["task_id"] for row in result["tasks"]] == [linked[expected]]
@@ -0,0 +1,77 @@
+import pytest
+
+@pytest.fixture
+def import_rows(client):
+    def run(project_id: int, rows: str, columns: str = "unique_id,title,duration,predecessors"):
+        csv = f"{columns}\n{rows}".encode()
+        response = client.post(f"/projects/{project_id}/import", files={"file": ("tasks.csv", csv)})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return run
+
+@pytest.fixture
+def task_ids(client):
+    def read(project_id: int):
+        return {task["title"]: task["id"] for task in client.get(f"/projects/{project_id}").json()["tasks"]}
+    return read
+
+def test_rows_become_tasks_and_dependencies(client, make_project, import_rows, task_ids):
+    project = make_project()
+    report = import_rows(
+        project,
+        f"Cx{project},c,1,Ax{project};Bx{project} SS+2,Ax{project}\n"
+        f"Ax{project},a,3,,\n"
+        f"Bx{project},b,2,Ax{project},\n",
+        columns="unique_id,title,duration,predecessors,parent"
+    )
+    assert (report["imported_tasks"], report["imported_dependencies"], report["error_count"]) == (3, 3, 0)
+    ids = task_ids(project)
+    tasks = {task["id"]: task for task in client.get(f"/projects/{project}").json()["tasks"]}
+    assert tasks[ids["c"]]["parent_id"] == ids["a"]
+    schedule = client.post(f"/projects/{project}/schedule").json()["task_schedules"]
+    # c waits for a to finish and for b's start plus 2 days
+    assert schedule[str(ids["c"])]["earliest_start"] == 5.0
+
+def test_bad_rows_are_reported_and_skipped(make_project, import_rows):
+    project = make_project()
+    report = import_rows(
+        project,
+        f"Ax{project},a,x,\n"
+        f",b,1,\n"
+        f"Cx{project},c,1,NOPEx{project}\n"
+        f"Cx{project},d,1,\n"
+    )
+    assert report["imported_tasks"] == 1
+    assert report["imported_dependencies"] == 0
+    assert [error["row"] for error in report["errors"]] == [2, 3, 5, 4]
+
+def test_cycles_among_imported_rows_are_rejected(make_project, import_rows):
+    project = make_project()
+    report = import_rows(project, f"Ax{project},a,1,Bx{project}\nBx{project},b,1,Ax{project}\n")
+    # Both new edges lie on the cycle
+    assert report["imported_tasks"] == 2
+    assert report["imported_dependencies"] == 0
+    assert {error["message"] for error in report["errors"]} == {"Dependency would create a circular reference"}
+
+def test_import_closing_a_cycle_through_another_project_is_rejected(
+    make_project, link, import_rows, task_ids, earliest_starts
+):
+    upstream, project = make_project("Upstream"), make_project("Downstream")
+    import_rows(upstream, f"X{upstream},x,3,\nY{upstream},y,1,X{upstream}\n")
+    # n1 follows y of the upstream project
+    report = import_rows(project, f"N1x{project},n1,2,Y{upstream}\nN2x{project},n2,1,N1x{project}\n")
+    assert report["linked_projects"] == [upstream]
+
+    upstream_ids, ids = task_ids(upstream), task_ids(project)
+    assert link(upstream_ids["x"], ids["n2"]).status_code == 400
+    assert earliest_starts(project) == {ids["n1"]: 4.0, ids["n2"]: 6.0}
+
+    # z follows n2, so x after z would close the cycle through both projects
+    report = import_rows(upstream, f"Z{upstream},z,1,N2x{project}\n")
+    assert report["imported_dependencies"] == 1
+    assert link(upstream_ids["x"], task_ids(upstream)["z"]).status_code == 400
+
+def test_unknown_format_is_rejected(client, make_project):
+    project = make_project()
+    response = client.post(f"/projects/{project}/import", files={"file": ("tasks.txt", b"")})
+    assert response.status_code == 400
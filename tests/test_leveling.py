@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from app.services.cpm_engine import CompiledGraph
+from app.services.leveling import level_schedule
+
+def level(durations, dependencies=(), demands=None, capacities=None, priorities=None, locked=()):
+    """Levels tasks 1..n with the given durations; demands map task ids to (resource, hours) pairs"""
+    tasks = [
+        SimpleNamespace(id=task_id, duration=duration, is_milestone=False, is_locked=task_id in locked)
+        for task_id, duration in enumerate(durations, start=1)
+    ]
+    graph = CompiledGraph.from_records(tasks, [
+        SimpleNamespace(predecessor_id=pred, successor_id=succ, dependency_type=None, lag_time=0)
+        for pred, succ in dependencies
+    ])
+    positions = graph.positions
+    ranks = [0] * graph.num_tasks
+    for task_id, rank in (priorities or {}).items():
+        ranks[positions[task_id]] = rank
+    return level_schedule(
+        graph,
+        {positions[task_id]: pairs for task_id, pairs in (demands or {}).items()},
+        capacities or {},
+        priorities=ranks
+    )
+
+def starts(result):
+    return {task_id: entry["start"] for task_id, entry in result["schedule"].items()}
+
+def test_tasks_sharing_a_resource_are_serialized_by_float():
+    # 1 -> 2 is the critical chain; 3 has float and yields the resource to 1
+    result = level([2, 3, 2], dependencies=[(1, 2)], demands={1: [(7, 16)], 3: [(7, 16)]})
+    assert starts(result) == {1: 0.0, 2: 2.0, 3: 2.0}
+    assert result["unleveled_duration"] == 5.0
+    assert result["project_duration"] == 5.0
+    assert result["overallocated"] == []
+
+def test_priority_breaks_ties_in_float():
+    demands = {1: [(7, 16)], 2: [(7, 16)]}
+    assert starts(level([2, 2], demands=demands, priorities={2: 3})) == {1: 2.0, 2: 0.0}
+    assert starts(level([2, 2], demands=demands, priorities={1: 3})) == {1: 0.0, 2: 2.0}
+
+def test_tasks_within_capacity_run_in_parallel():
+    result = level([2, 2], demands={1: [(7, 8)], 2: [(7, 8)]})
+    assert starts(result) == {1: 0.0, 2: 0.0}
+    # Half the capacity leaves no room for the second task
+    result = level([2, 2], demands={1: [(7, 8)], 2: [(7, 8)]}, capacities={7: 4})
+    assert sorted(starts(result).values()) == [0.0, 2.0]
+    assert result["project_duration"] == 4.0
+
+def test_task_over_capacity_on_every_day_is_reported_not_delayed():
+    result = level([1, 1], demands={1: [(7, 12)], 2: [(7, 4)]})
+    assert result["overallocated"] == [1]
+    assert starts(result)[1] == 0.0
+
+def test_locked_tasks_keep_their_earliest_start():
+    result = level([2, 2], demands={1: [(7, 16)], 2: [(7, 16)]}, priorities={1: 3}, locked={2})
+    assert starts(result) == {1: 2.0, 2: 0.0}
+    assert result["schedule"][1]["delay"] == 2.0
+
+def test_level_endpoint_leaves_stored_tasks_alone(client, make_project, make_task):
+    project = make_project()
+    resource = client.post("/resources/", json={"name": "r", "email": f"leveling-{project}@example.com"}).json()["id"]
+    for title in "ab":
+        make_task(project, title, 2, resource_assignments=[{"resource_id": resource, "assigned_hours": 16}])
+    client.post(f"/projects/{project}/schedule")
+    stored = client.get(f"/projects/{project}").json()["tasks"]
+
+    response = client.post(f"/projects/{project}/level", json={"resource_capacity": {str(resource): 16}})
+    assert response.status_code == 200, response.text
+    assert response.json()["project_duration"] == 2.0
+    response = client.post(f"/projects/{project}/level")
+    assert response.json()["project_duration"] == 4.0
+    assert response.json()["unleveled_duration"] == 2.0
+    assert client.get(f"/projects/{project}").json()["tasks"] == stored
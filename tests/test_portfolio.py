@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.cpm_engine import CompiledGraph
+from app.services.cpm_types import SchedulingError
+from app.services.portfolio import pack_components, project_components, schedule_projects
+
+def test_components_follow_the_links():
+    components = project_components([1, 2, 3, 4, 5], [(1, 2), (4, 2), (3, 9)])
+    assert components == [[1, 2, 4], [3], [5]]
+
+def test_components_are_packed_by_task_count():
+    parts = pack_components([[1, 2], [3], [4], [5]], {1: 50, 2: 50, 3: 60, 4: 30, 5: 20}, 2)
+    assert parts == [[1, 2], [3, 4, 5]]
+    assert pack_components([[1]], {1: 5}, 4) == [[1]]
+
+def graph(durations, dependencies):
+    tasks = [
+        SimpleNamespace(id=task_id, duration=duration, is_milestone=False, is_locked=False)
+        for task_id, duration in durations.items()
+    ]
+    return CompiledGraph.from_records(tasks, [
+        SimpleNamespace(predecessor_id=pred, successor_id=succ, dependency_type=None, lag_time=0)
+        for pred, succ in dependencies
+    ])
+
+def test_float_is_measured_against_each_projects_own_finish():
+    # Project 1 is 1 -> 2; project 2 is 3, which waits for 1, and 4, which runs long
+    compiled = graph({1: 2, 2: 1, 3: 1, 4: 6}, [(1, 2), (1, 3)])
+    projects = {task_id: project for task_id, project in [(1, 1), (2, 1), (3, 2), (4, 2)]}
+    results = schedule_projects(compiled, [projects[task_id] for task_id in compiled.task_ids.tolist()])
+    assert results[1]["project_duration"] == 3.0
+    assert results[2]["project_duration"] == 6.0
+    assert results[1]["critical_path"] == [1, 2]
+    assert results[2]["schedule"][3]["earliest_start"] == 2.0
+    assert results[2]["schedule"][3]["total_float"] == 3.0
+
+def test_tasks_outside_the_portfolio_are_an_error():
+    compiled = graph({2: 1}, [(1, 2)])
+    with pytest.raises(SchedulingError):
+        schedule_projects(compiled, [1])
+
+def test_schedule_waits_for_the_other_project(client, linked, earliest_starts):
+    assert earliest_starts(linked["project"]) == {linked["b0"]: 5.0, linked["b1"]: 6.0}
+
+    client.put(f"/tasks/{linked['a0']}", json={"title": "a0", "project_id": linked["upstream"], "duration": 4})
+    assert earliest_starts(linked["project"]) == {linked["b0"]: 7.0, linked["b1"]: 8.0}
+
+def test_portfolio_schedules_linked_projects_together(client, linked, earliest_starts):
+    response = client.post("/portfolio/schedule", json={"project_ids": [linked["project"]]})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert [linked["upstream"], linked["project"]] in result["components"]
+    projects = result["projects"]
+    assert projects[str(linked["upstream"])]["project_duration"] == 5.0
+    assert projects[str(linked["project"])]["project_duration"] == 8.0
+    # The same earliest starts as scheduling the project alone
+    assert {
+        int(task_id): entry["earliest_start"]
+        for task_id, entry in projects[str(linked["project"])]["task_schedules"].items()
+    } == earliest_starts(linked["project"])
+
+def test_portfolio_rejects_unknown_projects(client):
+    assert client.post("/portfolio/schedule", json={"project_ids": [999999]}).status_code == 404
@@ -0,0 +1,41 @@
+import pytest
+
+from app.main import PROJECT_SUMMARY_FIELDS
+
+@pytest.fixture
+def projects(client, make_project, make_task):
+    ids = [make_project(f"Listed {n}", start_date="2026-01-05T00:00:00") for n in range(3)]
+    make_task(ids[0], "done", 2, work_hours=30, progress=100)
+    make_task(ids[0], "open", 1, work_hours=10)
+    client.post(f"/projects/{ids[0]}/schedule")
+    return ids
+
+def test_cursor_walks_the_listing_in_id_order(client, projects):
+    first = client.get("/projects/", params={"cursor": projects[0] - 1, "limit": 2})
+    assert [project["id"] for project in first.json()] == projects[:2]
+    cursor = first.headers["x-next-cursor"]
+    assert cursor == str(projects[1])
+
+    last = client.get("/projects/", params={"cursor": cursor, "limit": 2})
+    assert [project["id"] for project in last.json()] == projects[2:]
+    assert "x-next-cursor" not in last.headers
+
+def test_fields_select_the_summary_values(client, projects):
+    response = client.get("/projects/", params={
+        "cursor": projects[0] - 1, "limit": 1, "fields": "name,task_count,percent_complete"
+    })
+    assert response.json() == [{"id": projects[0], "name": "Listed 0", "task_count": 2, "percent_complete": 75.0}]
+
+    [summary] = client.get("/projects/", params={"cursor": projects[0] - 1, "limit": 1}).json()
+    assert summary["computed_finish"] == "2026-01-07T00:00:00"
+    assert set(summary) == {"id", *PROJECT_SUMMARY_FIELDS}
+
+def test_include_adds_each_projects_tasks(client, projects):
+    [summary] = client.get("/projects/", params={
+        "cursor": projects[0] - 1, "limit": 1, "fields": "name", "include": "tasks"
+    }).json()
+    assert [task["title"] for task in summary["tasks"]] == ["done", "open"]
+
+@pytest.mark.parametrize("params", [{"fields": "name,secret"}, {"include": "resources"}, {"limit": 0}])
+def test_bad_listing_parameters_are_rejected(client, params):
+    assert client.get("/projects/", params=params).status_code in (400, 422)
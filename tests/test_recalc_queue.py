@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from app.services.recalc_queue import RecalculationQueue
+from app.services.schedule_cache import ScheduleChanges
+
+class RecordingCache:
+    """Stands in for ScheduleCache and records the batches it is given"""
+
+    def __init__(self):
+        self.batches = []
+        self.touched = 0
+        self.applied = threading.Event()
+
+    def touch(self, project_id):
+        self.touched += 1
+
+    def apply(self, project_id, changes):
+        self.batches.append((project_id, dict(changes.durations)))
+        self.applied.set()
+        return {task_id: {"duration": value} for task_id, value in changes.durations.items()}
+
+    def invalidate(self, project_id=None):
+        pass
+
+def durations(**values):
+    changes = ScheduleChanges()
+    for name, value in values.items():
+        changes.set_duration(int(name[1:]), value)
+    return changes
+
+@pytest.fixture
+def cache():
+    return RecordingCache()
+
+def test_changes_within_the_debounce_are_applied_as_one_batch(cache):
+    applied = []
+    queue = RecalculationQueue(cache, debounce=0.2, max_delay=5, on_apply=lambda pid, delta: applied.append(delta))
+    for value in (1, 2, 3):
+        queue.submit(1, durations(t1=value, **{f"t{value + 1}": value}))
+    assert cache.batches == []
+    assert queue.stats()["queue_depth"] == 3
+    assert cache.applied.wait(2)
+    queue.flush(1)  # Waits for the batch's bookkeeping
+
+    # The last value of each task wins
+    assert cache.batches == [(1, {1: 3, 2: 1, 3: 2, 4: 3})]
+    assert applied == [{1: {"duration": 3}, 2: {"duration": 1}, 3: {"duration": 2}, 4: {"duration": 3}}]
+    stats = queue.stats()
+    assert (stats["submitted"], stats["batches"], stats["coalescing_ratio"]) == (3, 1, 3.0)
+    assert stats["pending_projects"] == 0
+    assert cache.touched == 3
+
+def test_max_delay_bounds_a_stream_of_changes(cache):
+    queue = RecalculationQueue(cache, debounce=0.1, max_delay=0.3)
+    started = time.monotonic()
+    # A change every 50ms keeps resetting the debounce
+    while not cache.applied.is_set() and time.monotonic() - started < 2:
+        queue.submit(1, durations(t1=time.monotonic()))
+        time.sleep(0.05)
+    assert cache.applied.is_set()
+    assert time.monotonic() - started < 1
+    queue.flush(1)
+    assert queue.stats()["coalescing_ratio"] > 1
+
+def test_flush_applies_pending_changes_at_once(cache):
+    queue = RecalculationQueue(cache, debounce=10, max_delay=10)
+    queue.submit(1, durations(t1=4))
+    queue.submit(2, durations(t2=5))
+    queue.flush(1)
+    assert cache.batches == [(1, {1: 4})]
+    assert queue.stats()["flushes"] == 1
+    assert queue.stats()["pending_projects"] == 1
+    # Nothing is pending, so a second flush is a no-op
+    queue.flush(1)
+    assert len(cache.batches) == 1
+    queue.invalidate(2)
+    assert queue.stats()["pending_projects"] == 0
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.task import DependencyType
+from app.services.cpm_engine import CompiledGraph
+from app.services.scenarios import Scenario, ScenarioStore, evaluate_scenarios
+
+@pytest.fixture
+def graph():
+    """1 -> 2 -> 4 and 1 -> 3 -> 4, where 2 is the longer branch"""
+    tasks = [
+        SimpleNamespace(id=task_id, duration=duration, is_milestone=False, is_locked=False)
+        for task_id, duration in [(1, 1), (2, 4), (3, 2), (4, 1)]
+    ]
+    return CompiledGraph.from_records(tasks, [
+        SimpleNamespace(predecessor_id=pred, successor_id=succ, dependency_type=None, lag_time=0)
+        for pred, succ in [(1, 2), (1, 3), (2, 4), (3, 4)]
+    ])
+
+def test_changes_round_trip_through_json():
+    scenario = Scenario(
+        7, 1, "slip",
+        durations={2: 6.5},
+        lags={(1, 3): 2.0},
+        removed_dependencies=[(2, 4)],
+        added_dependencies=[(3, 2, DependencyType.START_TO_START, 1.0)]
+    )
+    rebuilt = Scenario.from_changes(7, 1, "slip", scenario.changes(), created_at=scenario.created_at)
+    assert rebuilt.as_dict() == scenario.as_dict()
+    assert rebuilt.task_ids() == {1, 2, 3, 4}
+
+def test_apply_shares_what_it_leaves_alone(graph):
+    durations, lags = graph.durations.copy(), graph.edge_lag.copy()
+    changed = Scenario(1, 1, "longer", durations={3: 5}).apply(graph)
+    assert changed.durations[graph.position(3)] == 5
+    assert changed.edge_lag is graph.edge_lag
+    assert changed.edge_pred is graph.edge_pred
+    # The base graph is untouched
+    assert graph.durations.tolist() == durations.tolist()
+
+    rewired = Scenario(2, 1, "rewired", lags={(1, 3): 1.0}, removed_dependencies=[(2, 4)]).apply(graph)
+    assert rewired.durations is graph.durations
+    assert rewired.num_edges == graph.num_edges - 1
+    assert graph.edge_lag.tolist() == lags.tolist()
+
+def test_evaluate_scenarios(graph):
+    scenarios = [
+        Scenario(1, 1, "longer", durations={3: 5}),
+        Scenario(2, 1, "dropped", removed_dependencies=[(2, 4)]),
+        Scenario(3, 1, "cycle", added_dependencies=[(4, 1, DependencyType.FINISH_TO_START, 0)]),
+    ]
+    results = evaluate_scenarios(graph, scenarios, base=True)
+    assert (results["base"]["project_duration"], results["base"]["critical_path"]) == (6.0, [1, 2, 4])
+    assert (results[1]["project_duration"], results[1]["critical_path"]) == (7.0, [1, 3, 4])
+    assert results[2]["project_duration"] == 5.0
+    assert "error" in results[3]
+
+def test_store_lists_scenarios_per_project():
+    store = ScenarioStore()
+    store.load([Scenario(4, 1, "saved", persisted=True)])
+    assert store.next_id() == 5
+    store.add(Scenario(5, 2, "other"))
+    assert [scenario.id for scenario in store.list(1)] == [4]
+    assert store.get(2, 4) is None
+    store.remove_project(1)
+    assert store.list(1) == [] and store.get(2, 5) is not None
+
+@pytest.fixture
+def project(client, make_project, make_task, link):
+    project = make_project(start_date="2026-01-05T00:00:00")
+    ids = [make_task(project, f"t{n}", duration) for n, duration in enumerate([1, 4, 2, 1])]
+    for pred, succ in [(0, 1), (0, 2), (1, 3), (2, 3)]:
+        assert link(ids[succ], ids[pred]).status_code == 200
+    return project, ids
+
+def test_compare_reports_each_scenario_against_the_project(client, project):
+    project, ids = project
+    created = [client.post(f"/projects/{project}/scenarios", json=body).json() for body in [
+        {"name": "longer", "durations": {ids[2]: 5}, "persist": True},
+        {"name": "cycle", "added_dependencies": [{"predecessor_id": ids[3], "successor_id": ids[0]}]},
+    ]]
+    assert [scenario["persisted"] for scenario in created] == [True, False]
+    schedule = client.post(f"/projects/{project}/schedule").json()
+
+    response = client.post(f"/projects/{project}/scenarios/compare")
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["base"]["project_duration"] == schedule["project_duration"] == 6.0
+    longer, cycle = result["scenarios"]
+    assert longer["duration_change"] == 1.0
+    # Seven working days from Monday 2026-01-05
+    assert longer["finish_date"] == "2026-01-14T00:00:00"
+    assert (longer["critical_path_added"], longer["critical_path_removed"]) == ([ids[2]], [ids[1]])
+    assert "error" in cycle
+    # Scenarios never touch the project itself
+    assert client.post(f"/projects/{project}/schedule").json()["project_duration"] == 6.0
+
+    only = client.post(f"/projects/{project}/scenarios/compare", json={"scenario_ids": [created[0]["id"]]})
+    assert [scenario["id"] for scenario in only.json()["scenarios"]] == [created[0]["id"]]
+    missing = client.post(f"/projects/{project}/scenarios/compare", json={"scenario_ids": [999999]})
+    assert missing.status_code == 404
+
+def test_persisted_scenarios_reload_and_delete(client, project):
+    from app.database import SessionLocal
+    from app.main import scenario_store
+    from app.models.task import SavedScenario
+    project, ids = project
+    scenario = client.post(f"/projects/{project}/scenarios", json={
+        "name": "kept", "durations": {ids[1]: 2}, "lags": [
+            {"predecessor_id": ids[0], "successor_id": ids[2], "lag_time": 3}
+        ], "persist": True
+    }).json()
+    db = SessionLocal()
+    try:
+        row = db.get(SavedScenario, scenario["id"])
+        reloaded = Scenario.from_changes(row.id, row.project_id, row.name, row.changes)
+    finally:
+        db.close()
+    assert reloaded.changes() == scenario_store.get(project, scenario["id"]).changes()
+
+    assert client.delete(f"/projects/{project}/scenarios/{scenario['id']}").status_code == 200
+    assert client.get(f"/projects/{project}/scenarios/{scenario['id']}").status_code == 404
+    db = SessionLocal()
+    try:
+        assert db.get(SavedScenario, scenario["id"]) is None
+    finally:
+        db.close()
+
+def test_scenarios_only_refer_to_the_projects_tasks(client, project, make_project, make_task):
+    project, _ = project
+    other = make_task(make_project(), "elsewhere", 1)
+    response = client.post(f"/projects/{project}/scenarios", json={"name": "bad", "durations": {other: 1}})
+    assert response.status_code == 400
+    response = client.post(f"/projects/{project}/scenarios", json={"name": "bad", "durations": {other: -1}})
+    assert response.status_code == 400
@@ -0,0 +1,106 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.task import DependencyType
+from app.services.schedule_cache import ScheduleChanges, ScheduleState
+from app.services.scheduler import ProjectScheduler
+
+PROJECTS = 25
+EDITS_PER_PROJECT = 30  # 750 edits in all
+
+def task(task_id: int, duration: float):
+    return SimpleNamespace(id=task_id, duration=duration, is_milestone=False, is_locked=False)
+
+def dependency(pred: int, succ: int, rng: random.Random):
+    return SimpleNamespace(
+        predecessor_id=pred,
+        successor_id=succ,
+        dependency_type=rng.choice(list(DependencyType)),
+        lag_time=rng.choice([0, 2, -1])
+    )
+
+def reaches(dependencies, source: int, target: int) -> bool:
+    successors = {}
+    for pred, succ in dependencies:
+        successors.setdefault(pred, []).append(succ)
+    stack, seen = [source], {source}
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        for succ in successors.get(node, ()):
+            if succ not in seen:
+                seen.add(succ)
+                stack.append(succ)
+    return False
+
+def random_edit(rng: random.Random, tasks, dependencies, next_id: int) -> ScheduleChanges:
+    """Makes one random edit to tasks and dependencies and returns it as a change batch"""
+    changes = ScheduleChanges()
+    ids = list(tasks)
+    roll = rng.random()
+    if roll < 0.35 and ids:
+        task_id = rng.choice(ids)
+        tasks[task_id].duration = rng.randint(0, 8)
+        changes.set_duration(task_id, tasks[task_id].duration)
+    elif roll < 0.55 and len(ids) > 1:
+        pred, succ = rng.sample(ids, 2)
+        if not reaches(dependencies, succ, pred):
+            added = dependencies[(pred, succ)] = dependency(pred, succ, rng)
+            changes.add_edge(pred, succ, added.dependency_type, added.lag_time)
+    elif roll < 0.7 and dependencies:
+        edge = rng.choice(list(dependencies))
+        del dependencies[edge]
+        changes.remove_edge(*edge)
+    elif roll < 0.85 or len(ids) < 2:
+        tasks[next_id] = task(next_id, rng.randint(0, 5))
+        changes.set_duration(next_id, tasks[next_id].duration)
+    else:
+        task_id = rng.choice(ids)
+        del tasks[task_id]
+        for edge in [edge for edge in dependencies if task_id in edge]:
+            del dependencies[edge]
+        changes.remove_task(task_id)
+    return changes
+
+@pytest.mark.parametrize("seed", range(PROJECTS))
+def test_incremental_updates_match_full_recompute(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 40)
+    tasks = {task_id: task(task_id, rng.randint(0, 6)) for task_id in range(1, n + 1)}
+    dependencies = {}
+    for _ in range(rng.randint(0, 2 * n)):
+        pred, succ = sorted(rng.sample(list(tasks), 2))
+        dependencies[(pred, succ)] = dependency(pred, succ, rng)
+    # A task of another project that the first few tasks wait for
+    boundaries = {-1: (3.0, 5.0)}
+    boundary_dependencies = [dependency(-1, task_id, rng) for task_id in range(1, min(n, 3) + 1)]
+
+    state = ScheduleState.from_records(
+        list(tasks.values()), list(dependencies.values()) + boundary_dependencies, boundaries
+    )
+    next_id = n + 1
+    for _ in range(EDITS_PER_PROJECT):
+        before = {task_id: state.entry(task_id) for task_id in state.durations}
+        changes = random_edit(rng, tasks, dependencies, next_id)
+        next_id += 1
+        delta = state.apply(changes)
+
+        scheduler = ProjectScheduler()
+        scheduler.build_dependency_graph(
+            list(tasks.values()),
+            list(dependencies.values())
+            + [dep for dep in boundary_dependencies if dep.successor_id in tasks],
+            boundaries
+        )
+        full = scheduler.calculate_critical_path()
+        incremental = state.result()
+        assert incremental["schedule"] == full["schedule"]
+        assert incremental["project_duration"] == full["project_duration"]
+        assert sorted(incremental["critical_path"]) == sorted(full["critical_path"])
+        # Every entry that moved is reported
+        for task_id, entry in incremental["schedule"].items():
+            if before.get(task_id) != entry:
+                assert delta[task_id] == entry
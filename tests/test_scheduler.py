@@ -0,0 +1,78 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.task import DependencyType
+from app.services.cpm_engine import SchedulingError
+from app.services.scheduler import ProjectScheduler
+
+DEPENDENCY_TYPES = list(DependencyType) + [None]
+
+def random_project(rng: random.Random):
+    """Tasks, dependencies and outside boundaries of a random DAG, in shuffled order"""
+    n = rng.randint(1, 80)
+    tasks = [
+        SimpleNamespace(
+            id=1000 + i,
+            duration=rng.choice([None, 0, rng.randint(0, 9), rng.random() * 5]),
+            is_milestone=False,
+            is_locked=False
+        )
+        for i in range(n)
+    ]
+    rng.shuffle(tasks)
+    deep = rng.random() < 0.5
+    dependencies = []
+    for _ in range(rng.randint(0, 3 * n)):
+        if n < 2:
+            break
+        pred, succ = sorted(rng.sample(range(n), 2))
+        if deep and rng.random() < 0.7:
+            succ = pred + 1
+        dependencies.append(SimpleNamespace(
+            predecessor_id=1000 + pred,
+            successor_id=1000 + succ,
+            dependency_type=rng.choice(DEPENDENCY_TYPES),
+            lag_time=rng.choice([None, 0, -1, 2, 0.5])
+        ))
+    # Tasks of other projects that some of these depend on
+    boundaries = {}
+    for outside in range(rng.randint(0, 3)):
+        start = float(rng.randint(0, 10))
+        boundaries[outside + 1] = (start, start + rng.randint(0, 5))
+        for _ in range(rng.randint(1, 3)):
+            dependencies.append(SimpleNamespace(
+                predecessor_id=outside + 1,
+                successor_id=1000 + rng.randrange(n),
+                dependency_type=rng.choice(DEPENDENCY_TYPES),
+                lag_time=rng.choice([None, 0, 1])
+            ))
+    return tasks, dependencies, boundaries
+
+def schedule(backend: str, tasks, dependencies, boundaries=None):
+    scheduler = ProjectScheduler(backend)
+    scheduler.build_dependency_graph(tasks, dependencies, boundaries)
+    return scheduler.calculate_critical_path()
+
+@pytest.mark.parametrize("seed", range(200))
+def test_array_backend_matches_networkx(seed):
+    tasks, dependencies, boundaries = random_project(random.Random(seed))
+    array = schedule("array", tasks, dependencies, boundaries)
+    networkx = schedule("networkx", tasks, dependencies, boundaries)
+    assert array["project_duration"] == networkx["project_duration"]
+    assert array["critical_path"] == networkx["critical_path"]
+    assert array["schedule"] == networkx["schedule"]
+
+@pytest.mark.parametrize("backend", ["array", "networkx"])
+def test_cycles_are_rejected(backend):
+    tasks = [SimpleNamespace(id=i, duration=1, is_milestone=False, is_locked=False) for i in (1, 2, 3)]
+    dependencies = [
+        SimpleNamespace(predecessor_id=pred, successor_id=succ, dependency_type=None, lag_time=0)
+        for pred, succ in [(1, 2), (2, 3), (3, 1)]
+    ]
+    scheduler = ProjectScheduler(backend)
+    scheduler.build_dependency_graph(tasks, dependencies)
+    assert scheduler.detect_cycles()
+    with pytest.raises(SchedulingError):
+        scheduler.calculate_critical_path()
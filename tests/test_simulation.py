@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import simulation
+from app.services.cpm_engine import CompiledGraph
+
+@pytest.fixture
+def graph():
+    """1 -> 3 and 2 -> 3, where 1 is the longer branch"""
+    tasks = [
+        SimpleNamespace(id=task_id, duration=duration, is_milestone=False, is_locked=False)
+        for task_id, duration in [(1, 5), (2, 3), (3, 2)]
+    ]
+    return CompiledGraph.from_records(tasks, [
+        SimpleNamespace(predecessor_id=pred, successor_id=3, dependency_type=None, lag_time=0)
+        for pred in (1, 2)
+    ])
+
+def test_zero_spread_reproduces_cpm(graph):
+    result = simulation.simulate(graph, 50, optimistic_factor=1, pessimistic_factor=1, seed=1)
+    assert result["min_duration"] == result["max_duration"] == 7.0
+    assert result["percentiles"] == {50: 7.0, 80: 7.0, 95: 7.0}
+    assert result["criticality"] == {1: 1.0, 2: 0.0, 3: 1.0}
+
+@pytest.mark.parametrize("distribution", simulation.DISTRIBUTIONS)
+def test_seeded_runs_repeat_and_stay_within_bounds(graph, distribution):
+    first = simulation.simulate(graph, 2000, distribution=distribution, seed=42)
+    assert simulation.simulate(graph, 2000, distribution=distribution, seed=42) == first
+    assert simulation.simulate(graph, 2000, distribution=distribution, seed=43) != first
+    # Each task lies between 0.8 and 1.5 times its duration
+    assert 0.8 * 7 <= first["min_duration"] <= first["percentiles"][50] \
+        <= first["percentiles"][80] <= first["percentiles"][95] <= first["max_duration"] <= 1.5 * 7
+    assert first["criticality"][3] == 1.0
+    assert first["criticality"][1] + first["criticality"][2] >= 1.0
+
+def test_chunks_give_the_same_answer_on_an_executor(graph, monkeypatch):
+    monkeypatch.setattr(simulation, "MAX_CHUNK_CELLS", 300)  # 100 samples per chunk
+    inline = simulation.simulate(graph, 1000, seed=7)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert simulation.simulate(graph, 1000, seed=7, executor=executor) == inline
+
+def test_simulate_endpoint(client, make_project, make_task, link):
+    project = make_project(start_date="2026-01-05T00:00:00")
+    a, b = make_task(project, "a", 4), make_task(project, "b", 2)
+    assert link(b, a).status_code == 200
+    body = {"samples": 500, "seed": 3, "percentiles": [50, 90]}
+    response = client.post(f"/projects/{project}/simulate", json=body)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["deterministic_duration"] == 6.0
+    assert [row["percentile"] for row in result["percentiles"]] == [50, 90]
+    assert client.post(f"/projects/{project}/simulate", json=body).json()["percentiles"] == result["percentiles"]
+    assert client.post(f"/projects/{project}/simulate", json={"percentiles": [120]}).status_code == 400
@@ -0,0 +1,55 @@
+from app.services.versions import ResponseCache, etag_matches, make_etag
+
+def test_etag_matching_is_weak_and_accepts_lists():
+    etag = make_etag("project", 3, 12)
+    assert etag == '"project-3-12"'
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"project-3-11"', etag)
+    assert not etag_matches(None, etag)
+
+def test_cache_evicts_least_recently_used_bodies():
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == (b"1234", {})
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    # Too big for the cache at all
+    cache.put("d", b"x" * 11)
+    assert cache.get("d") is None
+
+def test_matching_if_none_match_gets_304(client, make_project, make_task):
+    project = make_project()
+    make_task(project, "a", 1)
+    for url in (f"/projects/{project}", f"/projects/{project}/gantt", "/projects/"):
+        response = client.get(url)
+        etag = response.headers["etag"]
+        assert response.status_code == 200
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+def test_writes_change_the_etag(client, make_project, make_task):
+    project = make_project()
+    task = make_task(project, "a", 1)
+    etag = client.get(f"/projects/{project}").headers["etag"]
+    client.put(f"/tasks/{task}", json={"title": "renamed", "project_id": project, "duration": 1})
+    response = client.get(f"/projects/{project}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["tasks"][0]["title"] == "renamed"
+
+def test_negotiated_formats_are_tagged_apart(client, make_project, make_task):
+    from app.services import columnar
+    project = make_project()
+    make_task(project, "a", 1)
+    etag = client.get(f"/projects/{project}/gantt").headers["etag"]
+    response = client.get(
+        f"/projects/{project}/gantt", headers={"Accept": columnar.MEDIA_TYPE, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,87 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.wbs import WbsRollup
+
+def row(task_id, parent_id=None, start=None, end=None, duration=1, work_hours=0, progress=0, cost=0):
+    return SimpleNamespace(
+        id=task_id, parent_id=parent_id, title=f"t{task_id}", start=start, end=end,
+        duration=duration, work_hours=work_hours, progress=progress, cost=cost
+    )
+
+@pytest.fixture
+def rollup():
+    """1 holds 2 and 3; 3 holds 4 and 5; 6 is a second root"""
+    return WbsRollup.from_rows([
+        row(1),
+        row(2, 1, datetime(2026, 1, 5), datetime(2026, 1, 7), 2, work_hours=10, progress=100, cost=50),
+        row(3, 1),
+        row(4, 3, datetime(2026, 1, 7), datetime(2026, 1, 8), 1, work_hours=20, progress=50, cost=25),
+        row(5, 3, datetime(2026, 1, 8), None, 3, work_hours=10, cost=5),
+        row(6, duration=4),
+    ])
+
+def values(rollup):
+    return {
+        entry["id"]: (entry["wbs"], entry["start_date"], entry["end_date"], entry["duration"],
+                      entry["work_hours"], entry["progress"], entry["cost"])
+        for entry in rollup.rows()
+    }
+
+def test_summaries_roll_up_their_children(rollup):
+    rows = values(rollup)
+    # 5 has no end, so it runs for its duration from its start
+    assert rows[3] == (
+        "1.2", "2026-01-07T00:00:00", "2026-01-11T00:00:00", 4.0, 30.0, pytest.approx(100 / 3), 30.0
+    )
+    assert rows[1] == ("1", "2026-01-05T00:00:00", "2026-01-11T00:00:00", 6.0, 40.0, 50.0, 80.0)
+    assert rows[6] == ("2", None, None, 4.0, 0.0, 0.0, 0.0)
+    assert [entry["wbs"] for entry in rollup.rows()] == ["1", "1.1", "1.2", "1.2.1", "1.2.2", "2"]
+    assert rollup.summary() == {
+        "start_date": "2026-01-05T00:00:00", "end_date": "2026-01-11T00:00:00",
+        "duration": 6.0, "work_hours": 40.0, "progress": 50.0, "cost": 80.0
+    }
+
+def test_leaf_updates_match_a_rebuild(rollup):
+    changed = row(4, 3, datetime(2026, 1, 7), datetime(2026, 1, 12), 5, work_hours=20, progress=100, cost=25)
+    assert rollup.update_task(changed)
+    assert rollup.update_task(row(7, 6, datetime(2026, 1, 1), datetime(2026, 1, 2), work_hours=4))
+    rebuilt = WbsRollup.from_rows([
+        row(1),
+        row(2, 1, datetime(2026, 1, 5), datetime(2026, 1, 7), 2, work_hours=10, progress=100, cost=50),
+        row(3, 1),
+        changed,
+        row(5, 3, datetime(2026, 1, 8), None, 3, work_hours=10, cost=5),
+        row(6, duration=4),
+        row(7, 6, datetime(2026, 1, 1), datetime(2026, 1, 2), work_hours=4),
+    ])
+    assert values(rollup) == values(rebuilt)
+    assert rollup.summary() == rebuilt.summary()
+    # Moving a task to another parent needs a rebuild
+    assert not rollup.update_task(row(5, 1))
+
+def test_parent_cycles_become_roots():
+    rollup = WbsRollup.from_rows([row(1, 2), row(2, 1), row(3, 1)])
+    assert [(entry["id"], entry["wbs"]) for entry in rollup.rows()] == [(1, "1"), (2, "1.1"), (3, "1.2")]
+
+def test_wbs_endpoint_follows_task_writes(client, make_project, make_task):
+    project = make_project()
+    parent = make_task(project, "parent", 1)
+    child = make_task(project, "child", 2, parent_id=parent, work_hours=8)
+    make_task(project, "sibling", 1, parent_id=parent, work_hours=8)
+    assert client.get(f"/projects/{project}/wbs").json()["progress"] == 0.0
+
+    client.put(f"/tasks/{child}", json={
+        "title": "child", "project_id": project, "parent_id": parent, "duration": 2,
+        "work_hours": 8, "progress": 100
+    })
+    wbs = client.get(f"/projects/{project}/wbs").json()
+    assert wbs["progress"] == 50.0
+    assert [(task["title"], task["wbs"], task["is_summary"]) for task in wbs["tasks"]] == [
+        ("parent", "1", True), ("child", "1.1", False), ("sibling", "1.2", False)
+    ]
+    assert wbs["tasks"][0]["progress"] == 50.0
+    assert wbs["tasks"][0]["work_hours"] == 16.0
+    assert client.get("/projects/999999/wbs").status_code == 404